@@ -5,10 +5,25 @@ This is an optimized version of the analysis pipeline using ParallelAgent
 for independent operations, following ADK best practices for performance.
 """
 
+from typing import Any, Dict
+
 from google.adk.agents import SequentialAgent, ParallelAgent
 from google.adk.agents.llm_agent import LlmAgent
 
+from ...tools.clarification import clarification_reply
+from ...tools.context_analysis import LOCAL_CONTEXT_ANALYSIS_THRESHOLD, analyze_context
+from ...tools.input_analysis import LOCAL_INPUT_ANALYSIS_THRESHOLD, analyze_input
+from ...tools.response_cache import RESPONSE_CACHE_VERSION, get_response_cache
+from ..callbacks import (
+    cached_response,
+    local_agent_reply,
+    local_json_response,
+    prompt_fingerprint,
+    validated_json_response,
+)
 from ..solution_pipeline.agent import solution_pipeline_agent
+from ..state_models import InputAnalysis, PreliminaryContext, PreliminarySearchContext
+from ..state_projection import ProjectedInstruction
 
 input_analyzer_agent = LlmAgent(
     name="InputAnalyzerAgent",
@@ -128,6 +143,14 @@ Provide a JSON object with comprehensive analysis:
 """,
     description="Enhanced input analyzer with clarification question generation for parallel processing pipeline",
     output_key="input_analysis",
+    output_schema=InputAnalysis,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+    # Filled locally from tools.text_processing unless the analysis is unsure
+    before_model_callback=local_json_response(
+        analyze_input, LOCAL_INPUT_ANALYSIS_THRESHOLD
+    ),
+    after_model_callback=validated_json_response(InputAnalysis, analyze_input),
 )
 
 # NEW: Enhanced context analyzer with advanced mathematical physics recognition
@@ -245,8 +268,22 @@ This parallel analysis enables the system to immediately identify complex mathem
 """,
     description="Enhanced contextual analysis with mathematical physics recognition for parallel processing",
     output_key="preliminary_context",
+    output_schema=PreliminaryContext,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+    # Derived from keyword and concept tables unless the analysis is unsure
+    before_model_callback=local_json_response(
+        analyze_context, LOCAL_CONTEXT_ANALYSIS_THRESHOLD
+    ),
+    after_model_callback=validated_json_response(PreliminaryContext, analyze_context),
 )
 
+
+def question_search_context(question: str) -> Dict[str, Any]:
+    """Search context holding only the question, for KnowledgeRetriever to search"""
+    return {"original_question": question}
+
+
 preliminary_search_agent = LlmAgent(
     name="PreliminarySearchAgent",
     model="gemini-2.0-flash",
@@ -370,6 +407,13 @@ This search context will enable other agents to perform targeted, efficient know
 """,
     description="Generates comprehensive search context for efficient knowledge retrieval by other agents",
     output_key="preliminary_search_context",
+    output_schema=PreliminarySearchContext,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+    # A reply beyond repair leaves KnowledgeRetriever searching the question
+    after_model_callback=validated_json_response(
+        PreliminarySearchContext, question_search_context
+    ),
 )
 
 # Parallel processing for independent operations
@@ -387,7 +431,8 @@ parallel_analysis_stage = ParallelAgent(
 question_clarification = LlmAgent(
     name="QuestionClarificationAgent",
     model="gemini-2.0-flash",
-    instruction="""You are a Friendly Question Clarification Agent for Bangladeshi students (grades 6-12). Your job is to help students ask better questions so you can help them learn effectively.
+    instruction=ProjectedInstruction(
+        """You are a Friendly Question Clarification Agent for Bangladeshi students (grades 6-12). Your job is to help students ask better questions so you can help them learn effectively.
 
 **INPUT AVAILABLE:**
 - input_analysis: {input_analysis} (contains clarification_questions if needed)
@@ -483,13 +528,22 @@ Don't worry, we'll figure this out together! 💪✨"
 - Use appropriate language (Bengali/English) based on student's input
 - Keep it simple and friendly - these are kids/teens learning!
 """,
+        {
+            "input_analysis": (
+                "Problem_text",
+                "detected_language",
+                "clarification_questions",
+            )
+        },
+    ),
     description="Student-friendly clarification agent that uses input analysis clarification questions",
 )
 
 question_analyzer = LlmAgent(
     name="QuestionAnalyzer",
     model="gemini-2.0-flash",
-    instruction="""You are a Fast Router for an AI tutoring system. Your ONLY job is to make INSTANT routing decisions.
+    instruction=ProjectedInstruction(
+        """You are a Fast Router for an AI tutoring system. Your ONLY job is to make INSTANT routing decisions.
 
 **INPUT ANALYSIS AVAILABLE:**
 - input_analysis: {input_analysis}
@@ -533,6 +587,11 @@ question_analyzer = LlmAgent(
 
 **CRITICAL:** Make routing decision instantly based on analysis flags. No additional reasoning needed.
 """,
+        {
+            "input_analysis": ("is_valid_question", "needs_clarification"),
+            "preliminary_context": ("confidence_score",),
+        },
+    ),
     description="Ultra-fast routing agent that makes instant decisions based on parallel analysis results",
     sub_agents=[
         question_clarification,  # clarification agent
@@ -540,6 +599,16 @@ question_analyzer = LlmAgent(
     ],
 )
 
+# Finished responses are cached per question; the version tag changes with
+# any prompt in the pipeline, which invalidates earlier responses
+response_cache = get_response_cache(
+    version=f"{RESPONSE_CACHE_VERSION}-"
+    f"{prompt_fingerprint(parallel_analysis_stage, question_analyzer)}"
+)
+use_cached_response, cache_response = cached_response(
+    response_cache, "formatted_response"
+)
+
 # Enhanced analysis pipeline with parallel optimization
 analysis_pipeline_agent = SequentialAgent(
     name="AnalysisPipelineAgent",
@@ -548,4 +617,8 @@ analysis_pipeline_agent = SequentialAgent(
         parallel_analysis_stage,  # Stage 1: Parallel independent processing
         question_analyzer,  # Stage 2: Enhanced analysis using parallel results
     ],
+    # Clearly incomplete questions get a templated clarification before any
+    # analysis agent runs; borderline ones still reach QuestionAnalyzer
+    before_agent_callback=[local_agent_reply(clarification_reply), use_cached_response],
+    after_agent_callback=cache_response,
 )
@@ -0,0 +1,563 @@
+"""
+Agent callbacks for the AI tutoring system
+
+Lets deterministic local analysis stand in for an LLM call whenever it is
+confident enough, while ambiguous input still reaches the model.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from ..tools.math_formatter import FormatMode, MathStreamFormatter, format_math
+from ..tools.response_cache import ResponseCache, question_cache_key
+from ..tools.search_cache import SearchCache
+from .state_models import StateModel, validate_state
+
+BeforeModelCallback = Callable[[CallbackContext, LlmRequest], Optional[LlmResponse]]
+AsyncBeforeModelCallback = Callable[
+    [CallbackContext, LlmRequest], Awaitable[Optional[LlmResponse]]
+]
+AfterModelCallback = Callable[[CallbackContext, LlmResponse], Optional[LlmResponse]]
+AgentCallback = Callable[[CallbackContext], Optional[types.Content]]
+
+
+def user_text(callback_context: CallbackContext) -> str:
+    """Join the text parts of the message that started this turn"""
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def has_conversation_history(callback_context: CallbackContext) -> bool:
+    """Whether the session holds events from turns before this one"""
+    invocation = callback_context._invocation_context
+    return any(
+        event.invocation_id != invocation.invocation_id
+        for event in invocation.session.events
+    )
+
+
+def local_json_response(
+    analyze: Callable[[str], Dict[str, Any]],
+    threshold: float,
+    confidence_field: str = "confidence_score",
+) -> BeforeModelCallback:
+    """
+    Build a before_model_callback that answers with a local JSON analysis
+
+    When the analysis of the user message is confident enough, the callback
+    returns it as the model response and the LLM call is skipped. The agent
+    still stores the JSON under its output_key, so downstream instructions
+    read the same state as before. Otherwise it returns None and the model
+    runs as usual.
+
+    Args:
+        analyze: Function producing the agent's output schema from the text
+        threshold: Minimum confidence for skipping the model call
+        confidence_field: Key of the confidence value in the analysis
+
+    Returns:
+        Callback for LlmAgent.before_model_callback
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        text = user_text(callback_context)
+        if not text.strip():
+            return None
+
+        analysis = analyze(text)
+        if analysis[confidence_field] < threshold:
+            return None
+
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=json.dumps(analysis, ensure_ascii=False))],
+            )
+        )
+
+    callback.__name__ = f"local_{analyze.__name__}"
+    return callback
+
+
+def validated_json_response(
+    schema: Type[StateModel], fallback: Optional[Callable[[str], Dict[str, Any]]] = None
+) -> AfterModelCallback:
+    """
+    Build an after_model_callback that repairs a JSON reply to its schema
+
+    ADK validates the reply of an agent with an output_schema before storing
+    it under the output_key, so a stray code fence or trailing comma would
+    fail the turn after the call was paid for. The callback reads the reply
+    with validate_state and rewrites it as the schema's JSON, with missing or
+    mistyped fields set to their defaults. A reply without a recoverable
+    object is replaced by fallback's local analysis of the user message, so
+    the call is not retried.
+
+    Args:
+        schema: State model of the agent's output_key
+        fallback: Local analysis producing the schema from the user message;
+            without one, the schema's defaults are stored
+
+    Returns:
+        Callback for LlmAgent.after_model_callback
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        content = llm_response.content
+        if llm_response.partial or not content or not content.parts:
+            return None
+        if any(part.function_call for part in content.parts):
+            return None
+
+        text = "".join(part.text for part in content.parts if part.text)
+        model = validate_state(schema, text)
+        if model is None:
+            local = fallback(user_text(callback_context)) if fallback else {}
+            model = validate_state(schema, local) or schema()
+        content.parts = [types.Part(text=model.model_dump_json())]
+        return llm_response
+
+    callback.__name__ = f"validate_{schema.__name__}"
+    return callback
+
+
+def local_text_response(answer: Callable[[str], Optional[str]]) -> BeforeModelCallback:
+    """
+    Build a before_model_callback that answers with locally generated text
+
+    Used for agents whose output is the reply itself rather than a JSON
+    analysis. When answer returns text for the user message, that text is the
+    model response; when it returns None the model runs as usual.
+
+    Args:
+        answer: Function producing the reply, or None to defer to the model
+
+    Returns:
+        Callback for LlmAgent.before_model_callback
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        text = user_text(callback_context)
+        if not text.strip():
+            return None
+
+        reply = answer(text)
+        if reply is None:
+            return None
+
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=reply)])
+        )
+
+    callback.__name__ = f"local_{answer.__name__}"
+    return callback
+
+
+def local_agent_reply(answer: Callable[[str], Optional[str]]) -> AgentCallback:
+    """
+    Build a before_agent_callback that answers for a whole agent locally
+
+    For workflow agents whose sub-agents need not run for some messages.
+    When answer returns text for the user message, that text is the agent's
+    reply and none of its sub-agents run; when it returns None the agent
+    runs as usual. answer sees only the message, so it is asked on the
+    first turn of a session alone: later messages such as "Explain that
+    again" refer to the conversation and go to the agent.
+
+    Args:
+        answer: Function producing the reply, or None to run the agent
+
+    Returns:
+        Callback for BaseAgent.before_agent_callback
+    """
+
+    def callback(callback_context: CallbackContext) -> Optional[types.Content]:
+        text = user_text(callback_context)
+        if not text.strip() or has_conversation_history(callback_context):
+            return None
+
+        reply = answer(text)
+        if reply is None:
+            return None
+
+        return types.Content(role="model", parts=[types.Part(text=reply)])
+
+    callback.__name__ = f"local_{answer.__name__}"
+    return callback
+
+
+def local_transfer(
+    route: Callable[[CallbackContext], Optional[str]],
+) -> BeforeModelCallback:
+    """
+    Build a before_model_callback that transfers to a sub-agent locally
+
+    For routing agents whose decision follows from session state. When route
+    names an agent, the callback answers with the transfer_to_agent call the
+    model would have made, so ADK hands the turn over without an LLM call.
+    When it returns None the model decides as usual.
+
+    Args:
+        route: Function returning the name of the agent to transfer to
+
+    Returns:
+        Callback for LlmAgent.before_model_callback
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        agent_name = route(callback_context)
+        if agent_name is None:
+            return None
+        return transfer_response(agent_name)
+
+    callback.__name__ = f"local_{route.__name__}"
+    return callback
+
+
+def local_state_response(
+    answer: Callable[[CallbackContext], Optional[Dict[str, Any]]],
+) -> BeforeModelCallback:
+    """
+    Build a before_model_callback that answers with JSON built from state
+
+    Like local_json_response, for agents whose output follows from what
+    earlier agents wrote to session state rather than from the user message
+    alone. When answer returns a dictionary it is the model response; when it
+    returns None the model runs as usual.
+
+    Args:
+        answer: Function producing the agent's output schema, or None to
+            defer to the model
+
+    Returns:
+        Callback for LlmAgent.before_model_callback
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        output = answer(callback_context)
+        if output is None:
+            return None
+
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=json.dumps(output, ensure_ascii=False))],
+            )
+        )
+
+    callback.__name__ = f"local_{answer.__name__}"
+    return callback
+
+
+def transfer_on_marker(marker: str, agent_name: str) -> AfterModelCallback:
+    """
+    Build an after_model_callback that turns a marker reply into a transfer
+
+    Lets an agent's instruction keep a plain-text escape hatch such as
+    "ROUTE_TO_FULL_PIPELINE": when the model's reply contains the marker, it
+    is replaced by a transfer_to_agent call, so the marker is never shown to
+    the user and the turn continues in the named agent.
+
+    Args:
+        marker: Text the model returns to hand the request over
+        agent_name: Agent to transfer to; it must be a transfer target of
+            the agent using the callback
+
+    Returns:
+        Callback for LlmAgent.after_model_callback
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        content = llm_response.content
+        if not content or not content.parts:
+            return None
+        text = "".join(part.text for part in content.parts if part.text)
+        if marker not in text:
+            return None
+        return transfer_response(agent_name)
+
+    callback.__name__ = f"transfer_to_{agent_name}_on_marker"
+    return callback
+
+
+def transfer_response(agent_name: str) -> LlmResponse:
+    """Model response calling ADK's transfer_to_agent tool"""
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": agent_name}
+                    )
+                )
+            ],
+        )
+    )
+
+
+def formatted_notation(mode: FormatMode = "unicode") -> AfterModelCallback:
+    """
+    Build an after_model_callback that formats math in the model's reply
+
+    Replaces an LLM formatting pass: superscripts, subscripts, chemical
+    formulas, scientific notation and Greek letters are rewritten locally by
+    format_math. Streamed partial replies go through a MathStreamFormatter per
+    invocation, so formatted text reaches the user as it is generated; the
+    final reply, which is saved under the agent's output_key, is formatted
+    as a whole.
+
+    Args:
+        mode: "unicode" or "latex"
+
+    Returns:
+        Callback for LlmAgent.after_model_callback
+    """
+    streams: Dict[str, MathStreamFormatter] = {}
+
+    def callback(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        content = llm_response.content
+        if not content or not content.parts:
+            return None
+        text = "".join(part.text for part in content.parts if part.text)
+        if not text:
+            return None
+
+        invocation_id = callback_context.invocation_id
+        if llm_response.partial:
+            stream = streams.setdefault(invocation_id, MathStreamFormatter(mode))
+            formatted = stream.feed(text)
+        else:
+            streams.pop(invocation_id, None)
+            formatted = format_math(text, mode)
+        content.parts = [types.Part(text=formatted)] + [
+            part for part in content.parts if not part.text
+        ]
+        return llm_response
+
+    callback.__name__ = f"format_{mode}_notation"
+    return callback
+
+
+def cached_response(
+    cache: ResponseCache, output_key: str
+) -> Tuple[AgentCallback, AgentCallback]:
+    """
+    Build before/after agent callbacks that serve an agent from a cache
+
+    Before the agent runs, the user message is looked up in the cache; on a
+    hit the cached text is written to output_key and returned as the agent's
+    reply, so none of its sub-agents run. After a run that wrote a new value
+    to output_key, that value is stored together with the time it took.
+    Only the first turn of a session is read or stored: later answers depend
+    on the conversation before them, which the key does not capture.
+
+    Args:
+        cache: Response cache; nothing is read or stored while it is disabled
+        output_key: State key holding the finished response
+
+    Returns:
+        Tuple of (before_agent_callback, after_agent_callback)
+    """
+    # invocation id → (cache key, start time, output before the run)
+    pending: Dict[str, Tuple[str, float, Any]] = {}
+
+    def before_agent(callback_context: CallbackContext) -> Optional[types.Content]:
+        text = user_text(callback_context)
+        if not cache.enabled or not text.strip():
+            return None
+        if has_conversation_history(callback_context):
+            return None
+
+        key = question_cache_key(text)
+        response = cache.get(key)
+        if response is None:
+            pending[callback_context.invocation_id] = (
+                key,
+                time.perf_counter(),
+                callback_context.state.get(output_key),
+            )
+            return None
+
+        callback_context.state[output_key] = response
+        return types.Content(role="model", parts=[types.Part(text=response)])
+
+    def after_agent(callback_context: CallbackContext) -> Optional[types.Content]:
+        entry = pending.pop(callback_context.invocation_id, None)
+        if entry is None or not cache.enabled:
+            return None
+
+        key, start, previous = entry
+        response = callback_context.state.get(output_key)
+        if isinstance(response, str) and response.strip() and response != previous:
+            cache.put(key, response, time.perf_counter() - start)
+        return None
+
+    before_agent.__name__ = f"cached_{output_key}"
+    after_agent.__name__ = f"cache_{output_key}"
+    return before_agent, after_agent
+
+
+def single_flight_response(
+    cache: SearchCache, key: Callable[[CallbackContext], Optional[str]]
+) -> Tuple[AsyncBeforeModelCallback, AfterModelCallback, AgentCallback]:
+    """
+    Build callbacks that share an agent's model response through a cache
+
+    For agents whose model call is an expensive search. Before the call, the
+    key is looked up in the cache; a stored result, or the result of an
+    identical call already in flight, becomes the model response. Otherwise
+    the model runs, and its final response is stored and handed to the
+    callers waiting on it. The agent callback releases waiters when the call
+    ended without a response, and the end of the caller's task releases them
+    when the call raised, so they run the model themselves.
+
+    Args:
+        cache: Search cache; nothing is read, stored or waited on while it
+            is disabled
+        key: Function returning the cache key for this call, or None to run
+            the model without the cache
+
+    Returns:
+        Tuple of (before_model_callback, after_model_callback,
+        after_agent_callback)
+    """
+    # invocation id → (cache key, start time, whether it leads the flight)
+    pending: Dict[str, Tuple[str, float, bool]] = {}
+
+    async def before_model(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        cache_key = key(callback_context)
+        if cache_key is None or not cache.enabled:
+            return None
+
+        result, leader = await cache.acquire(cache_key)
+        if result is not None:
+            return LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=result)])
+            )
+        invocation_id = callback_context.invocation_id
+        pending[invocation_id] = (cache_key, time.perf_counter(), leader)
+        # A model call that raises skips the after callbacks
+        asyncio.current_task().add_done_callback(lambda _: abandon(invocation_id))
+        return None
+
+    def after_model(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        entry = pending.pop(callback_context.invocation_id, None)
+        if entry is None:
+            return None
+
+        cache_key, start, leader = entry
+        parts = llm_response.content.parts if llm_response.content else None
+        text = "".join(part.text for part in parts or [] if part.text)
+        result = text if text.strip() and not llm_response.error_code else None
+        if leader:
+            cache.release(cache_key, result, time.perf_counter() - start)
+        elif result is not None:
+            cache.store(cache_key, result, time.perf_counter() - start)
+        return None
+
+    def abandon(invocation_id: str) -> None:
+        entry = pending.pop(invocation_id, None)
+        if entry is not None and entry[2]:
+            cache.release(entry[0], None)
+
+    def after_agent(callback_context: CallbackContext) -> Optional[types.Content]:
+        abandon(callback_context.invocation_id)
+        return None
+
+    name = getattr(key, "__name__", "search")
+    before_model.__name__ = f"cached_{name}"
+    after_model.__name__ = f"cache_{name}"
+    after_agent.__name__ = f"release_{name}"
+    return before_model, after_model, after_agent
+
+
+def prompt_fingerprint(*agents: BaseAgent) -> str:
+    """
+    Short hash of the models, instructions and output schemas of agents and
+    their sub-agents
+
+    Used as a cache version tag, so cached responses are dropped once any
+    prompt that produced them changes.
+
+    Args:
+        agents: Root agents of the trees to fingerprint
+
+    Returns:
+        Hex digest prefix
+    """
+    digest = hashlib.sha256()
+    for root in agents:
+        for agent in walk_agents(root):
+            digest.update(agent.name.encode())
+            for field in ("model", "instruction", "global_instruction"):
+                value = getattr(agent, field, None)
+                # Instruction providers such as ProjectedInstruction expose
+                # the text they render from as source
+                value = getattr(value, "source", value)
+                if isinstance(value, str):
+                    digest.update(b"\x1f" + value.encode())
+            schema = getattr(agent, "output_schema", None)
+            if schema is not None:
+                schema_json = json.dumps(schema.model_json_schema(), sort_keys=True)
+                digest.update(b"\x1f" + schema_json.encode())
+    return digest.hexdigest()[:16]
+
+
+def walk_agents(root: BaseAgent) -> Iterator[BaseAgent]:
+    """Yield root and every agent below it, depth first"""
+    yield root
+    for sub_agent in root.sub_agents:
+        yield from walk_agents(sub_agent)
+
+
+def add_callback(agent: BaseAgent, field: str, callback: Any, first: bool) -> None:
+    """
+    Add a callback to an agent next to the ones it already has
+
+    ADK runs an agent's callbacks in order and stops at the first one that
+    returns a value, so a callback that must always run goes first, and one
+    that should only run when no other callback answered goes last.
+
+    Args:
+        agent: Agent to modify
+        field: Callback field, e.g. "before_model_callback"
+        callback: Callback to add
+        first: Run it before the existing callbacks instead of after them
+    """
+    callbacks = getattr(agent, field)
+    if callbacks is None:
+        callbacks = []
+    elif not isinstance(callbacks, list):
+        callbacks = [callbacks]
+    setattr(agent, field, [callback, *callbacks] if first else [*callbacks, callback])
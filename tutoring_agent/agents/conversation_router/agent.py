@@ -5,10 +5,20 @@ Routes user input to determine if it's general conversation or educational conte
 Handles casual chat without invoking complex tutoring agents.
 """
 
+from typing import Optional
+
 from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.llm_agent import LlmAgent
 from ..analysis_pipeline.agent import analysis_pipeline_agent
+from ...tools.json_repair import parse_json_object
+from ..callbacks import local_transfer
 from ..fast_track.fast_track_agent import fast_track_educational_agent
+from ..state_projection import ProjectedInstruction
+
+# Confidence at or above which the router follows query_classification
+# without asking the model
+LOCAL_ROUTING_THRESHOLD = 0.7
 
 
 # Create new general chat instance for optimized system
@@ -99,10 +109,44 @@ Always maintain an encouraging, supportive tone that makes students feel comfort
 )
 
 
+# Sub-agent for each query_classification class
+CLASSIFICATION_ROUTES = {
+    "GENERAL": general_chat_agent.name,
+    "SIMPLE_EDUCATIONAL": fast_track_educational_agent.name,
+    "COMPLEX_EDUCATIONAL": analysis_pipeline_agent.name,
+}
+
+
+def route_by_classification(callback_context: CallbackContext) -> Optional[str]:
+    """
+    Pick the sub-agent for a confident query classification
+
+    Args:
+        callback_context: Context of the router's model call
+
+    Returns:
+        Name of the agent to transfer to, or None to let the model decide
+    """
+    classification = parse_json_object(
+        callback_context.state.get("query_classification")
+    )
+    if not classification:
+        return None
+    try:
+        confidence = float(classification.get("confidence", 0))
+    except (TypeError, ValueError):
+        return None
+    if confidence < LOCAL_ROUTING_THRESHOLD:
+        return None
+    return CLASSIFICATION_ROUTES.get(classification.get("classification"))
+
+
 conversation_router = Agent(
     name="ConversationRouter",
     model="gemini-2.0-flash",
-    instruction="""
+    # The classification is stored as a dictionary; render it as JSON
+    instruction=ProjectedInstruction(
+        """
     You are the main conversation router for an optimized AI tutoring system with enhanced mathematical and physics problem recognition.
 
     **State-Based Routing with Enhanced Query Classification:**
@@ -114,7 +158,7 @@ conversation_router = Agent(
     example query_classification state:
     ```json
     query_classification={
-        "classification": "COMPLEX_EDUCATIONAL|GENERAL",
+        "classification": "COMPLEX_EDUCATIONAL|SIMPLE_EDUCATIONAL|GENERAL",
         "confidence": 0.0-1.0,
         "reasoning": "brief explanation of classification with specific indicators found",
         "estimated_processing_time": "immediate|fast|standard|complex",
@@ -130,7 +174,12 @@ conversation_router = Agent(
     - Fastest response path with immediate processing
 
 
-    **2. COMPLEX_EDUCATIONAL Classification:**
+    **2. SIMPLE_EDUCATIONAL Classification:**
+    - Route to fast_track_educational_agent for single calculations, single equations, one-term definitions and named formulas
+    - The fast track answers with its calculator, equation solver, glossary and formula tools
+    - If it finds the question too complex, it hands the request to analysis_pipeline_agent itself
+
+    **3. COMPLEX_EDUCATIONAL Classification:**
     - **ALWAYS route to analysis_pipeline_agent** - No exceptions
     - Special handling for mathematical physics problems:
       * Parametric equations with time-dependent functions
@@ -173,10 +222,14 @@ conversation_router = Agent(
 
     Your goal is to provide the most appropriate response pathway based on the enhanced query classification, with special emphasis on correctly identifying and routing complex mathematical and physics problems to ensure they receive the detailed, accurate analysis they require.
     """,
+        {"query_classification": None},
+    ),
     description="State-based conversation router using query classification output for optimal routing decisions",
     sub_agents=[
         general_chat_agent,  # General conversation handling
-        # fast_track_educational_agent,  # Fast processing for simple queries
+        fast_track_educational_agent,  # Fast processing for simple queries
         analysis_pipeline_agent,  # Enhanced analysis with parallel processing
     ],
+    # Confident classifications are routed without the model
+    before_model_callback=local_transfer(route_by_classification),
 )
@@ -9,6 +9,7 @@ from .fast_track_agent import (
     fast_track_educational_agent,
     query_classifier_agent,
     calculator_tool,
+    equation_tool,
     definition_tool,
 )
 
@@ -16,5 +17,6 @@ __all__ = [
     "fast_track_educational_agent",
     "query_classifier_agent",
     "calculator_tool",
+    "equation_tool",
     "definition_tool",
 ]
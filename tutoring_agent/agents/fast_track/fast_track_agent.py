@@ -5,172 +5,141 @@ Handles simple educational queries quickly without complex pipeline processing,
 following ADK best practices for performance optimization.
 """
 
+from typing import List, Optional
+
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.tools import FunctionTool
-import re
+
+from ...tools.calculator import CalculationError, evaluate_expression
+from ...tools.equation_solver import format_solution, solve_equations
+from ...tools.glossary import display_name, get_glossary
+from ...tools.math_lexer import scan_expressions
+from ...tools.query_classifier import LOCAL_CLASSIFICATION_THRESHOLD, classify_query
+from ...tools.text_processing import detect_language
+from ..analysis_pipeline.agent import analysis_pipeline_agent
+from ..callbacks import (
+    local_json_response,
+    local_text_response,
+    transfer_on_marker,
+    validated_json_response,
+)
+from ..state_models import QueryClassification
+
+# Words besides the equations up to which "Solve ... step by step" style
+# questions are answered without the model
+_MAX_SOLVE_INSTRUCTION_WORDS = 6
+
+# Reply with which the fast-track agent hands a request to the full pipeline
+ROUTE_TO_FULL_PIPELINE = "ROUTE_TO_FULL_PIPELINE"
 
 
 # Simple calculator function for basic math with explanations
-def simple_calculator(expression: str) -> str:
+def simple_calculator(expression: str, exact: bool = False) -> str:
     """
     Safely evaluate simple mathematical expressions with step-by-step explanation
+
+    Args:
+        expression: Arithmetic expression such as "15 * 8" or "2 + 3 * 4"
+        exact: Keep fractions exact, e.g. 1/3 + 1/6 = 1/2
     """
     try:
-        # Remove spaces and validate expression
-        expr = expression.strip().replace(" ", "")
-
-        # Only allow basic math operations and numbers
-        if not re.match(r"^[0-9+\-*/().\s]+$", expr):
-            return "Invalid expression - only basic math operations allowed"
-
-        # Evaluate safely
-        result = eval(expr)
-
-        # Provide explanation based on operation type
-        explanation = ""
-        if (
-            "+" in expr
-            and expr.count("+") == 1
-            and "*" not in expr
-            and "/" not in expr
-            and "-" not in expr
-        ):
-            parts = expr.split("+")
-            explanation = f"Adding {parts[0]} and {parts[1]} together: "
-        elif (
-            "-" in expr
-            and expr.count("-") == 1
-            and "*" not in expr
-            and "/" not in expr
-            and "+" not in expr
-        ):
-            parts = expr.split("-")
-            explanation = f"Subtracting {parts[1]} from {parts[0]}: "
-        elif (
-            "*" in expr
-            and expr.count("*") == 1
-            and "+" not in expr
-            and "/" not in expr
-            and "-" not in expr
-        ):
-            parts = expr.split("*")
-            explanation = f"Multiplying {parts[0]} by {parts[1]}: "
-        elif (
-            "/" in expr
-            and expr.count("/") == 1
-            and "+" not in expr
-            and "*" not in expr
-            and "-" not in expr
-        ):
-            parts = expr.split("/")
-            explanation = f"Dividing {parts[0]} by {parts[1]}: "
-        else:
-            explanation = f"Calculating the expression {expression}: "
-
-        return f"{explanation}{expression} = {result}"
-    except:
-        return f"Cannot calculate: {expression}"
+        calculation = evaluate_expression(expression, exact=exact)
+    except CalculationError as error:
+        return f"Cannot calculate: {expression} ({error})"
+
+    result = calculation["formatted_result"]
+    steps = calculation["steps"]
+    if not steps:
+        return f"{expression} = {result}"
+    if len(steps) == 1:
+        return f"{steps[0]['description']}: {expression} = {result}"
+
+    lines = [f"Calculating {expression} step by step (order of operations):"]
+    for number, step in enumerate(steps, 1):
+        lines.append(f"{number}. {step['description']}: {step['operation']}")
+    lines.append(f"{expression} = {result}")
+    return "\n".join(lines)
+
+
+# Equation solver for linear and quadratic equations and 2x2 systems
+def equation_solver(equations: str) -> str:
+    """
+    Solve linear or quadratic equations in one unknown, or two linear
+    equations in two unknowns, exactly and step by step
+
+    Args:
+        equations: The equation(s), e.g. "2x + 5 = 13" or "x + y = 5, x - y = 1"
+    """
+    return format_solution(solve_equations(equations))
+
+
+def answer_equation_locally(text: str) -> Optional[str]:
+    """
+    Answer a bare English "solve this equation" question without the model
+
+    Questions with more context than a short instruction, Bengali questions
+    (which the model answers in Bengali using equation_solver) and equations
+    the solver cannot handle return None.
+    """
+    if detect_language(text) != "english":
+        return None
+    remainder = text
+    for expr in reversed(scan_expressions(text)):
+        remainder = remainder[: expr["start_pos"]] + " " + remainder[expr["end_pos"] :]
+    if len(remainder.split()) > _MAX_SOLVE_INSTRUCTION_WORDS:
+        return None
+
+    result = solve_equations(text)
+    if not result["solved"]:
+        return None
+    return format_solution(result)
 
 
 # Quick definition lookup function with detailed explanations
 def quick_definition_lookup(term: str, subject: str = "general") -> str:
     """
     Provide quick definitions with explanations for common educational terms
-    """
-    definitions = {
-        # Math terms with explanations
-        "algebra": {
-            "definition": "A branch of mathematics that uses letters and symbols to represent numbers and quantities in formulas and equations.",
-            "explanation": "For example, in the equation 'x + 5 = 10', the letter 'x' represents an unknown number that we need to find. Algebra helps us solve for these unknowns systematically.",
-        },
-        "geometry": {
-            "definition": "The branch of mathematics concerned with the properties and relations of points, lines, surfaces, and solids.",
-            "explanation": "Geometry helps us understand shapes, sizes, and spatial relationships. For instance, it teaches us how to calculate the area of a rectangle (length × width) or the circumference of a circle (2πr).",
-        },
-        "calculus": {
-            "definition": "Advanced mathematics involving rates of change and accumulation of quantities.",
-            "explanation": "Calculus has two main parts: derivatives (which measure how fast something changes) and integrals (which measure total accumulation). It's used in physics, engineering, and many other fields.",
-        },
-        # Science terms with explanations
-        "photosynthesis": {
-            "definition": "The process by which plants use sunlight to synthesize foods from carbon dioxide and water.",
-            "explanation": "This process occurs in chloroplasts and can be summarized as: 6CO₂ + 6H₂O + sunlight → C₆H₁₂O₆ + 6O₂. Plants essentially 'eat' sunlight and produce oxygen as a byproduct, which is why they're crucial for life on Earth.",
-        },
-        "gravity": {
-            "definition": "The force that attracts objects toward the center of the Earth or toward any other physical body having mass.",
-            "explanation": "Gravity is why objects fall downward and why we stay on the ground. The more massive an object, the stronger its gravitational pull. Earth's gravity accelerates falling objects at 9.8 m/s².",
-        },
-        "atom": {
-            "definition": "The basic unit of a chemical element, consisting of protons, neutrons, and electrons.",
-            "explanation": "Think of an atom like a tiny solar system: the nucleus (protons and neutrons) is at the center, and electrons orbit around it. The number of protons determines what element it is.",
-        },
-        # General academic terms with explanations
-        "hypothesis": {
-            "definition": "A proposed explanation for a phenomenon, used as a starting point for investigation.",
-            "explanation": "A hypothesis is like an educated guess that can be tested. It should be specific and measurable. For example: 'Plants grow taller when given more sunlight' is a testable hypothesis.",
-        },
-        "analysis": {
-            "definition": "Detailed examination of the elements or structure of something.",
-            "explanation": "Analysis involves breaking down complex information into smaller parts to understand it better. In literature, you might analyze themes and characters; in science, you might analyze experimental data.",
-        },
-    }
 
-    term_lower = term.lower()
-    if term_lower in definitions:
-        info = definitions[term_lower]
-        return f"**{term}:** {info['definition']}\n\n**Explanation:** {info['explanation']}"
-    else:
-        return f"Quick definition not available for '{term}'. This may require detailed research."
+    Terms are looked up in the bilingual glossary by English or Bengali name,
+    tolerating misspellings; subject breaks ties between same-named terms.
+    """
+    glossary = get_glossary()
+    info = glossary.lookup(term, kind="term", subject=subject)
+    if info:
+        return f"**{display_name(info)}:** {info['definition']}\n\n**Explanation:** {info['explanation']}"
+    return _not_found(
+        f"Quick definition not available for '{term}'. This may require detailed research.",
+        glossary.suggest(term, kind="term"),
+    )
 
 
 # Formula explanation function
 def formula_explainer(formula_name: str) -> str:
     """
     Provide common formulas with explanations of when and how to use them
+
+    Formulas are looked up in the bilingual glossary by name, Bengali name or
+    the formula itself ("F = ma"), tolerating misspellings.
     """
-    formulas = {
-        "area of rectangle": {
-            "formula": "A = length × width",
-            "explanation": "This formula calculates the space inside a rectangle. Multiply the length by the width to find how many unit squares fit inside.",
-            "example": "For a rectangle that is 5 meters long and 3 meters wide: A = 5 × 3 = 15 square meters",
-        },
-        "area of circle": {
-            "formula": "A = πr²",
-            "explanation": "This calculates the area of a circle using its radius (r). π (pi) ≈ 3.14159.",
-            "example": "For a circle with radius 4 cm: A = π × 4² = π × 16 ≈ 50.27 square cm",
-        },
-        "circumference of circle": {
-            "formula": "C = 2πr",
-            "explanation": "This finds the distance around a circle using its radius (r).",
-            "example": "For a circle with radius 3 m: C = 2 × π × 3 ≈ 18.85 meters",
-        },
-        "pythagorean theorem": {
-            "formula": "a² + b² = c²",
-            "explanation": "In a right triangle, the square of the longest side (hypotenuse) equals the sum of squares of the other two sides.",
-            "example": "If two sides are 3 and 4 units: 3² + 4² = 9 + 16 = 25, so c = √25 = 5 units",
-        },
-        "distance formula": {
-            "formula": "d = √[(x₂-x₁)² + (y₂-y₁)²]",
-            "explanation": "This calculates the straight-line distance between two points on a coordinate plane.",
-            "example": "Distance between points (1,2) and (4,6): d = √[(4-1)² + (6-2)²] = √[9 + 16] = √25 = 5 units",
-        },
-        "slope": {
-            "formula": "m = (y₂-y₁)/(x₂-x₁)",
-            "explanation": "Slope measures how steep a line is - the change in y divided by the change in x.",
-            "example": "For points (2,3) and (5,9): m = (9-3)/(5-2) = 6/3 = 2 (the line rises 2 units for every 1 unit right)",
-        },
-    }
+    glossary = get_glossary()
+    info = glossary.lookup(formula_name, kind="formula")
+    if info:
+        return f"**{display_name(info)}:**\n\n**Formula:** {info['formula']}\n\n**Explanation:** {info['explanation']}\n\n**Example:** {info['example']}"
+    return _not_found(
+        f"Formula explanation not available for '{formula_name}'. This may require detailed research.",
+        glossary.suggest(formula_name, kind="formula"),
+    )
+
 
-    formula_key = formula_name.lower().strip()
-    if formula_key in formulas:
-        info = formulas[formula_key]
-        return f"**{formula_name.title()}:**\n\n**Formula:** {info['formula']}\n\n**Explanation:** {info['explanation']}\n\n**Example:** {info['example']}"
-    else:
-        return f"Formula explanation not available for '{formula_name}'. This may require detailed research."
+def _not_found(message: str, suggestions: List[str]) -> str:
+    if suggestions:
+        message += f" Did you mean: {', '.join(suggestions)}?"
+    return message
 
 
 # Create function tools
 calculator_tool = FunctionTool(func=simple_calculator)
+equation_tool = FunctionTool(func=equation_solver)
 definition_tool = FunctionTool(func=quick_definition_lookup)
 formula_tool = FunctionTool(func=formula_explainer)
 formula_tool = FunctionTool(func=formula_explainer)
@@ -190,15 +159,19 @@ fast_track_educational_agent = LlmAgent(
     1. **Simple Calculations:**
        - Basic arithmetic: addition, subtraction, multiplication, division
        - Simple algebraic equations: "solve 2x + 5 = 13"
+       - Use the equation solver tool for linear and quadratic equations and
+         systems of two linear equations, then explain its steps in the
+         student's language
        - Basic geometry: area, perimeter calculations
        - Use the calculator tool for mathematical expressions
+       - Pass exact=true to the calculator when the answer should stay a fraction
        - ALWAYS explain the mathematical process or reasoning
     
     2. **Quick Definitions:**
        - Common academic terms and concepts
        - Basic scientific definitions
        - Mathematical terminology
-       - Use the definition lookup tool when available
+       - Use the definition lookup tool when available; it accepts English or Bengali terms
        - Provide context and examples to make definitions clearer
     
     3. **Factual Questions:**
@@ -213,7 +186,7 @@ fast_track_educational_agent = LlmAgent(
        - Mathematical identities
        - Chemical formulas for common compounds
        - Explain when and how to use each formula
-       - Use the formula explainer tool for common mathematical formulas
+       - Use the formula explainer tool for common math, physics and chemistry formulas
     
     **Response Guidelines:**
     - Provide direct, clear answers WITH explanations
@@ -234,7 +207,7 @@ fast_track_educational_agent = LlmAgent(
     **Routing Decision:**
     - If you can answer completely and confidently: Provide full response WITH explanation
     - If partial answer possible: Give what you can, explain it, and suggest further help
-    - If too complex: Return "ROUTE_TO_FULL_PIPELINE" for complex processing
+    - If too complex: Reply with exactly "ROUTE_TO_FULL_PIPELINE" and nothing else; the request is then handed to the full analysis pipeline
     
     **Examples:**
     - "What is 15 × 8?" → "15 × 8 = 120. Explanation: We're multiplying 15 by 8, which means adding 15 to itself 8 times, or adding 8 to itself 15 times."
@@ -245,10 +218,17 @@ fast_track_educational_agent = LlmAgent(
     Remember: Speed, accuracy, AND educational value are your priorities. Help students understand, not just get answers.
     """,
     description="Fast-track educational agent for simple queries, providing 50-70% faster responses with clear explanations for basic questions",
-    tools=[calculator_tool, definition_tool, formula_tool],
+    tools=[calculator_tool, equation_tool, definition_tool, formula_tool],
     output_key="fast_track_response",
+    # Bare English equations are solved without the model
+    before_model_callback=local_text_response(answer_equation_locally),
+    # The ROUTE_TO_FULL_PIPELINE escape hatch re-dispatches to the full pipeline
+    after_model_callback=transfer_on_marker(
+        ROUTE_TO_FULL_PIPELINE, analysis_pipeline_agent.name
+    ),
 )
 
+
 # Enhanced query classifier with advanced mathematical recognition
 query_classifier_agent = LlmAgent(
     name="QueryClassifierAgent",
@@ -286,7 +266,20 @@ query_classifier_agent = LlmAgent(
        - Problems involving unknown variables that need to be solved for
        - Mathematical relationships that need to be established or proven
     
-    2. **GENERAL** (Route to General Chat):
+    2. **SIMPLE_EDUCATIONAL** (Route to Fast Track):
+       ⚡ **Single-Step Indicators** (ALL must hold):
+       - At most 12 words and exactly one thing asked
+       - The answer is one of:
+         * A single arithmetic calculation: "What is 15 × 8?", "12.5 + 7.25"
+         * One linear or quadratic equation, or two linear equations in two
+           unknowns, given directly: "Solve 2x + 5 = 13", "x + y = 5 and x - y = 1"
+         * The definition of one common term: "Define atom", "What is photosynthesis?", "বল কী?"
+         * One named formula: "Area of circle formula", "বৃত্তের ক্ষেত্রফলের সূত্র"
+       - No request for step-by-step working, explanation of why/how, proof,
+         derivation or comparison
+       - No word problem, no calculus, vectors or motion analysis
+    
+    3. **GENERAL** (Route to General Chat):
        💬 **Conversational and Non-Academic Indicators**:
        - Casual conversation and greetings: "Hello", "How are you?", "Good morning"
        - Social interaction and small talk: "Nice weather", "Tell me a joke"
@@ -326,7 +319,7 @@ query_classifier_agent = LlmAgent(
       **Response Format:**
     ```json
     {
-        "classification": "COMPLEX_EDUCATIONAL|GENERAL",
+        "classification": "COMPLEX_EDUCATIONAL|SIMPLE_EDUCATIONAL|GENERAL",
         "confidence": 0.0-1.0,
         "reasoning": "brief explanation of classification with specific indicators found",
         "estimated_processing_time": "immediate|fast|standard|complex",
@@ -347,6 +340,14 @@ query_classifier_agent = LlmAgent(
     - "Prove that the sum of angles in a triangle is 180°" → COMPLEX (geometric proof)
     - "Find the area of a triangle with sides 5, 12, and 13 cm" → COMPLEX (requires formula application and calculation)
     
+    ✅ **SIMPLE_EDUCATIONAL Examples:**
+    - "What is 15 × 8?" → SIMPLE (single calculation)
+    - "Solve 2x + 5 = 13" → SIMPLE (one linear equation, no working requested)
+    - "২x + ৫ = ১৩ সমাধান করুন" → SIMPLE (one linear equation)
+    - "Define atom" → SIMPLE (one term)
+    - "সালোকসংশ্লেষণ কাকে বলে?" → SIMPLE (one term)
+    - "What is the formula for the area of a circle?" → SIMPLE (one named formula)
+    
     ✅ **GENERAL Examples:**
     - "Hello, how are you?" → GENERAL (greeting)
     - "What's your name?" → GENERAL (AI identity question)
@@ -360,4 +361,12 @@ query_classifier_agent = LlmAgent(
     """,
     description="Intelligent query classifier for optimal routing and performance",
     output_key="query_classification",
+    output_schema=QueryClassification,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+    # Obvious greetings and math questions are classified without the LLM
+    before_model_callback=local_json_response(
+        classify_query, LOCAL_CLASSIFICATION_THRESHOLD, confidence_field="confidence"
+    ),
+    after_model_callback=validated_json_response(QueryClassification, classify_query),
 )
@@ -0,0 +1,353 @@
+"""
+Performance instrumentation for the AI tutoring system
+
+Measures each request through ADK agent, model and tool callbacks instead of
+asking a model to report its own performance: wall time per agent, LLM calls
+and token counts, tool latency and process memory. The per-request summary is
+written to session state, and running totals are exposed in the Prometheus
+text format.
+"""
+
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+
+from .callbacks import add_callback, walk_agents
+
+PERFORMANCE_METRICS_KEY = "performance_metrics"
+
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = "tutoring"
+
+# Requests whose root agent never finished (e.g. cancelled runs) are dropped
+# from the in-progress table after this many seconds
+STALE_REQUEST_SECONDS = 600
+
+
+def resident_memory_bytes() -> int:
+    """
+    Current resident set size of this process
+
+    Reads /proc on Linux; elsewhere falls back to the peak resident size
+    reported by getrusage.
+
+    Returns:
+        Resident memory in bytes
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Request:
+    """Measurements of one invocation while it runs"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # agent name → [runs, seconds]
+        self.agents: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        # agent name → [calls, seconds, prompt tokens, completion tokens]
+        self.models: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0])
+        # tool name → [calls, seconds]
+        self.tools: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        # (agent or tool, call id) → start times of calls in progress
+        self.started: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+
+
+class PerformanceMonitor:
+    """
+    Collects request metrics through ADK callbacks
+
+    instrument() adds the monitor's callbacks to every agent of a tree. They
+    only record timings and return None, so local answers, cache hits and
+    transfers work as before. The model call timer starts after the agent's
+    other before_model callbacks, so calls they answer locally are not timed. When the root agent
+    finishes, the request summary is stored under PERFORMANCE_METRICS_KEY and
+    added to the running totals behind prometheus_text().
+    """
+
+    def __init__(self):
+        self._requests: Dict[str, _Request] = {}
+        self._lock = threading.Lock()
+        self._requests_total = 0
+        self._request_seconds = 0.0
+        self._agents: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        self._models: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0])
+        self._tools: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def instrument(
+        self, root: BaseAgent, output_key: str = PERFORMANCE_METRICS_KEY
+    ) -> None:
+        """
+        Add the monitor's callbacks to every agent under root
+
+        Args:
+            root: Agent the runner starts; the request summary is written when
+                it finishes
+            output_key: State key for the request summary
+        """
+        for agent in walk_agents(root):
+            add_callback(agent, "before_agent_callback", self.before_agent, True)
+            add_callback(agent, "after_agent_callback", self.after_agent, True)
+            if isinstance(agent, LlmAgent):
+                add_callback(agent, "before_model_callback", self.before_model, False)
+                add_callback(agent, "after_model_callback", self.after_model, True)
+                add_callback(agent, "before_tool_callback", self.before_tool, True)
+                add_callback(agent, "after_tool_callback", self.after_tool, True)
+
+        def finish_request(callback_context: CallbackContext) -> None:
+            callback_context.state[output_key] = self.finish(
+                callback_context.invocation_id
+            )
+
+        # Runs after the root's own after_agent callbacks, so the summary
+        # covers the whole request
+        add_callback(root, "after_agent_callback", finish_request, False)
+
+    def before_agent(self, callback_context: CallbackContext) -> None:
+        request = self._request(callback_context.invocation_id)
+        request.started[(callback_context.agent_name, "")].append(time.perf_counter())
+
+    def after_agent(self, callback_context: CallbackContext) -> None:
+        request = self._request(callback_context.invocation_id)
+        name = callback_context.agent_name
+        starts = request.started[(name, "")]
+        if starts:
+            _add(request.agents[name], 1, time.perf_counter() - starts.pop())
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        request = self._request(callback_context.invocation_id)
+        request.started[(callback_context.agent_name, "model")].append(
+            time.perf_counter()
+        )
+
+    def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        # Streamed chunks arrive before the final response, which holds usage
+        if llm_response.partial:
+            return
+        request = self._request(callback_context.invocation_id)
+        name = callback_context.agent_name
+        starts = request.started[(name, "model")]
+        if not starts:
+            return
+        usage = llm_response.usage_metadata
+        _add(
+            request.models[name],
+            1,
+            time.perf_counter() - starts.pop(),
+            (usage and usage.prompt_token_count) or 0,
+            (usage and usage.candidates_token_count) or 0,
+        )
+
+    def before_tool(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        request = self._request(tool_context.invocation_id)
+        key = (tool.name, tool_context.function_call_id or "")
+        request.started[key].append(time.perf_counter())
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> None:
+        request = self._request(tool_context.invocation_id)
+        starts = request.started[(tool.name, tool_context.function_call_id or "")]
+        if starts:
+            _add(request.tools[tool.name], 1, time.perf_counter() - starts.pop())
+
+    def finish(self, invocation_id: str) -> Dict[str, Any]:
+        """
+        Close a request and add it to the running totals
+
+        Args:
+            invocation_id: ADK invocation id of the request
+
+        Returns:
+            Dictionary with response_time_ms, llm_calls, prompt_tokens,
+            completion_tokens, memory_rss_mb, and per-name breakdowns under
+            agents, models and tools
+        """
+        with self._lock:
+            request = self._requests.pop(invocation_id, None) or _Request()
+            now = time.perf_counter()
+            seconds = now - request.start
+            for stale in [
+                key
+                for key, value in self._requests.items()
+                if now - value.start > STALE_REQUEST_SECONDS
+            ]:
+                del self._requests[stale]
+            self._requests_total += 1
+            self._request_seconds += seconds
+            for totals, values in (
+                (self._agents, request.agents),
+                (self._models, request.models),
+                (self._tools, request.tools),
+            ):
+                for name, value in values.items():
+                    _add(totals[name], *value)
+
+        models = request.models.values()
+        return {
+            "response_time_ms": round(seconds * 1000, 1),
+            "llm_calls": sum(int(model[0]) for model in models),
+            "prompt_tokens": sum(int(model[2]) for model in models),
+            "completion_tokens": sum(int(model[3]) for model in models),
+            "memory_rss_mb": round(resident_memory_bytes() / 2**20, 1),
+            "agents": {
+                name: {"runs": int(runs), "time_ms": round(seconds * 1000, 1)}
+                for name, (runs, seconds) in request.agents.items()
+            },
+            "models": {
+                name: {
+                    "calls": int(calls),
+                    "time_ms": round(seconds * 1000, 1),
+                    "prompt_tokens": int(prompt),
+                    "completion_tokens": int(completion),
+                }
+                for name, (calls, seconds, prompt, completion) in request.models.items()
+            },
+            "tools": {
+                name: {"calls": int(calls), "time_ms": round(seconds * 1000, 3)}
+                for name, (calls, seconds) in request.tools.items()
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        """
+        Running totals in the Prometheus text exposition format
+
+        Returns:
+            Exposition text, e.g. for a /metrics endpoint
+        """
+        with self._lock:
+            agents = dict(self._agents)
+            models = dict(self._models)
+            tools = dict(self._tools)
+            requests_total = self._requests_total
+            request_seconds = self._request_seconds
+
+        lines: List[str] = []
+        _summary(
+            lines,
+            "request_seconds",
+            "Wall time of whole requests",
+            [({}, requests_total, request_seconds)],
+        )
+        _summary(
+            lines,
+            "agent_seconds",
+            "Wall time per agent run",
+            [
+                ({"agent": name}, runs, seconds)
+                for name, (runs, seconds, *_) in agents.items()
+            ],
+        )
+        _summary(
+            lines,
+            "llm_seconds",
+            "Wall time per LLM call",
+            [
+                ({"agent": name}, calls, seconds)
+                for name, (calls, seconds, *_) in models.items()
+            ],
+        )
+        _metric(
+            lines,
+            "llm_tokens_total",
+            "counter",
+            "LLM tokens by agent and direction",
+            [
+                ({"agent": name, "type": kind}, value[index])
+                for name, value in models.items()
+                for kind, index in (("prompt", 2), ("completion", 3))
+            ],
+        )
+        _summary(
+            lines,
+            "tool_seconds",
+            "Wall time per tool call",
+            [
+                ({"tool": name}, calls, seconds)
+                for name, (calls, seconds) in tools.items()
+            ],
+        )
+        _metric(
+            lines,
+            "process_resident_memory_bytes",
+            "gauge",
+            "Resident memory of the process",
+            [({}, resident_memory_bytes())],
+        )
+        return "\n".join(lines) + "\n"
+
+    def _request(self, invocation_id: str) -> _Request:
+        request = self._requests.get(invocation_id)
+        if request is None:
+            request = self._requests[invocation_id] = _Request()
+        return request
+
+
+def _add(total: List[float], *values: float) -> None:
+    for index, value in enumerate(values):
+        total[index] += value
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric(
+    lines: List[str],
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: List[Tuple[Dict[str, str], float]],
+) -> None:
+    name = f"{METRIC_PREFIX}_{name}"
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {value:g}")
+
+
+def _summary(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    samples: List[Tuple[Dict[str, str], float, float]],
+) -> None:
+    name = f"{METRIC_PREFIX}_{name}"
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} summary")
+    for labels, count, total in samples:
+        lines.append(f"{name}_count{_labels(labels)} {count:g}")
+        lines.append(f"{name}_sum{_labels(labels)} {total:g}")
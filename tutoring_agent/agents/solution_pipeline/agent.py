@@ -5,16 +5,81 @@ This implementation uses ParallelAgent to process independent solution component
 concurrently, dramatically improving performance for complex educational queries.
 """
 
+from typing import Any, Dict, Optional
+
 from google.adk.agents import SequentialAgent, ParallelAgent
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.tools import google_search
 
+from ...tools.curriculum_index import curriculum_knowledge
+from ...tools.json_repair import parse_json_object
+from ...tools.search_cache import (
+    SEARCH_CACHE_VERSION,
+    get_search_cache,
+    search_cache_key,
+)
+from ...tools.text_processing import detect_language
+from ..callbacks import (
+    add_callback,
+    formatted_notation,
+    local_state_response,
+    prompt_fingerprint,
+    single_flight_response,
+    user_text,
+)
+from ..state_projection import ProjectedInstruction
+
+
+def retrieve_curriculum_knowledge(
+    callback_context: CallbackContext,
+) -> Optional[Dict[str, Any]]:
+    """
+    Answer KnowledgeRetriever from the local curriculum index
+
+    Args:
+        callback_context: Context whose state holds preliminary_search_context
+
+    Returns:
+        knowledge_content dictionary, or None to search the web when local
+        recall is poor
+    """
+    search_context = parse_json_object(
+        callback_context.state.get("preliminary_search_context")
+    )
+    return curriculum_knowledge(search_context or {}, user_text(callback_context))
+
+
+def knowledge_search(callback_context: CallbackContext) -> Optional[str]:
+    """
+    Search cache key for KnowledgeRetriever's web search
+
+    Args:
+        callback_context: Context whose state holds preliminary_search_context
+
+    Returns:
+        Key from the primary and Bengali search terms, or from the question
+        when the context has none, plus the question's language
+    """
+    question = user_text(callback_context)
+    search_context = (
+        parse_json_object(callback_context.state.get("preliminary_search_context"))
+        or {}
+    )
+    terms = [
+        *(search_context.get("primary_search_terms") or []),
+        *(search_context.get("bengali_search_terms") or []),
+    ] or [search_context.get("original_question") or question]
+    return search_cache_key(terms, detect_language(question))
+
+
 # Enhanced knowledge agents for parallel processing
 knowledge_retriever = LlmAgent(
     name="KnowledgeRetriever",
     model="gemini-2.0-flash",
     tools=[google_search],
-    instruction="""
+    instruction=ProjectedInstruction(
+        """
     You are an advanced educational knowledge retrieval agent that performs comprehensive web searches using structured search context.
 
     **Available Search Context:**
@@ -183,15 +248,35 @@ knowledge_retriever = LlmAgent(
 
     Your goal is to gather comprehensive, educationally valuable content by systematically utilizing every element of the preliminary search context structure for maximum search effectiveness and educational impact.
     """,
+        {"preliminary_search_context": None},
+    ),
     description="Comprehensive knowledge retrieval using all preliminary search context data for targeted educational content gathering",
+    # Textbook passages and notes from the local index answer without a model
+    # call; the web is searched only when they cover too few search terms
+    before_model_callback=local_state_response(retrieve_curriculum_knowledge),
     output_key="knowledge_content",
 )
 
+# Web search results are shared between students asking the same question,
+# and identical searches in flight at the same time run once. The cache is
+# consulted only after the local curriculum index had too little, and its
+# version tag changes with KnowledgeRetriever's prompt.
+search_cache = get_search_cache(
+    version=f"{SEARCH_CACHE_VERSION}-{prompt_fingerprint(knowledge_retriever)}"
+)
+use_cached_search, cache_search, release_search = single_flight_response(
+    search_cache, knowledge_search
+)
+add_callback(knowledge_retriever, "before_model_callback", use_cached_search, False)
+add_callback(knowledge_retriever, "after_model_callback", cache_search, False)
+add_callback(knowledge_retriever, "after_agent_callback", release_search, False)
+
 # Context enrichment agent (runs in parallel)
 context_enricher_agent = LlmAgent(
     name="ContextEnricherAgent",
     model="gemini-2.0-flash",
-    instruction="""
+    instruction=ProjectedInstruction(
+        """
     You are an educational context enrichment agent that enhances learning content using comprehensive contextual analysis data.
 
     **Available Context Analysis:**
@@ -306,6 +391,24 @@ context_enricher_agent = LlmAgent(
 
     Your goal is to transform the contextual analysis into rich, educationally sound, culturally relevant learning experiences that match the specific complexity, subject area, and educational requirements identified in the preliminary context.
     """,
+        {
+            "preliminary_context": (
+                "subject_category",
+                "complexity_level",
+                "question_type",
+                "key_concepts",
+                "mathematical_operations_required",
+                "grade_level_estimate",
+                "processing_priority",
+                "requires_specialized_knowledge",
+                "confidence_score",
+                "analysis_notes",
+                "estimated_solution_steps",
+                "mathematical_tools_needed",
+                "physics_subfield",
+            )
+        },
+    ),
     description="Comprehensive context enrichment using all preliminary context analysis data for enhanced educational experiences",
     output_key="enriched_context",
 )
@@ -313,7 +416,8 @@ context_enricher_agent = LlmAgent(
 example_generator_agent = LlmAgent(
     name="ExampleGeneratorAgent",
     model="gemini-2.0-flash",
-    instruction="""
+    instruction=ProjectedInstruction(
+        """
     You are an advanced example generation agent that creates comprehensive educational examples using detailed input analysis data.
 
     **Available Input Analysis:**
@@ -512,11 +616,98 @@ example_generator_agent = LlmAgent(
 
     Your goal is to create comprehensive, culturally relevant, educationally sound examples that make abstract concepts concrete and accessible for Bangladeshi students while preserving mathematical rigor and accuracy.
     """,
+        {
+            "input_analysis": (
+                "Problem_text",
+                "detected_language",
+                "processing_notes",
+                "confidence_score",
+                "mathematical_content_detected",
+                "mathematical_complexity",
+                "requires_calculus",
+                "requires_vector_analysis",
+                "physics_content_type",
+                "preserved_expressions",
+            )
+        },
+    ),
     description="Advanced example generation using comprehensive input analysis data for culturally relevant, mathematically accurate educational examples",
     output_key="generated_examples",
 )
 
-# Parallel processing stage for independent solution components
+# Processing priorities of questions answered in one or two steps
+FAST_PRIORITIES = ("immediate", "fast")
+
+
+def solution_branch_plan(state: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Pick the ParallelSolutionProcessing branches a question does not need
+
+    Calculations and definitions answered in one or two steps need no web
+    search or pedagogical enrichment, and calculations need no extra
+    examples; basic math problems need no web search. Questions calling for
+    specialized knowledge, or whose analysis cannot be read, run every
+    branch.
+
+    Args:
+        state: Session state holding preliminary_context and input_analysis
+
+    Returns:
+        Branch agent name → reason it is skipped
+    """
+    context = parse_json_object(state.get("preliminary_context"))
+    analysis = parse_json_object(state.get("input_analysis"))
+    if context is None or analysis is None:
+        return {}
+    if context.get("requires_specialized_knowledge"):
+        return {}
+
+    question_type = context.get("question_type")
+    fast = context.get("processing_priority") in FAST_PRIORITIES
+    if fast and question_type == "calculation":
+        reason = "self-contained calculation"
+        return {
+            knowledge_retriever.name: reason,
+            context_enricher_agent.name: reason,
+            example_generator_agent.name: reason,
+        }
+    if fast and question_type == "definition":
+        reason = "short definition"
+        return {knowledge_retriever.name: reason, context_enricher_agent.name: reason}
+    if (
+        question_type == "problem_solving"
+        and analysis.get("mathematical_complexity") == "basic"
+        and context.get("processing_priority") != "complex"
+    ):
+        return {knowledge_retriever.name: "basic math problem"}
+    return {}
+
+
+def skip_branch(agent: LlmAgent) -> None:
+    """
+    Let a branch answer with a placeholder when solution_branch_plan skips it
+
+    The placeholder is stored under the branch's output_key like a model
+    reply, so the synthesizer's instruction template still finds the key.
+    The callback runs before the branch's other model callbacks.
+
+    Args:
+        agent: Branch of ParallelSolutionProcessing
+    """
+
+    def skip(callback_context: CallbackContext) -> Optional[Dict[str, Any]]:
+        reason = solution_branch_plan(callback_context.state).get(agent.name)
+        return None if reason is None else {"skipped": True, "reason": reason}
+
+    skip.__name__ = f"skip_{agent.output_key}"
+    add_callback(agent, "before_model_callback", local_state_response(skip), True)
+
+
+# Parallel processing stage for independent solution components; branches a
+# question does not need answer with a placeholder instead of a model call
+for branch in (knowledge_retriever, context_enricher_agent, example_generator_agent):
+    skip_branch(branch)
+
 parallel_solution_processing = ParallelAgent(
     name="ParallelSolutionProcessing",
     description="Concurrent processing of independent solution components for 30-40% performance improvement",
@@ -527,11 +718,13 @@ parallel_solution_processing = ParallelAgent(
     ],
 )
 
-# Solution synthesizer that combines parallel results
+# Solution synthesizer that combines parallel results; its prompt holds only
+# the fields of each source it draws on
 solution_synthesizer_agent = LlmAgent(
     name="SolutionSynthesizerAgent",
     model="gemini-2.0-flash",
-    instruction="""
+    instruction=ProjectedInstruction(
+        """
     Synthesize parallel processing results into cohesive educational response:
     
     **Input Sources:**
@@ -540,6 +733,9 @@ solution_synthesizer_agent = LlmAgent(
     - preliminary_context: {preliminary_context}
     - enriched_context: {enriched_context}
     - generated_examples: {generated_examples}
+
+    Sources that read {"skipped": true, ...} were not needed for this question;
+    answer from the others.
     
     **Synthesis Process:**
     1. Combine knowledge with context for culturally appropriate response
@@ -557,77 +753,46 @@ solution_synthesizer_agent = LlmAgent(
     
     Create a comprehensive, well-structured educational response.
     """,
+        {
+            "input_analysis": (
+                "Problem_text",
+                "detected_language",
+                "mathematical_complexity",
+                "preserved_expressions",
+            ),
+            "knowledge_content": (
+                "direct_question_content",
+                "core_topic_explanations",
+                "supporting_concepts",
+                "priority_based_content",
+                "misconception_prevention",
+                "curriculum_aligned_content",
+            ),
+            "preliminary_context": (
+                "subject_category",
+                "question_type",
+                "complexity_level",
+                "grade_level_estimate",
+                "key_concepts",
+            ),
+            "enriched_context": (
+                "complexity_appropriate_approach",
+                "concept_scaffolding",
+                "cultural_adaptation",
+                "misconception_prevention",
+                "practical_applications",
+            ),
+            "generated_examples": (
+                "worked_examples",
+                "practice_problems",
+                "real_world_applications",
+            ),
+        },
+    ),
     description="Synthesizes parallel processing results into cohesive educational content",
-    output_key="synthesized_solution",
-)
-
-# Response formatter (final stage)
-response_formatter = LlmAgent(
-    name="ResponseFormatter",
-    model="gemini-2.0-flash",
-    instruction="""
-    You are a technical content formatter that ONLY formats mathematical equations, formulas, and scientific notation WITHOUT altering any content.
-
-    **Input to Format:**
-    {synthesized_solution}
-
-    **CRITICAL RULE:** 
-    Only format mathematical expressions, equations, formulas, and scientific notation. Do NOT add conversational elements, greetings, emojis, or change any text content.
-
-    **Your Only Tasks:**
-
-    1. **Mathematical Expression Formatting:**
-       - Format inline equations: F = ma, E = mc², x² + 2x + 1 = 0
-       - Use proper superscripts: x², a³, 10⁶
-       - Use proper subscripts: H₂O, CO₂, x₁, x₂
-       - Format fractions clearly: ½, ¾, (a+b)/(c+d)
-       - Use mathematical symbols: ±, ≠, ≤, ≥, ∞, √, π, θ, α, β
-
-    2. **Scientific Notation:**
-       - Format: 6.022 × 10²³, 3.0 × 10⁸ m/s
-       - Chemical formulas: H₂SO₄, CaCO₃, NH₄NO₃
-       - Units: m/s², kg⋅m/s², 25°C, 9.8 N
-
-    3. **Step-by-Step Calculations:**
-       - Align equals signs in multi-step solutions
-       - Consistent spacing in calculations
-       - Clear mathematical progression
-
-    **Formatting Examples:**
-
-    **Before:** x^2+2x+1=0
-    **After:** x² + 2x + 1 = 0
-
-    **Before:** F=ma
-    **After:** F = ma
-
-    **Before:** H2SO4
-    **After:** H₂SO₄
-
-    **Before:** 3*10^8 m/s
-    **After:** 3.0 × 10⁸ m/s
-
-    **Before:** sin(theta)=opposite/hypotenuse
-    **After:** sin θ = opposite/hypotenuse
-
-    **What You Must NOT Do:**
-    - Do NOT add any conversational text
-    - Do NOT add greetings, emojis, or decorative elements
-    - Do NOT change the educational content or explanations
-    - Do NOT alter the tone, language, or cultural references
-    - Do NOT add new examples or reorganize content
-    - Do NOT add section headers or restructure content
-
-    **What You Must Do:**
-    - ONLY improve mathematical notation and formatting
-    - PRESERVE all original text exactly as written
-    - MAINTAIN the original structure and organization
-    - FORMAT only mathematical expressions and scientific notation
-    - KEEP all explanations, examples, and cultural content unchanged
-
-    Return the exact same content with only mathematical expressions properly formatted. No other changes allowed.
-    """,
-    description="Technical formatter that only formats mathematical expressions and scientific notation",
+    # Math notation is formatted locally, also while the reply streams, in
+    # place of a second LLM pass over the whole solution
+    after_model_callback=formatted_notation("unicode"),
     output_key="formatted_response",
 )
 
@@ -637,7 +802,6 @@ solution_pipeline_agent = SequentialAgent(
     description="High-performance solution pipeline with parallel processing for 30-40% speed improvement while maintaining educational quality",
     sub_agents=[
         parallel_solution_processing,  # Stage 1: Parallel knowledge gathering and context enrichment
-        solution_synthesizer_agent,  # Stage 2: Sequential synthesis of parallel results
-        response_formatter,  # Stage 3: Final formatting and quality assurance
+        solution_synthesizer_agent,  # Stage 2: Synthesis with local math formatting
     ],
 )
@@ -0,0 +1,159 @@
+"""
+Typed session state for the AI tutoring system
+
+Pydantic models of the JSON objects the classifier and the analysis agents
+store under their output_key. The agents declare them as output_schema, so
+Gemini answers in the schema and ADK stores the validated object in session
+state as a dictionary; downstream callbacks read its fields directly.
+"""
+
+from typing import Any, Dict, List, Optional, Type, TypeVar, get_origin
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from ..tools.json_repair import parse_json_object
+
+StateModelT = TypeVar("StateModelT", bound="StateModel")
+
+
+class StateModel(BaseModel):
+    """
+    Base of the state models
+
+    Every field has a default, so a reply that leaves a field out or sets it
+    to null still validates, and a single string given for a list field is
+    read as a one-item list. Unknown fields are dropped.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _tolerate(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        tolerated = {}
+        for key, value in data.items():
+            if value is None:
+                continue
+            field = cls.model_fields.get(key)
+            if field is not None and get_origin(field.annotation) is list:
+                if isinstance(value, str):
+                    value = [value] if value.strip() else []
+            tolerated[key] = value
+        return tolerated
+
+
+class QueryClassification(StateModel):
+    """query_classification, written by QueryClassifierAgent"""
+
+    # Unsure replies go down the full pipeline, as the classifier is told to
+    classification: str = "COMPLEX_EDUCATIONAL"
+    confidence: float = 0.0
+    reasoning: str = ""
+    estimated_processing_time: str = "standard"
+    detected_mathematical_concepts: List[str] = Field(default_factory=list)
+
+
+class InputAnalysis(StateModel):
+    """input_analysis, written by InputAnalyzerAgent"""
+
+    detected_language: str = "bengali"
+    Problem_text: str = ""
+    is_valid_question: bool = True
+    needs_clarification: bool = False
+    clarification_questions: List[str] = Field(default_factory=list)
+    processing_notes: str = ""
+    confidence_score: float = 0.0
+    language_notes: str = ""
+    mathematical_content_detected: bool = False
+    mathematical_complexity: str = "none"
+    requires_calculus: bool = False
+    requires_vector_analysis: bool = False
+    physics_content_type: str = "none"
+    preserved_expressions: List[str] = Field(default_factory=list)
+
+
+class PreliminaryContext(StateModel):
+    """preliminary_context, written by ContextAnalyzerAgent"""
+
+    subject_category: str = "other"
+    complexity_level: str = "secondary"
+    question_type: str = "explanation"
+    key_concepts: List[str] = Field(default_factory=list)
+    mathematical_operations_required: List[str] = Field(default_factory=list)
+    grade_level_estimate: str = "9-10"
+    processing_priority: str = "standard"
+    requires_specialized_knowledge: bool = False
+    confidence_score: float = 0.0
+    analysis_notes: str = ""
+    estimated_solution_steps: str = "3-5"
+    mathematical_tools_needed: List[str] = Field(default_factory=list)
+    physics_subfield: str = "none"
+
+
+class CurriculumContext(StateModel):
+    """curriculum_context of a PreliminarySearchContext"""
+
+    grade_level: str = "9-10"
+    curriculum_standard: str = "SSC"
+    chapter_references: List[str] = Field(default_factory=list)
+
+
+class PreliminarySearchContext(StateModel):
+    """preliminary_search_context, written by PreliminarySearchAgent"""
+
+    original_question: str = ""
+    primary_search_terms: List[str] = Field(default_factory=list)
+    secondary_search_terms: List[str] = Field(default_factory=list)
+    bengali_search_terms: List[str] = Field(default_factory=list)
+    english_search_terms: List[str] = Field(default_factory=list)
+    subject_domain: str = "general_science"
+    topic_hierarchy: List[str] = Field(default_factory=list)
+    curriculum_context: CurriculumContext = Field(default_factory=CurriculumContext)
+    search_priorities: List[str] = Field(default_factory=list)
+    prerequisite_searches: List[str] = Field(default_factory=list)
+    related_topic_searches: List[str] = Field(default_factory=list)
+    common_misconceptions: List[str] = Field(default_factory=list)
+    search_difficulty: str = "intermediate"
+    recommended_sources: List[str] = Field(default_factory=list)
+    search_notes: str = ""
+
+
+# State key → model of the object stored under it
+STATE_MODELS: Dict[str, Type[StateModel]] = {
+    "query_classification": QueryClassification,
+    "input_analysis": InputAnalysis,
+    "preliminary_context": PreliminaryContext,
+    "preliminary_search_context": PreliminarySearchContext,
+}
+
+
+def validate_state(model: Type[StateModelT], value: Any) -> Optional[StateModelT]:
+    """
+    Validate a model reply or state value against a state model
+
+    The value is parsed with parse_json_object, which repairs code fences,
+    trailing commas and similar defects. Fields that still fail validation
+    fall back to their defaults instead of failing the whole object.
+
+    Args:
+        model: State model class
+        value: Dictionary, or model text holding a JSON object
+
+    Returns:
+        Validated model, or None if no JSON object can be recovered
+    """
+    data = parse_json_object(value)
+    if data is None:
+        return None
+    data = dict(data)
+    while True:
+        try:
+            return model.model_validate(data)
+        except ValidationError as error:
+            invalid = {
+                str(detail["loc"][0]) for detail in error.errors() if detail["loc"]
+            }
+            if not invalid & data.keys():
+                return model()
+            for key in invalid:
+                data.pop(key, None)
@@ -0,0 +1,160 @@
+"""
+Compact views of session state for agent instructions
+
+ADK fills an instruction's {key} placeholders with the whole state value, so
+an agent that reads two fields of a pipeline's JSON output still pays for
+every field of it in prompt tokens. An agent built with ProjectedInstruction
+names the fields it reads instead, and gets them rendered as compact JSON,
+with empty fields dropped and long text cut to a budget.
+"""
+
+import json
+import re
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+from ..tools.json_repair import parse_json_object
+
+# Characters a state value may take up in an instruction
+VIEW_MAX_CHARS = 1500
+
+# Floor of the characters kept of a single text field when a view is shrunk
+MIN_FIELD_CHARS = 80
+
+# Items kept of a list field
+MAX_LIST_ITEMS = 5
+
+# {key} and {key?} placeholders as ADK reads them
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)(\??)\}")
+
+# Field names → None to keep every field of the value
+StateViews = Dict[str, Optional[Sequence[str]]]
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def _compact(value: Any, limit: int) -> Any:
+    """Drop empty values and cut text and lists in value, recursively"""
+    if isinstance(value, str):
+        return _truncate(value.strip(), limit)
+    if isinstance(value, dict):
+        items = ((key, _compact(item, limit)) for key, item in value.items())
+        return {key: item for key, item in items if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        items = (_compact(item, limit) for item in value[:MAX_LIST_ITEMS])
+        return [item for item in items if item not in (None, "", [], {})]
+    return value
+
+
+def project_state(
+    value: Any,
+    fields: Optional[Sequence[str]] = None,
+    max_chars: int = VIEW_MAX_CHARS,
+) -> str:
+    """
+    Render the fields of a state value an agent reads
+
+    Fields the value does not have are ignored; a value with none of the
+    fields, such as a skipped branch's placeholder, is kept whole. Text that
+    is not a JSON object is cut to max_chars.
+
+    Args:
+        value: State value, a JSON object as text or a dictionary
+        fields: Top-level fields to keep, in the order given, or None for all
+        max_chars: Character budget of the rendered view
+
+    Returns:
+        Compact JSON, or the truncated text
+    """
+    data = parse_json_object(value)
+    if data is None:
+        return _truncate(str(value).strip(), max_chars)
+    if fields is not None and any(field in data for field in fields):
+        data = {field: data[field] for field in fields if field in data}
+
+    # Text fields share the budget; the share halves until the view fits
+    share = max_chars // max(1, len(data))
+    while True:
+        text = json.dumps(
+            _compact(data, share), ensure_ascii=False, separators=(",", ":")
+        )
+        if len(text) <= max_chars or share <= MIN_FIELD_CHARS:
+            return text
+        share = max(MIN_FIELD_CHARS, share // 2)
+
+
+def render_instruction(
+    template: str,
+    state: Mapping[str, Any],
+    views: Optional[StateViews] = None,
+    max_chars: int = VIEW_MAX_CHARS,
+) -> str:
+    """
+    Fill an instruction template's placeholders from session state
+
+    Keys with a view are rendered with project_state; other keys are
+    filled with the whole value, as ADK does.
+
+    Args:
+        template: Instruction with {key} and optional {key?} placeholders
+        state: Session state
+        views: State key → fields the agent reads
+        max_chars: Character budget of each projected value
+
+    Returns:
+        Instruction text
+
+    Raises:
+        KeyError: A placeholder without "?" names a key missing from state
+    """
+    views = views or {}
+
+    def fill(match: re.Match) -> str:
+        key, optional = match.groups()
+        if key not in state:
+            if optional:
+                return ""
+            raise KeyError(f"Context variable not found: `{key}`.")
+        if key in views:
+            return project_state(state[key], views[key], max_chars)
+        return str(state[key])
+
+    return _PLACEHOLDER.sub(fill, template)
+
+
+class ProjectedInstruction:
+    """
+    Instruction provider that renders compact views of the state it reads
+
+    Set as an LlmAgent's instruction in place of the template string. The
+    template keeps ADK's placeholder syntax, so the instruction reads the
+    same in code; only the keys listed in views are projected.
+    """
+
+    def __init__(
+        self, template: str, views: StateViews, max_chars: int = VIEW_MAX_CHARS
+    ):
+        """
+        Args:
+            template: Instruction with {key} placeholders
+            views: State key → top-level fields the agent reads, or None to
+                keep every non-empty field
+            max_chars: Character budget of each projected value
+        """
+        self.template = template
+        self.views = views
+        self.max_chars = max_chars
+
+    @property
+    def source(self) -> str:
+        """Template and views, for prompt fingerprints"""
+        views = json.dumps(self.views, sort_keys=True)
+        return f"{self.template}\x1f{views}\x1f{self.max_chars}"
+
+    def __call__(self, context: ReadonlyContext) -> str:
+        return render_instruction(
+            self.template, context.state, self.views, self.max_chars
+        )
@@ -0,0 +1,359 @@
+"""
+OpenTelemetry tracing for the AI tutoring system
+
+Builds one span tree per request from ADK callbacks: a span for every agent
+run (sequential and parallel stages included), every model call and every
+tool call, with agent names, token counts and the route each router took.
+Spans go to local exporters (in memory or a JSON lines file), so the timing
+of parallel stages can be inspected without a collector. While tracing is
+disabled each callback returns after a single attribute check.
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from .callbacks import add_callback, walk_agents
+
+SERVICE_NAME = "tutoring_agent"
+
+# Set on the span of an agent that handed the turn to another agent
+ROUTE_ATTRIBUTE = "tutoring.route"
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON object per line"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Output file; created if missing
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(
+            json.dumps(json.loads(span.to_json()), ensure_ascii=False) + "\n"
+            for span in spans
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _Trace:
+    """Open spans of one invocation"""
+
+    def __init__(self):
+        # (agent name, kind) or (tool name, call id) → open spans, innermost last
+        self.open: Dict[Tuple[str, str], List[trace.Span]] = {}
+
+    def push(self, key: Tuple[str, str], span: trace.Span) -> None:
+        self.open.setdefault(key, []).append(span)
+
+    def pop(self, key: Tuple[str, str]) -> Optional[trace.Span]:
+        spans = self.open.get(key)
+        return spans.pop() if spans else None
+
+    def peek(self, key: Tuple[str, str]) -> Optional[trace.Span]:
+        spans = self.open.get(key)
+        return spans[-1] if spans else None
+
+
+class AgentTracer:
+    """
+    Emits OpenTelemetry spans for an agent tree through ADK callbacks
+
+    instrument() adds the callbacks once; enable() and disable() switch span
+    recording on and off at any time. Agent and model spans start in the last
+    before-callback, so agents answered from a cache and model calls answered
+    by a local callback get no span, and end in the first after-callback.
+    Spans are parented by the agent tree, which keeps the branches of a
+    ParallelAgent side by side under their stage.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._provider: Optional[TracerProvider] = None
+        self._tracer: Optional[trace.Tracer] = None
+        self._traces: Dict[str, _Trace] = {}
+        # agent name → (agent class name, parent agent name)
+        self._agents: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._root: Optional[str] = None
+
+    def instrument(self, root: BaseAgent) -> None:
+        """
+        Add the tracer's callbacks to every agent under root
+
+        Args:
+            root: Agent the runner starts; its span is the root of each trace
+        """
+        self._root = root.name
+        for agent in walk_agents(root):
+            parent = agent.parent_agent.name if agent.parent_agent else None
+            self._agents[agent.name] = (type(agent).__name__, parent)
+            add_callback(agent, "before_agent_callback", self.before_agent, False)
+            add_callback(agent, "after_agent_callback", self.after_agent, True)
+            if isinstance(agent, LlmAgent):
+                add_callback(agent, "before_model_callback", self.before_model, False)
+                add_callback(agent, "after_model_callback", self.after_model, True)
+                add_callback(agent, "before_tool_callback", self.before_tool, False)
+                add_callback(agent, "after_tool_callback", self.after_tool, True)
+
+    def enable(self, *exporters: SpanExporter) -> TracerProvider:
+        """
+        Start recording spans
+
+        Args:
+            exporters: Where finished spans go; an InMemorySpanExporter is
+                used when none is given
+
+        Returns:
+            The tracer provider, e.g. to add more span processors
+        """
+        self.disable()
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": SERVICE_NAME})
+        )
+        for exporter in exporters or (InMemorySpanExporter(),):
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+        self._provider = provider
+        self._tracer = provider.get_tracer(SERVICE_NAME)
+        self.enabled = True
+        return provider
+
+    def disable(self) -> None:
+        """Stop recording spans and flush the exporters"""
+        self.enabled = False
+        if self._provider is not None:
+            self._provider.shutdown()
+        self._provider = self._tracer = None
+        self._traces.clear()
+
+    def before_agent(self, callback_context: CallbackContext) -> None:
+        if not self.enabled:
+            return None
+        name = callback_context.agent_name
+        kind, parent = self._agents.get(name, ("BaseAgent", None))
+        current = self._traces.setdefault(callback_context.invocation_id, _Trace())
+        span = self._start(
+            f"invoke_agent {name}",
+            current.peek((parent, "agent")) if parent else None,
+            {
+                "gen_ai.agent.name": name,
+                "tutoring.agent.kind": kind,
+                "tutoring.invocation_id": callback_context.invocation_id,
+            },
+        )
+        current.push((name, "agent"), span)
+
+    def after_agent(self, callback_context: CallbackContext) -> None:
+        current = self._traces.get(callback_context.invocation_id)
+        if not self.enabled or current is None:
+            return None
+        span = current.pop((callback_context.agent_name, "agent"))
+        if span is not None:
+            span.end()
+        if callback_context.agent_name == self._root:
+            # Spans still open belong to runs that ended early, e.g. on errors
+            for spans in current.open.values():
+                for span in spans:
+                    span.end()
+            del self._traces[callback_context.invocation_id]
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        current = self._traces.get(callback_context.invocation_id)
+        if not self.enabled or current is None:
+            return None
+        name = callback_context.agent_name
+        span = self._start(
+            f"chat {llm_request.model or ''}".strip(),
+            current.peek((name, "agent")),
+            {
+                "gen_ai.agent.name": name,
+                "gen_ai.request.model": llm_request.model or "",
+            },
+        )
+        current.push((name, "model"), span)
+
+    def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        current = self._traces.get(callback_context.invocation_id)
+        if not self.enabled or current is None:
+            return None
+        span = current.pop((callback_context.agent_name, "model"))
+        if span is None:
+            return None
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            span.set_attribute(
+                "gen_ai.usage.input_tokens", usage.prompt_token_count or 0
+            )
+            span.set_attribute(
+                "gen_ai.usage.output_tokens", usage.candidates_token_count or 0
+            )
+        if llm_response.error_code:
+            span.set_status(trace.StatusCode.ERROR, llm_response.error_message)
+        span.end()
+
+    def before_tool(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        current = self._traces.get(tool_context.invocation_id)
+        if not self.enabled or current is None:
+            return None
+        agent_span = current.peek((tool_context.agent_name, "agent"))
+        if tool.name == "transfer_to_agent" and agent_span is not None:
+            agent_span.set_attribute(ROUTE_ATTRIBUTE, str(args.get("agent_name")))
+        span = self._start(
+            f"execute_tool {tool.name}",
+            agent_span,
+            {
+                "gen_ai.agent.name": tool_context.agent_name,
+                "gen_ai.tool.name": tool.name,
+                "gen_ai.tool.call.id": tool_context.function_call_id or "",
+            },
+        )
+        current.push((tool.name, tool_context.function_call_id or ""), span)
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> None:
+        current = self._traces.get(tool_context.invocation_id)
+        if not self.enabled or current is None:
+            return None
+        span = current.pop((tool.name, tool_context.function_call_id or ""))
+        if span is not None:
+            span.end()
+
+    def _start(
+        self, name: str, parent: Optional[trace.Span], attributes: Dict[str, Any]
+    ) -> trace.Span:
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        return self._tracer.start_span(name, context=context, attributes=attributes)
+
+
+def span_tree(spans: Sequence[ReadableSpan]) -> List[str]:
+    """
+    Render finished spans as an indented tree
+
+    Args:
+        spans: Spans of one or more traces, e.g. from
+            InMemorySpanExporter.get_finished_spans()
+
+    Returns:
+        One line per span: start offset and duration in milliseconds from the
+        start of its trace, then the span name and route if any
+    """
+    children: Dict[Optional[int], List[ReadableSpan]] = {}
+    span_ids = {span.context.span_id for span in spans}
+    for span in spans:
+        parent = span.parent.span_id if span.parent else None
+        children.setdefault(parent if parent in span_ids else None, []).append(span)
+
+    lines: List[str] = []
+
+    def render(span: ReadableSpan, depth: int, origin: int) -> None:
+        offset = (span.start_time - origin) / 1e6
+        duration = (span.end_time - span.start_time) / 1e6
+        route = span.attributes.get(ROUTE_ATTRIBUTE)
+        lines.append(
+            f"{offset:8.1f} {duration:8.1f}  {'  ' * depth}{span.name}"
+            + (f" → {route}" if route else "")
+        )
+        for child in sorted(children.get(span.context.span_id, []), key=_start_time):
+            render(child, depth + 1, origin)
+
+    for root in sorted(children.get(None, []), key=_start_time):
+        render(root, 0, root.start_time)
+    return lines
+
+
+def parallel_overlap(spans: Sequence[ReadableSpan], agent_name: str) -> List[Dict]:
+    """
+    How well the branches of a ParallelAgent overlapped in each run
+
+    Args:
+        spans: Finished spans
+        agent_name: Name of the ParallelAgent
+
+    Returns:
+        One dictionary per run with wall_ms, branch_ms (branch → duration),
+        overlap (summed branch time over wall time; the number of branches
+        for perfect overlap, 1.0 for none), critical_branch (the branch that
+        finished last) and slack_ms (branch → time it finished before the
+        critical branch)
+    """
+    runs = []
+    for stage in spans:
+        if stage.name != f"invoke_agent {agent_name}":
+            continue
+        branches = [
+            span
+            for span in spans
+            if span.parent
+            and span.parent.span_id == stage.context.span_id
+            and span.name.startswith("invoke_agent ")
+        ]
+        if not branches:
+            continue
+        wall = (stage.end_time - stage.start_time) / 1e6
+        critical = max(branches, key=lambda span: span.end_time)
+        runs.append(
+            {
+                "wall_ms": wall,
+                "branch_ms": {
+                    _agent_name(span): (span.end_time - span.start_time) / 1e6
+                    for span in branches
+                },
+                "overlap": (
+                    sum(span.end_time - span.start_time for span in branches)
+                    / 1e6
+                    / wall
+                    if wall
+                    else 0.0
+                ),
+                "critical_branch": _agent_name(critical),
+                "slack_ms": {
+                    _agent_name(span): (critical.end_time - span.end_time) / 1e6
+                    for span in branches
+                },
+            }
+        )
+    return runs
+
+
+def _start_time(span: ReadableSpan) -> int:
+    return span.start_time
+
+
+def _agent_name(span: ReadableSpan) -> str:
+    return str(span.attributes.get("gen_ai.agent.name", span.name))
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the AI tutoring system
+
+Each module can be run directly, e.g. ``python -m tutoring_agent.bench.text_processing``
+"""
@@ -0,0 +1,175 @@
+"""
+Branch skipping benchmark: ParallelSolutionProcessing on a question mix
+
+Sends calculations, definitions, basic problems and explanations through the
+full analysis and solution pipelines of root_agent on a stub model, once with
+every parallel solution branch running and once with the branches that
+solution_branch_plan skips answering with placeholders. KnowledgeRetriever
+calls take as long as a grounded web search. Run with:
+
+    python -m tutoring_agent.bench.branch_skipping
+"""
+
+import asyncio
+import contextlib
+import logging
+import statistics
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+from ..agent import root_agent
+from ..agents.solution_pipeline.agent import (
+    knowledge_retriever,
+    parallel_solution_processing,
+    solution_branch_plan,
+)
+from ..tools.context_analysis import analyze_context
+from ..tools.input_analysis import analyze_input
+from .curriculum_index import WEB_SEARCH_LATENCY
+from .equation_solving import STUB_LATENCY, run_question
+from .fast_track_routing import model_routing
+from .stub_model import StubLlm, use_model
+
+# (question, kind) of questions that reach the solution pipeline
+QUESTION_MIX: List[Tuple[str, str]] = [
+    ("What is 3/4 of 20?", "calculation"),
+    ("What is 2^10?", "calculation"),
+    ("sqrt(144)", "calculation"),
+    ("২৫ × ৪ কত?", "calculation"),
+    ("Define acceleration", "definition"),
+    ("Define velocity", "definition"),
+    ("Solve 2x + 5 = 13", "basic problem"),
+    ("x + y = 5, x - y = 1 সমাধান কর", "basic problem"),
+    (
+        "A car accelerates from rest to 20 m/s in 5 s. Find its acceleration.",
+        "basic problem",
+    ),
+    ("Explain photosynthesis process in plants", "explanation"),
+    ("How do vaccines help the immune system?", "explanation"),
+    ("আলোর প্রতিসরণ কেন হয় ব্যাখ্যা কর", "explanation"),
+    ("Why do noble gases not react easily?", "explanation"),
+    ("Solve the quadratic equation 2x^2 + 5x - 3 = 0 step by step", "explanation"),
+    (
+        "Derive the trajectory equation of a projectile launched at angle θ",
+        "explanation",
+    ),
+]
+
+
+@contextlib.contextmanager
+def every_branch() -> Iterator[None]:
+    """Run every parallel solution branch, as before branch skipping"""
+    saved = []
+    for branch in parallel_solution_processing.sub_agents:
+        saved.append((branch, branch.before_model_callback))
+        branch.before_model_callback = [
+            callback
+            for callback in branch.canonical_before_model_callbacks
+            if not callback.__name__.startswith("local_skip_")
+        ]
+    try:
+        yield
+    finally:
+        for branch, callbacks in saved:
+            branch.before_model_callback = callbacks
+
+
+def skipped_branches(question: str) -> List[str]:
+    """Branches the plan skips for the stub model's analysis of question"""
+    state = {
+        "preliminary_context": analyze_context(question),
+        "input_analysis": analyze_input(question),
+    }
+    return sorted(solution_branch_plan(state))
+
+
+async def benchmark_mix(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, str, List[str], int, float, int, float]]:
+    """
+    Run every question with every branch and with branch skipping
+
+    Returns:
+        List of (question, kind, skipped branches, baseline calls, baseline
+        seconds, calls, seconds) rows
+    """
+    model = StubLlm(
+        latency=latency,
+        agent_latency={knowledge_retriever.name: WEB_SEARCH_LATENCY},
+        transfers={
+            "ConversationRouter": "AnalysisPipelineAgent",
+            "QuestionAnalyzer": "SolutionPipelineAgent",
+        },
+    )
+    rows = []
+    with use_model(root_agent, model), model_routing():
+        for question, kind in QUESTION_MIX:
+            with every_branch():
+                baseline = await run_question(root_agent, model, question)
+            current = await run_question(root_agent, model, question)
+            rows.append(
+                (question, kind, skipped_branches(question), *baseline, *current)
+            )
+    return rows
+
+
+def summarize(
+    rows: List[Tuple[str, str, List[str], int, float, int, float]],
+) -> Dict[str, Tuple[int, float, float, float, float, float]]:
+    """
+    Aggregate the rows per question kind and overall
+
+    Returns:
+        Kind → (questions, skip rate, baseline calls, calls, baseline
+        seconds, seconds), averaged per question
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row[1]].append(row)
+    groups["all"] = rows
+    branches = len(parallel_solution_processing.sub_agents)
+    summary = {}
+    for kind, group in groups.items():
+        summary[kind] = (
+            len(group),
+            sum(len(row[2]) for row in group) / (branches * len(group)),
+            statistics.mean(row[3] for row in group),
+            statistics.mean(row[5] for row in group),
+            statistics.mean(row[4] for row in group),
+            statistics.mean(row[6] for row in group),
+        )
+    return summary
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    rows = asyncio.run(benchmark_mix())
+    print(
+        f"Stub model: {STUB_LATENCY * 1000:.0f} ms per call, "
+        f"{WEB_SEARCH_LATENCY * 1000:.0f} ms per web-grounded retrieval\n"
+    )
+    print(f"{'question':<50} {'skipped branches':<58} {'calls':>9} {'seconds':>11}")
+    for question, _, skipped, base_calls, base_s, calls, seconds in rows:
+        print(
+            f"{question[:50]:<50} {', '.join(skipped) or '-':<58} "
+            f"{base_calls:>4} → {calls:<2} {base_s:>5.2f} → {seconds:.2f}"
+        )
+
+    print(
+        f"\n{'kind':<14} {'questions':>9} {'skip rate':>9} {'calls':>11} "
+        f"{'seconds':>13}"
+    )
+    for kind, (count, rate, base_calls, calls, base_s, seconds) in summarize(
+        rows
+    ).items():
+        print(
+            f"{kind:<14} {count:>9} {rate:>9.0%} {base_calls:>4.1f} → {calls:<4.1f} "
+            f"{base_s:>5.2f} → {seconds:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
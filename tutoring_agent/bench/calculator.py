@@ -0,0 +1,199 @@
+"""
+Benchmark and adversarial checks for the safe calculator
+
+Compares the AST evaluator with the old regex + eval calculator on ordinary
+homework expressions, cross-checks results against eval on random
+expressions, and confirms that hostile inputs are rejected quickly. Run with:
+
+    python -m tutoring_agent.bench.calculator
+"""
+
+import random
+import re
+import time
+from typing import Callable, List, Tuple
+
+from ..tools import calculator
+from ..tools.calculator import CalculationError, evaluate_expression
+from .text_processing import print_rows, time_per_call
+
+# Expressions students send to the fast-track calculator
+HOMEWORK_EXPRESSIONS = [
+    "15 * 8",
+    "2 + 3 * 4",
+    "(12 + 8) / 4 - 3",
+    "3.5 * 4 + 2.25",
+    "2**10 - 24",
+    "((7 + 5) * (9 - 4)) / (2 + 1)",
+]
+
+# Inputs that must be rejected, each within ADVERSARIAL_BUDGET seconds
+ADVERSARIAL_INPUTS = [
+    "9**9**9**9",
+    "2**2**2**2**2**2",
+    "10**10**10",
+    "(10**15)**100",
+    "99999999999999999999",
+    "1e308 * 1e308",
+    "(-8)**(1/3)",
+    "1/0",
+    "0**-1",
+    "__import__('os').system('ls')",
+    "().__class__.__bases__[0].__subclasses__()",
+    "[1] * 10**9",
+    "'a' * 10**9",
+    "lambda: 1",
+    "True + 1",
+    "1j * 1j",
+    "x + 1",
+    "(" * 200 + "1" + ")" * 200,
+    "-" * 255 + "1",
+    "+".join(["1"] * 60),
+    "9" * 1000,
+]
+
+ADVERSARIAL_BUDGET = 0.01
+
+_LEGACY_PATTERN = re.compile(r"^[0-9+\-*/().\s]+$")
+
+
+def legacy_calculate(expression: str) -> object:
+    """The regex-validated eval used by simple_calculator before the AST evaluator"""
+    expr = expression.strip().replace(" ", "")
+    if not _LEGACY_PATTERN.match(expr):
+        raise ValueError("Invalid expression")
+    return eval(expr)
+
+
+def make_random_expression(rng: random.Random, depth: int = 3) -> str:
+    """
+    Build a random parenthesized expression over small integers
+
+    Args:
+        rng: Random number generator
+        depth: Maximum nesting depth
+
+    Returns:
+        Expression using + - * / and unary minus
+    """
+    if depth == 0 or rng.random() < 0.3:
+        number = str(rng.randint(0, 20))
+        return f"-{number}" if rng.random() < 0.1 else number
+    left = make_random_expression(rng, depth - 1)
+    right = make_random_expression(rng, depth - 1)
+    return f"({left} {rng.choice('+-*/')} {right})"
+
+
+def check_against_eval(count: int = 2_000, seed: int = 0) -> Tuple[int, int]:
+    """
+    Compare the evaluator with eval on random expressions
+
+    Args:
+        count: Number of expressions
+        seed: Random seed
+
+    Returns:
+        Tuple of (expressions compared, mismatches)
+    """
+    rng = random.Random(seed)
+    compared = mismatches = 0
+    for _ in range(count):
+        expression = make_random_expression(rng)
+        try:
+            expected = eval(expression)
+        except ZeroDivisionError:
+            expected = None
+        try:
+            result = evaluate_expression(expression)["result"]
+        except CalculationError:
+            result = None
+        compared += 1
+        if (expected is None) != (result is None) or (
+            expected is not None
+            and abs(expected - result) > 1e-9 * max(1, abs(expected))
+        ):
+            mismatches += 1
+            print(f"  mismatch: {expression} eval={expected} ast={result}")
+    return compared, mismatches
+
+
+def check_adversarial_inputs() -> List[Tuple[str, str, float]]:
+    """
+    Evaluate every adversarial input and time the rejection
+
+    Returns:
+        List of (input, rejection reason, microseconds) rows
+
+    Raises:
+        AssertionError: If an input is accepted or takes longer than
+            ADVERSARIAL_BUDGET
+    """
+    rows = []
+    for expression in ADVERSARIAL_INPUTS:
+        start = time.perf_counter()
+        try:
+            evaluate_expression(expression)
+        except CalculationError as error:
+            reason = str(error)
+        else:
+            raise AssertionError(f"accepted adversarial input {expression!r}")
+        elapsed = time.perf_counter() - start
+        assert elapsed < ADVERSARIAL_BUDGET, f"{expression!r} took {elapsed:.3f}s"
+        label = expression if len(expression) <= 30 else expression[:27] + "..."
+        rows.append((label, reason, elapsed * 1e6))
+    return rows
+
+
+def benchmark_calculator() -> List[Tuple[str, str, float]]:
+    """
+    Time the legacy eval calculator and the AST evaluator on homework input
+
+    The uncached row clears the parse cache before every call; the cached
+    row is the steady state for repeated expressions.
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    label = f"{len(HOMEWORK_EXPRESSIONS)} expr"
+
+    def run(evaluate: Callable[[str], object], clear: bool = False) -> None:
+        for expression in HOMEWORK_EXPRESSIONS:
+            if clear:
+                calculator._parse.cache_clear()
+            evaluate(expression)
+
+    per_call = len(HOMEWORK_EXPRESSIONS)
+    return [
+        ("legacy eval", label, time_per_call(lambda: run(legacy_calculate)) / per_call),
+        (
+            "ast uncached",
+            label,
+            time_per_call(lambda: run(evaluate_expression, clear=True)) / per_call,
+        ),
+        (
+            "ast cached",
+            label,
+            time_per_call(lambda: run(evaluate_expression)) / per_call,
+        ),
+        (
+            "ast cached exact",
+            label,
+            time_per_call(lambda: run(lambda e: evaluate_expression(e, exact=True)))
+            / per_call,
+        ),
+    ]
+
+
+def main() -> None:
+    print_rows("Calculator", benchmark_calculator())
+
+    compared, mismatches = check_against_eval()
+    print(f"\nRandom expressions vs eval: {compared} compared, {mismatches} mismatches")
+
+    print(f"\nAdversarial inputs (budget {ADVERSARIAL_BUDGET * 1e3:.0f} ms each)")
+    for expression, reason, micros in check_adversarial_inputs():
+        print(f"{expression:<32} {reason:<58} {micros:>8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
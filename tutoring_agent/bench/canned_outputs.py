@@ -0,0 +1,173 @@
+"""
+Canned agent outputs for the stub model
+
+Each function returns what an agent with the given output_key is instructed
+to produce, built deterministically from the question, so downstream agents
+and callbacks that parse session state see the same shapes as with Gemini.
+The analysis schemas come from the local analysis tools; the solution
+pipeline schemas follow the JSON structures in the agent instructions.
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+from ..tools.context_analysis import analyze_context
+from ..tools.input_analysis import analyze_input
+from ..tools.query_classifier import classify_query
+from ..tools.text_processing import analyze_question
+
+
+def _classification(question: str) -> Dict[str, Any]:
+    # The local classifier's label with the confidence a model would report,
+    # so the router acts on it instead of asking its own model
+    return {
+        **classify_query(question),
+        "confidence": 0.9,
+        "reasoning": "Stub model classification",
+    }
+
+
+def _search_context(question: str) -> Dict[str, Any]:
+    analysis = analyze_question(question)
+    subject = analysis["subject"]
+    terms = subject["matched_keywords"] or [subject["subject"]]
+    return {
+        "original_question": question,
+        "primary_search_terms": terms,
+        "secondary_search_terms": [],
+        "bengali_search_terms": [],
+        "english_search_terms": terms,
+        "subject_domain": subject["subject"],
+        "topic_hierarchy": [subject["subject"], *terms[:2]],
+        "curriculum_context": {
+            "grade_level": analysis["grade_level"]["grade_level"],
+            "curriculum_standard": "SSC",
+            "chapter_references": [],
+        },
+        "search_priorities": ["definitions", "examples", "procedures"],
+        "prerequisite_searches": [],
+        "related_topic_searches": [],
+        "common_misconceptions": [],
+        "search_difficulty": "intermediate",
+        "recommended_sources": ["step_by_step_examples"],
+        "search_notes": "",
+    }
+
+
+def _knowledge_content(question: str) -> Dict[str, Any]:
+    return {
+        "direct_question_content": f"Content answering: {question}",
+        "core_topic_explanations": "Explanation of the core topic",
+        "supporting_concepts": "Background concepts",
+        "multilingual_resources": "Bengali and English materials",
+        "hierarchical_knowledge": "Topic hierarchy",
+        "curriculum_aligned_content": "Grade-level material",
+        "priority_based_content": {
+            "definitions": "Definitions",
+            "examples": "Worked examples",
+            "procedures": "Step-by-step method",
+            "formulas": "Relevant formulas",
+            "applications": "Applications",
+        },
+        "prerequisite_knowledge": "Prerequisites",
+        "related_topics": "Related topics",
+        "misconception_prevention": "Common errors",
+        "difficulty_appropriate_content": "Content at the right level",
+        "source_specific_materials": "Source material",
+        "visual_and_reference_aids": "Diagrams and references",
+    }
+
+
+def _enriched_context(question: str) -> Dict[str, Any]:
+    fields = [
+        "subject_specific_context",
+        "complexity_appropriate_approach",
+        "question_type_pedagogy",
+        "concept_scaffolding",
+        "operation_specific_guidance",
+        "specialized_knowledge_bridge",
+        "physics_subfield_details",
+        "cultural_adaptation",
+        "learning_progression",
+        "assessment_alignment",
+        "misconception_prevention",
+        "engagement_strategies",
+        "extension_opportunities",
+        "practical_applications",
+    ]
+    return {field: field.replace("_", " ").capitalize() for field in fields}
+
+
+def _generated_examples(question: str) -> Dict[str, Any]:
+    return {
+        "worked_examples": [
+            {
+                "title": "Worked example",
+                "problem_statement": question,
+                "step_by_step_solution": "Step 1. Step 2. Step 3.",
+                "key_concepts_highlighted": [],
+                "cultural_context": "",
+                "common_mistakes_to_avoid": [],
+            }
+        ],
+        "practice_problems": [
+            {
+                "difficulty_level": "basic",
+                "problem": "Practice problem",
+                "hint": "Hint",
+                "answer_key": "Answer",
+            }
+        ],
+        "real_world_applications": [],
+        "visual_examples": [],
+        "cultural_analogies": [],
+        "language_specific_examples": {
+            "bengali_examples": "",
+            "english_examples": "",
+            "bilingual_support": "",
+        },
+    }
+
+
+def _solution(question: str) -> str:
+    return (
+        f"**{question}**\n\n"
+        "1. Concept introduction\n"
+        "2. Step-by-step explanation with an example\n"
+        "3. Common mistakes to avoid\n"
+        "4. Practice suggestions"
+    )
+
+
+# output_key → function of the question producing the agent's reply
+CANNED_OUTPUTS: Dict[str, Callable[[str], Any]] = {
+    "query_classification": _classification,
+    "input_analysis": analyze_input,
+    "preliminary_context": analyze_context,
+    "preliminary_search_context": _search_context,
+    "knowledge_content": _knowledge_content,
+    "enriched_context": _enriched_context,
+    "generated_examples": _generated_examples,
+    "formatted_response": _solution,
+    "fast_track_response": _solution,
+}
+
+
+def canned_output(output_key: Optional[str], question: str) -> Optional[str]:
+    """
+    Reply text for an agent's output_key
+
+    Args:
+        output_key: The agent's output_key, or None
+        question: User message of the turn
+
+    Returns:
+        JSON or Markdown text, or None when there is no canned output
+    """
+    produce = CANNED_OUTPUTS.get(output_key)
+    if produce is None:
+        return None
+    output = produce(question)
+    if isinstance(output, str):
+        return output
+    return json.dumps(output, ensure_ascii=False)
@@ -0,0 +1,195 @@
+"""
+Clarification gate benchmark: vague questions answered before the analysis stage
+
+Sends the golden corpus's vague questions, borderline ones and clear ones
+through the analysis pipeline of root_agent on a stub model, once with every
+question reaching the parallel analysis stage and once with the clarification
+gate answering clearly incomplete questions from a template. Borderline and
+clear questions must cost the same with and without the gate, and follow-ups
+that would be gated on their own must reach the analysis agents after an
+earlier turn. Run with:
+
+    python -m tutoring_agent.bench.clarification_gate
+"""
+
+import asyncio
+import contextlib
+import logging
+import statistics
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+from ..agent import root_agent
+from ..agents.analysis_pipeline.agent import analysis_pipeline_agent, response_cache
+from ..agents.solution_pipeline.agent import search_cache
+from ..tools.clarification import assess_clarification
+from .equation_solving import STUB_LATENCY, run_question
+from .fast_track_routing import model_routing
+from .golden import load_corpus
+from .response_cache import ask_conversation
+from .stub_model import StubLlm, use_model
+
+# (question, kind) of questions the gate should leave to the analysis agents
+BORDERLINE_QUESTIONS: List[Tuple[str, str]] = [
+    ("Solve x", "borderline"),
+    ("What is this formula?", "borderline"),
+    ("How?", "borderline"),
+    ("I don't understand question 5", "borderline"),
+    ("Help me with algebra", "borderline"),
+    ("Explain photosynthesis process in plants", "clear"),
+    ("নিউটনের দ্বিতীয় সূত্র ব্যাখ্যা কর", "clear"),
+    ("discriminant ki bujhay explain koro", "clear"),
+    ("What is physics?", "clear"),
+    ("what is science", "clear"),
+    ("গণিত কি?", "clear"),
+    ("পদার্থবিজ্ঞান কী?", "clear"),
+]
+# Follow-ups that only make sense after an earlier turn; vague on their own,
+# so the gate must leave them to the agents that see the conversation
+FOLLOW_UP_QUESTIONS: List[str] = [
+    "Explain that again",
+    "I don't understand",
+    "What is it?",
+    "এটা কি?",
+]
+FIRST_QUESTION = "Explain photosynthesis process in plants"
+
+# Sub-agent a correct QuestionAnalyzer transfers to for each kind of question
+KIND_ANALYZER_DECISIONS = {
+    "vague": "QuestionClarificationAgent",
+    "borderline": "QuestionClarificationAgent",
+    "clear": "SolutionPipelineAgent",
+}
+
+
+def question_mix() -> List[Tuple[str, str]]:
+    """Golden clarification questions followed by the borderline and clear ones"""
+    vague = [
+        (record["query"], "vague")
+        for record in load_corpus()
+        if record["route"] == "clarification"
+    ]
+    return vague + BORDERLINE_QUESTIONS
+
+
+@contextlib.contextmanager
+def without_gate() -> Iterator[None]:
+    """Send every question to the analysis stage, as before the gate"""
+    saved = analysis_pipeline_agent.before_agent_callback
+    analysis_pipeline_agent.before_agent_callback = [
+        callback
+        for callback in analysis_pipeline_agent.canonical_before_agent_callbacks
+        if callback.__name__ != "local_clarification_reply"
+    ]
+    try:
+        yield
+    finally:
+        analysis_pipeline_agent.before_agent_callback = saved
+
+
+async def benchmark_gate(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, str, str, int, float, int, float]]:
+    """
+    Run every question without and with the clarification gate
+
+    Returns:
+        List of (question, kind, gate decision, baseline calls, baseline
+        seconds, calls, seconds) rows
+    """
+    model = StubLlm(
+        latency=latency,
+        transfers={"ConversationRouter": "AnalysisPipelineAgent"},
+    )
+    rows = []
+    with use_model(root_agent, model), model_routing():
+        for question, kind in question_mix():
+            model.transfers["QuestionAnalyzer"] = KIND_ANALYZER_DECISIONS[kind]
+            with without_gate():
+                baseline = await run_question(root_agent, model, question)
+            current = await run_question(root_agent, model, question)
+            decision = assess_clarification(question)["decision"]
+            rows.append((question, kind, decision, *baseline, *current))
+    return rows
+
+
+async def check_follow_ups(latency: float = STUB_LATENCY) -> None:
+    """
+    Check that the gate leaves follow-ups to the analysis agents
+
+    Every follow-up is asked after FIRST_QUESTION in the same session.
+
+    Raises:
+        AssertionError: A follow-up was answered by the gate
+    """
+    model = StubLlm(
+        latency=latency,
+        transfers={
+            "ConversationRouter": "AnalysisPipelineAgent",
+            "QuestionAnalyzer": "QuestionClarificationAgent",
+        },
+    )
+    with use_model(root_agent, model), model_routing():
+        with response_cache.disabled(), search_cache.disabled():
+            for question in FOLLOW_UP_QUESTIONS:
+                await ask_conversation(model, [FIRST_QUESTION, question])
+                assert "QuestionAnalyzer" in model.calls, f"gated: {question}"
+
+
+def summarize(
+    rows: List[Tuple[str, str, str, int, float, int, float]],
+) -> Dict[str, Tuple[int, float, float, float, float, float]]:
+    """
+    Aggregate the rows per question kind and overall
+
+    Returns:
+        Kind → (questions, share answered by the gate, baseline calls, calls,
+        baseline seconds, seconds), averaged per question
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row[1]].append(row)
+    groups["all"] = rows
+    summary = {}
+    for kind, group in groups.items():
+        summary[kind] = (
+            len(group),
+            sum(row[2] == "clarify" for row in group) / len(group),
+            statistics.mean(row[3] for row in group),
+            statistics.mean(row[5] for row in group),
+            statistics.mean(row[4] for row in group),
+            statistics.mean(row[6] for row in group),
+        )
+    return summary
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    asyncio.run(check_follow_ups())
+    rows = asyncio.run(benchmark_gate())
+    print(f"Stub model: {STUB_LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'question':<44} {'gate':<9} {'calls':>9} {'seconds':>11}")
+    for question, _, decision, base_calls, base_s, calls, seconds in rows:
+        print(
+            f"{question[:44]:<44} {decision:<9} {base_calls:>4} → {calls:<2} "
+            f"{base_s:>5.2f} → {seconds:.2f}"
+        )
+
+    print(f"\n{'kind':<11} {'questions':>9} {'gated':>6} {'calls':>11} {'seconds':>13}")
+    for kind, (count, gated, base_calls, calls, base_s, seconds) in summarize(
+        rows
+    ).items():
+        print(
+            f"{kind:<11} {count:>9} {gated:>6.0%} {base_calls:>4.1f} → {calls:<4.1f} "
+            f"{base_s:>5.2f} → {seconds:.2f}"
+        )
+
+    gated = [row[0] for row in rows if row[1] != "vague" and row[2] == "clarify"]
+    assert not gated, f"borderline or clear questions gated: {gated}"
+
+
+if __name__ == "__main__":
+    main()
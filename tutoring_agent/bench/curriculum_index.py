@@ -0,0 +1,192 @@
+"""
+Curriculum index benchmark: build cost, search latency, local recall and
+the time KnowledgeRetriever saves
+
+Builds the index from the bundled sources, searches it with the search
+contexts of the golden full-pipeline questions and with hand-written
+contexts in the shape the QuestionAnalyzer produces, and runs complex
+questions through root_agent on a stub model whose KnowledgeRetriever call
+takes as long as a grounded web search, with and without the local tier.
+Run with:
+
+    python -m tutoring_agent.bench.curriculum_index
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from ..agent import root_agent
+from ..agents.solution_pipeline.agent import knowledge_retriever
+from ..tools.curriculum_index import DEFAULT_SOURCES, CurriculumIndex, build_index
+from .canned_outputs import _search_context
+from .equation_solving import STUB_LATENCY, run_question
+from .golden import load_corpus
+from .stub_model import StubLlm, use_model
+
+# Seconds for a KnowledgeRetriever call that grounds on google_search
+WEB_SEARCH_LATENCY = 1.0
+
+# (primary_search_terms, bengali_search_terms) as the QuestionAnalyzer writes
+# them; the last ones are outside the bundled notes and must go to the web
+SEARCH_CONTEXTS: List[Tuple[List[str], List[str]]] = [
+    (["Newton's second law", "force mass acceleration"], ["নিউটনের দ্বিতীয় সূত্র"]),
+    (["projectile motion", "maximum height"], ["প্রক্ষেপকের গতি"]),
+    (["quadratic equation", "discriminant"], ["দ্বিঘাত সমীকরণ"]),
+    (["photosynthesis", "chlorophyll"], ["সালোকসংশ্লেষণ"]),
+    (["ionic bond", "electron transfer"], ["আয়নিক বন্ধন"]),
+    (["electrolysis of water"], ["পানির তড়িৎ বিশ্লেষণ"]),
+    (["mitosis", "meiosis"], ["কোষ বিভাজন"]),
+    (["Pythagorean theorem proof"], ["পিথাগোরাসের উপপাদ্য"]),
+    (["series and parallel circuits"], []),
+    ([], ["শক্তির সংরক্ষণশীলতা নীতি"]),
+    (["black hole event horizon"], ["কৃষ্ণগহ্বর"]),
+    (["French revolution causes"], []),
+]
+
+COMPLEX_QUESTIONS = [
+    "Explain photosynthesis process in plants",
+    "Explain Newton's second law of motion with an example",
+    "What is projectile motion and why is its path a parabola?",
+    "Explain how black holes form",
+]
+
+
+def benchmark_build() -> Tuple[float, int, Dict]:
+    """
+    Build the index from the bundled sources into a temporary file
+
+    Returns:
+        Tuple of (build milliseconds, file bytes, index header)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "curriculum.idx")
+        start = time.perf_counter()
+        header = build_index(DEFAULT_SOURCES, path)
+        elapsed = (time.perf_counter() - start) * 1000
+        return elapsed, os.path.getsize(path), header
+
+
+def golden_contexts() -> List[Tuple[List[str], List[str]]]:
+    """Search terms of the stub search context for each full-pipeline query"""
+    contexts = []
+    for record in load_corpus():
+        if record["route"] == "full_pipeline":
+            context = _search_context(record["query"])
+            contexts.append(
+                (context["primary_search_terms"], context["bengali_search_terms"])
+            )
+    return contexts
+
+
+def benchmark_search(
+    index: CurriculumIndex, contexts: List[Tuple[List[str], List[str]]]
+) -> Tuple[float, float, float]:
+    """
+    Search every context
+
+    Returns:
+        Tuple of (share answered locally, p50 and p95 search milliseconds)
+    """
+    local = 0
+    times = []
+    for primary, bengali in contexts:
+        result = index.search(primary, bengali)
+        local += result["sufficient"]
+        times.append(result["search_ms"])
+    quantiles = statistics.quantiles(times, n=20)
+    return local / len(contexts), statistics.median(times), quantiles[-1]
+
+
+@contextlib.contextmanager
+def web_only_retrieval() -> Iterator[None]:
+    """Let KnowledgeRetriever search the web for every question, as before"""
+    callbacks = knowledge_retriever.before_model_callback
+    knowledge_retriever.before_model_callback = [
+        callback
+        for callback in knowledge_retriever.canonical_before_model_callbacks
+        if not callback.__name__.startswith("local_")
+    ]
+    try:
+        yield
+    finally:
+        knowledge_retriever.before_model_callback = callbacks
+
+
+def make_model(latency: float) -> StubLlm:
+    return StubLlm(
+        latency=latency,
+        agent_latency={knowledge_retriever.name: WEB_SEARCH_LATENCY},
+        transfers={"QuestionAnalyzer": "SolutionPipelineAgent"},
+    )
+
+
+async def benchmark_retrieval(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, float, float, bool]]:
+    """
+    Run each complex question with web-only and with local-first retrieval
+
+    Returns:
+        List of (question, web-only seconds, local-first seconds, whether
+        KnowledgeRetriever still called the model) rows
+    """
+    rows = []
+    for question in COMPLEX_QUESTIONS:
+        model = make_model(latency)
+        with use_model(root_agent, model):
+            with web_only_retrieval():
+                _, baseline = await run_question(root_agent, model, question)
+            _, current = await run_question(root_agent, model, question)
+        rows.append(
+            (question, baseline, current, knowledge_retriever.name in model.calls)
+        )
+    return rows
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    elapsed, size, header = benchmark_build()
+    print(
+        f"Build: {header['passages']} passages, {header['terms']} terms from "
+        f"{len(header['sources'])} files in {elapsed:.0f} ms, {size / 1024:.0f} KiB"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "curriculum.idx")
+        build_index(DEFAULT_SOURCES, path)
+        start = time.perf_counter()
+        index = CurriculumIndex(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        print(f"Load: {load_ms:.1f} ms")
+
+        print(f"\n{'search contexts':<32} {'local':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, contexts in (
+            ("golden full_pipeline (stub)", golden_contexts()),
+            ("analyzer-style", SEARCH_CONTEXTS),
+        ):
+            local, p50, p95 = benchmark_search(index, contexts)
+            print(f"{label:<32} {local:>8.0%} {p50:>8.2f} {p95:>8.2f}")
+        index.close()
+
+    rows = asyncio.run(benchmark_retrieval())
+    print(
+        f"\nComplex questions, {STUB_LATENCY * 1000:.0f} ms per model call and "
+        f"{WEB_SEARCH_LATENCY * 1000:.0f} ms per web-grounded retrieval"
+    )
+    print(f"{'question':<58} {'web s':>7} {'local s':>7}  retriever")
+    for question, baseline, current, web in rows:
+        source = "web" if web else "local"
+        print(f"{question[:58]:<58} {baseline:>7.2f} {current:>7.2f}  {source}")
+
+
+if __name__ == "__main__":
+    main()
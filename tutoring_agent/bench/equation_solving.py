@@ -0,0 +1,132 @@
+"""
+Equation solving benchmark: full pipeline versus the fast-track solver
+
+Runs "solve this equation" questions through the current tutoring pipeline and
+through fast_track_educational_agent, both on a stub model with a fixed
+round-trip latency, and reports LLM calls and wall time per question. Run with:
+
+    python -m tutoring_agent.bench.equation_solving
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import List, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..agent import root_agent
+from ..agents.analysis_pipeline.agent import response_cache
+from ..agents.fast_track.fast_track_agent import fast_track_educational_agent
+from ..agents.solution_pipeline.agent import search_cache
+from ..tools.equation_solver import solve_equations
+from .stub_model import StubLlm, use_model
+
+EQUATION_QUESTIONS = [
+    "Solve 2x + 5 = 13",
+    "Solve x^2 - 5x + 6 = 0",
+    "Solve 2x² + 5x - 3 = 0 step by step",
+    "Solve 2x + 3y = 7 and x - y = 1",
+    "২x + ৫ = ১৩ সমাধান করুন",
+    "x + y = 5, x - y = 1 সমাধান কর",
+]
+
+# Seconds per stub model call; roughly a short gemini-2.0-flash round-trip
+STUB_LATENCY = 0.2
+
+
+async def run_question(
+    agent: BaseAgent, model: StubLlm, question: str, use_cache: bool = False
+) -> Tuple[int, float]:
+    """
+    Run one question through an agent on the stub model
+
+    Args:
+        agent: Agent to run
+        model: Stub model already installed on the agent tree
+        question: User message
+        use_cache: Read and store analysis pipeline responses and knowledge
+            searches in their caches; off by default so stub replies never
+            reach the cache files
+
+    Returns:
+        Tuple of (LLM calls, wall time in seconds)
+    """
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="student"
+    )
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    model.reset()
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if not use_cache:
+            stack.enter_context(response_cache.disabled())
+            stack.enter_context(search_cache.disabled())
+        async for _ in runner.run_async(
+            user_id="student", session_id=session.id, new_message=message
+        ):
+            pass
+    return len(model.calls), time.perf_counter() - start
+
+
+async def benchmark_equation_solving(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, int, float, int, float]]:
+    """
+    Compare the full pipeline and the fast-track agent on equation questions
+
+    Returns:
+        List of (question, pipeline calls, pipeline seconds, fast-track
+        calls, fast-track seconds) rows
+    """
+    pipeline_model = StubLlm(
+        latency=latency,
+        transfers={
+            "ConversationRouter": "AnalysisPipelineAgent",
+            "QuestionAnalyzer": "SolutionPipelineAgent",
+        },
+    )
+    fast_track_model = StubLlm(
+        latency=latency,
+        tool_calls={"FastTrackEducationalAgent": ("equation_solver", "equations")},
+    )
+
+    rows = []
+    for question in EQUATION_QUESTIONS:
+        with use_model(root_agent, pipeline_model):
+            pipeline = await run_question(root_agent, pipeline_model, question)
+        with use_model(fast_track_educational_agent, fast_track_model):
+            fast_track = await run_question(
+                fast_track_educational_agent, fast_track_model, question
+            )
+        rows.append((question, *pipeline, *fast_track))
+    return rows
+
+
+def main() -> None:
+    unsolved = [q for q in EQUATION_QUESTIONS if not solve_equations(q)["solved"]]
+    assert not unsolved, f"solver failed on {unsolved}"
+
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+    rows = asyncio.run(benchmark_equation_solving())
+    print(f"Stub model latency: {STUB_LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'question':<40} {'pipeline':>16} {'fast track':>16}")
+    for question, calls, seconds, fast_calls, fast_seconds in rows:
+        label = question if len(question) <= 38 else question[:35] + "..."
+        print(
+            f"{label:<40} {calls:>4} calls {seconds:>5.2f}s "
+            f"{fast_calls:>4} calls {fast_seconds:>5.2f}s"
+        )
+    total = sum(row[2] for row in rows)
+    fast_total = sum(row[4] for row in rows)
+    print(f"\nTotal: pipeline {total:.2f}s, fast track {fast_total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
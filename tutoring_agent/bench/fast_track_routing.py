@@ -0,0 +1,181 @@
+"""
+Routing benchmark: LLM calls and latency per query class
+
+Runs GENERAL, SIMPLE_EDUCATIONAL and COMPLEX_EDUCATIONAL questions through
+root_agent on a stub model with a fixed round-trip latency. The baseline is
+the router before the SIMPLE_EDUCATIONAL class: the model picks the route and
+every educational question goes to the analysis pipeline. Run with:
+
+    python -m tutoring_agent.bench.fast_track_routing
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..agent import root_agent
+from ..agents.conversation_router.agent import conversation_router
+from ..agents.fast_track.fast_track_agent import ROUTE_TO_FULL_PIPELINE
+from ..tools.query_classifier import classify_query
+from .equation_solving import STUB_LATENCY, run_question
+from .stub_model import StubLlm, use_model
+
+ESCALATED = "SIMPLE_EDUCATIONAL → pipeline"
+
+# (question, class, fast-track tool the model calls as (tool, argument))
+ROUTED_QUERIES: List[Tuple[str, str, Optional[Tuple[str, str]]]] = [
+    ("Hello, how are you?", "GENERAL", None),
+    ("আপনার নাম কি?", "GENERAL", None),
+    ("What is 15 × 8?", "SIMPLE_EDUCATIONAL", ("simple_calculator", "expression")),
+    ("12.5 + 7.25", "SIMPLE_EDUCATIONAL", ("simple_calculator", "expression")),
+    ("Solve 2x + 5 = 13", "SIMPLE_EDUCATIONAL", ("equation_solver", "equations")),
+    ("২x + ৫ = ১৩ সমাধান করুন", "SIMPLE_EDUCATIONAL", ("equation_solver", "equations")),
+    ("Define atom", "SIMPLE_EDUCATIONAL", ("quick_definition_lookup", "term")),
+    (
+        "সালোকসংশ্লেষণ কাকে বলে?",
+        "SIMPLE_EDUCATIONAL",
+        ("quick_definition_lookup", "term"),
+    ),
+    (
+        "Area of circle formula",
+        "SIMPLE_EDUCATIONAL",
+        ("formula_explainer", "formula_name"),
+    ),
+    ("What is 3/4 of 20?", ESCALATED, None),
+    ("Explain photosynthesis process in plants", "COMPLEX_EDUCATIONAL", None),
+    (
+        "Solve the quadratic equation 2x^2 + 5x - 3 = 0 step by step",
+        "COMPLEX_EDUCATIONAL",
+        None,
+    ),
+]
+
+
+@contextlib.contextmanager
+def model_routing() -> Iterator[None]:
+    """Let the router's model choose the route, as before local routing"""
+    callbacks = conversation_router.before_model_callback
+    conversation_router.before_model_callback = [
+        callback
+        for callback in conversation_router.canonical_before_model_callbacks
+        if not callback.__name__.startswith("local_")
+    ]
+    try:
+        yield
+    finally:
+        conversation_router.before_model_callback = callbacks
+
+
+def make_model(
+    label: str, tool: Optional[Tuple[str, str]], baseline: bool, latency: float
+) -> StubLlm:
+    """
+    Stub model scripted for one question
+
+    Args:
+        label: Query class from ROUTED_QUERIES
+        tool: Fast-track tool call, if any
+        baseline: Script the router model to send educational questions to
+            the analysis pipeline
+        latency: Seconds per model call
+
+    Returns:
+        StubLlm for the question
+    """
+    transfers = {"QuestionAnalyzer": "SolutionPipelineAgent"}
+    if baseline:
+        transfers["ConversationRouter"] = (
+            "OptimizedGeneralChatAgent"
+            if label == "GENERAL"
+            else "AnalysisPipelineAgent"
+        )
+    replies = {}
+    if label == ESCALATED:
+        replies["FastTrackEducationalAgent"] = ROUTE_TO_FULL_PIPELINE
+    tool_calls = {"FastTrackEducationalAgent": tool} if tool else {}
+    return StubLlm(
+        latency=latency, transfers=transfers, tool_calls=tool_calls, replies=replies
+    )
+
+
+async def benchmark_routing(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, str, int, float, int, float, List[str]]]:
+    """
+    Run every question with model routing and with local routing
+
+    Returns:
+        List of (question, class, baseline calls, baseline seconds, calls,
+        seconds, agents that called the model) rows
+    """
+    rows = []
+    for question, label, tool in ROUTED_QUERIES:
+        model = make_model(label, tool, baseline=True, latency=latency)
+        with use_model(root_agent, model), model_routing():
+            baseline = await run_question(root_agent, model, question)
+
+        model = make_model(label, tool, baseline=False, latency=latency)
+        with use_model(root_agent, model):
+            current = await run_question(root_agent, model, question)
+        rows.append((question, label, *baseline, *current, list(model.calls)))
+    return rows
+
+
+def summarize(
+    rows: List[Tuple[str, str, int, float, int, float, List[str]]],
+) -> Dict[str, Tuple[int, float, float, float, float]]:
+    """
+    Average the benchmark rows per class
+
+    Returns:
+        Class → (questions, baseline calls, baseline seconds, calls, seconds)
+    """
+    totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0, 0.0])
+    for _, label, base_calls, base_seconds, calls, seconds, _ in rows:
+        total = totals[label]
+        for index, value in enumerate((1, base_calls, base_seconds, calls, seconds)):
+            total[index] += value
+    return {
+        label: (int(count), *(value / count for value in values))
+        for label, (count, *values) in totals.items()
+    }
+
+
+def main() -> None:
+    mismatched = [
+        (question, label, classify_query(question)["classification"])
+        for question, label, _ in ROUTED_QUERIES
+        if classify_query(question)["classification"] != label.split(" ")[0]
+    ]
+    assert not mismatched, f"local classifier disagrees: {mismatched}"
+
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+    rows = asyncio.run(benchmark_routing())
+
+    print(f"Stub model latency: {STUB_LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'question':<40} {'model routing':>17} {'local routing':>17}")
+    for question, _, base_calls, base_seconds, calls, seconds, agents in rows:
+        label = question if len(question) <= 38 else question[:35] + "..."
+        print(
+            f"{label:<40} {base_calls:>4} calls {base_seconds:>5.2f}s "
+            f"{calls:>4} calls {seconds:>5.2f}s  {' → '.join(agents) or '-'}"
+        )
+
+    print(
+        f"\n{'class (mean per question)':<40} {'model routing':>17} {'local routing':>17}"
+    )
+    for label, (count, base_calls, base_seconds, calls, seconds) in summarize(
+        rows
+    ).items():
+        print(
+            f"{f'{label} ({count})':<40} {base_calls:>4.1f} calls {base_seconds:>5.2f}s "
+            f"{calls:>4.1f} calls {seconds:>5.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
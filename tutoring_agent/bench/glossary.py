@@ -0,0 +1,193 @@
+"""
+Benchmark for the glossary store behind the fast-track definition tools
+
+Measures lookup cost by match type and the hit rate on student-style
+queries (misspellings, Bengali names, partial terms) for the glossary store
+and for the hard-coded tables the tools used before it. Run with:
+
+    python -m tutoring_agent.bench.glossary
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..agents.fast_track.fast_track_agent import (
+    formula_explainer,
+    quick_definition_lookup,
+)
+from ..tools.glossary import GlossaryStore
+from .text_processing import print_rows, time_per_call
+
+# Keys of the dictionaries quick_definition_lookup and formula_explainer
+# rebuilt on every call before the glossary store
+LEGACY_TERMS = {
+    "algebra",
+    "geometry",
+    "calculus",
+    "photosynthesis",
+    "gravity",
+    "atom",
+    "hypothesis",
+    "analysis",
+}
+LEGACY_FORMULAS = {
+    "area of rectangle",
+    "area of circle",
+    "circumference of circle",
+    "pythagorean theorem",
+    "distance formula",
+    "slope",
+}
+
+# (query, kind, expected record name or None for an expected miss)
+STUDENT_QUERIES: List[Tuple[str, str, Optional[str]]] = [
+    ("photosynthesis", "term", "photosynthesis"),
+    ("Photosynthesis", "term", "photosynthesis"),
+    ("photosintesis", "term", "photosynthesis"),
+    ("সালোকসংশ্লেষণ", "term", "photosynthesis"),
+    ("সালোকসংশ্লেষন", "term", "photosynthesis"),
+    ("gravty", "term", "gravity"),
+    ("অভিকর্ষ", "term", "gravity"),
+    ("acceleration", "term", "acceleration"),
+    ("accelaration", "term", "acceleration"),
+    ("ত্বরণ", "term", "acceleration"),
+    ("velocity", "term", "velocity"),
+    ("বেগ", "term", "velocity"),
+    ("momentum", "term", "momentum"),
+    ("mitocondria", "term", "mitochondria"),
+    ("chlorophyl", "term", "chlorophyll"),
+    ("osmosis", "term", "osmosis"),
+    ("অভিস্রবণ", "term", "osmosis"),
+    ("Ohm's law", "term", "Ohm's law"),
+    ("ohms law", "term", "Ohm's law"),
+    ("newtons 2nd law", "term", "Newton's second law"),
+    ("isotopes", "term", "isotope"),
+    ("ল.সা.গু", "term", "LCM"),
+    ("গসাগু", "term", "HCF"),
+    ("DNA", "term", "DNA"),
+    ("quadratic equaton", "term", "quadratic equation"),
+    ("দ্বিঘাত সমীকরণ", "term", "quadratic equation"),
+    ("trigonometry", "term", "trigonometry"),
+    ("trignometry", "term", "trigonometry"),
+    ("probabilty", "term", "probability"),
+    ("hypothesis", "term", "hypothesis"),
+    ("area of circle", "formula", "area of circle"),
+    ("Area of a circle", "formula", "area of circle"),
+    ("বৃত্তের ক্ষেত্রফল", "formula", "area of circle"),
+    ("pythagoras theorem", "formula", "pythagorean theorem"),
+    ("pythagorean theorm", "formula", "pythagorean theorem"),
+    ("quadratic formula", "formula", "quadratic formula"),
+    ("(a+b)²", "formula", "square of sum"),
+    ("F = ma", "formula", "Newton's second law formula"),
+    ("V = IR", "formula", "Ohm's law formula"),
+    ("volume of cylinder", "formula", "volume of cylinder"),
+    ("volume of cylindre", "formula", "volume of cylinder"),
+    ("simple interest", "formula", "simple interest"),
+    ("চক্রবৃদ্ধি মুনাফা", "formula", "compound interest"),
+    ("kinetic energy formula", "formula", "kinetic energy formula"),
+    ("slope", "formula", "slope"),
+    ("quantum chromodynamics", "term", None),
+    ("xyz", "term", None),
+    ("area of hexagon", "formula", None),
+]
+
+
+def evaluate_hit_rate(store: GlossaryStore) -> Dict[str, float]:
+    """
+    Score the store and the legacy tables on STUDENT_QUERIES
+
+    Returns:
+        Dictionary with answerable query count, correct store hits, wrong
+        store hits, legacy hits and the two hit rates
+    """
+    answerable = correct = wrong = legacy = 0
+    for query, kind, expected in STUDENT_QUERIES:
+        record = store.lookup(query, kind=kind)
+        found = record["name"] if record else None
+        if expected is None:
+            wrong += found is not None
+            continue
+        answerable += 1
+        correct += found == expected
+        wrong += found is not None and found != expected
+        table = LEGACY_TERMS if kind == "term" else LEGACY_FORMULAS
+        legacy += query.lower().strip() in table
+    return {
+        "answerable": answerable,
+        "store_hits": correct,
+        "wrong_hits": wrong,
+        "legacy_hits": legacy,
+        "store_hit_rate": correct / answerable,
+        "legacy_hit_rate": legacy / answerable,
+    }
+
+
+def benchmark_glossary(store: GlossaryStore) -> List[Tuple[str, str, float]]:
+    """
+    Time store lookups by match type and the two fast-track tools
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    return [
+        (
+            "lookup exact",
+            "photosynthesis",
+            time_per_call(lambda: store.lookup("photosynthesis")),
+        ),
+        (
+            "lookup exact",
+            "সালোকসংশ্লেষণ",
+            time_per_call(lambda: store.lookup("সালোকসংশ্লেষণ")),
+        ),
+        ("lookup prefix", "chlorop", time_per_call(lambda: store.lookup("chlorop"))),
+        (
+            "lookup fuzzy",
+            "photosintesis",
+            time_per_call(lambda: store.lookup("photosintesis")),
+        ),
+        (
+            "lookup fuzzy",
+            "সালোকসংশ্লেষন",
+            time_per_call(lambda: store.lookup("সালোকসংশ্লেষন")),
+        ),
+        (
+            "lookup miss",
+            "quantum chromodynamics",
+            time_per_call(lambda: store.lookup("quantum chromodynamics")),
+        ),
+        (
+            "quick_definition_lookup",
+            "gravity",
+            time_per_call(lambda: quick_definition_lookup("gravity")),
+        ),
+        (
+            "formula_explainer",
+            "area of circle",
+            time_per_call(lambda: formula_explainer("area of circle")),
+        ),
+    ]
+
+
+def main() -> None:
+    start = time.perf_counter()
+    store = GlossaryStore()
+    load = time.perf_counter() - start
+    stats = store.stats()
+    print(
+        f"Loaded {stats['records']} records, {stats['keys']} keys "
+        f"in {load * 1e3:.1f} ms\n"
+    )
+
+    print_rows("Glossary", benchmark_glossary(store))
+
+    report = evaluate_hit_rate(store)
+    print(f"\nStudent queries ({report['answerable']} answerable)")
+    print(
+        f"  glossary store: {report['store_hit_rate']:.0%} ({report['wrong_hits']} wrong)"
+    )
+    print(f"  legacy tables:  {report['legacy_hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
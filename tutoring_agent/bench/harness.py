@@ -0,0 +1,213 @@
+"""
+End-to-end benchmark harness for root_agent on the stub model
+
+Drives a mix of GENERAL, SIMPLE_EDUCATIONAL and COMPLEX_EDUCATIONAL questions
+through the whole agent graph with canned model replies and a configurable
+latency distribution, and reports latency percentiles, LLM calls, serial LLM
+hops and how much the branches of each ParallelAgent stage overlapped. The
+response cache is off, so every run exercises the full graph. Run with:
+
+    python -m tutoring_agent.bench
+"""
+
+import math
+import statistics
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from google.adk.agents import ParallelAgent
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from ..agent import agent_tracer, root_agent
+from ..agents.callbacks import walk_agents
+from ..agents.fast_track.fast_track_agent import ROUTE_TO_FULL_PIPELINE
+from ..agents.tracing import parallel_overlap
+from .equation_solving import STUB_LATENCY, run_question
+from .fast_track_routing import ESCALATED, ROUTED_QUERIES
+from .stub_model import StubLlm, use_model
+
+# (question, class, fast-track tool the model calls as (tool, argument))
+QUERY_MIX: List[Tuple[str, str, Optional[Tuple[str, str]]]] = [
+    *ROUTED_QUERIES,
+    ("নিউটনের দ্বিতীয় সূত্র ব্যাখ্যা কর", "COMPLEX_EDUCATIONAL", None),
+    ("Why does ice float on water? Explain with density", "COMPLEX_EDUCATIONAL", None),
+    ("সালোকসংশ্লেষণ প্রক্রিয়া ধাপে ধাপে ব্যাখ্যা কর", "COMPLEX_EDUCATIONAL", None),
+    ("Derive the formula for kinetic energy", "COMPLEX_EDUCATIONAL", None),
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """Linearly interpolated percentile of values (rank 0-100)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * rank / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def serial_hops(intervals: Sequence[Tuple[str, float, float]]) -> int:
+    """
+    Longest chain of model calls that each started after the previous ended
+
+    Calls that overlap, such as the branches of a ParallelAgent, count as one
+    hop, so this is the number of model round-trips on the critical path.
+
+    Args:
+        intervals: (agent, start, end) of every model call in a run
+
+    Returns:
+        Number of serial hops
+    """
+    ordered = sorted(intervals, key=lambda interval: interval[2])
+    hops: List[int] = []
+    for _, start, _ in ordered:
+        before = [
+            hops[index]
+            for index, (_, _, end) in enumerate(ordered[: len(hops)])
+            if end <= start
+        ]
+        hops.append(1 + max(before, default=0))
+    return max(hops, default=0)
+
+
+def make_model(
+    latency: float = STUB_LATENCY,
+    distribution: str = "lognormal",
+    spread: float = 0.25,
+    seed: int = 0,
+) -> StubLlm:
+    """Stub model for the harness; per-question scripts are set in run_mix"""
+    return StubLlm(
+        latency=latency,
+        distribution=distribution,
+        spread=spread,
+        seed=seed,
+        transfers={"QuestionAnalyzer": "SolutionPipelineAgent"},
+    )
+
+
+async def run_mix(model: StubLlm, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Run every question in QUERY_MIX repeat times
+
+    Args:
+        model: Stub model from make_model
+        repeat: Runs per question
+
+    Returns:
+        One dictionary per run with question, label, seconds, llm_calls,
+        serial_hops and parallel (stage name → parallel_overlap runs)
+    """
+    stages = [
+        agent.name
+        for agent in walk_agents(root_agent)
+        if isinstance(agent, ParallelAgent)
+    ]
+    exporter = InMemorySpanExporter()
+    agent_tracer.enable(exporter)
+    runs = []
+    try:
+        with use_model(root_agent, model):
+            for _ in range(repeat):
+                for question, label, tool in QUERY_MIX:
+                    model.tool_calls = (
+                        {"FastTrackEducationalAgent": tool} if tool else {}
+                    )
+                    model.replies = (
+                        {"FastTrackEducationalAgent": ROUTE_TO_FULL_PIPELINE}
+                        if label == ESCALATED
+                        else {}
+                    )
+                    exporter.clear()
+                    calls, seconds = await run_question(root_agent, model, question)
+                    spans = exporter.get_finished_spans()
+                    runs.append(
+                        {
+                            "question": question,
+                            "label": label,
+                            "seconds": seconds,
+                            "llm_calls": calls,
+                            "serial_hops": serial_hops(model.intervals),
+                            "parallel": {
+                                stage: parallel_overlap(spans, stage)
+                                for stage in stages
+                            },
+                        }
+                    )
+    finally:
+        agent_tracer.disable()
+    return runs
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate harness runs
+
+    Returns:
+        Dictionary with "classes" (label → runs, p50/p95/p99 in ms, mean LLM
+        calls and serial hops; "all" covers every run) and "parallel" (stage →
+        runs, mean wall ms, mean overlap, branch count and how often each
+        branch was the critical one)
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for run in runs:
+        groups[run["label"]].append(run)
+        groups["all"].append(run)
+
+    classes = {}
+    for label, group in groups.items():
+        milliseconds = [run["seconds"] * 1000 for run in group]
+        classes[label] = {
+            "runs": len(group),
+            **{f"p{rank}_ms": percentile(milliseconds, rank) for rank in PERCENTILES},
+            "llm_calls": statistics.mean(run["llm_calls"] for run in group),
+            "serial_hops": statistics.mean(run["serial_hops"] for run in group),
+        }
+
+    stage_runs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for run in runs:
+        for stage, overlaps in run["parallel"].items():
+            stage_runs[stage].extend(overlaps)
+    parallel = {
+        stage: {
+            "runs": len(overlaps),
+            "wall_ms": statistics.mean(overlap["wall_ms"] for overlap in overlaps),
+            "overlap": statistics.mean(overlap["overlap"] for overlap in overlaps),
+            "branches": max(len(overlap["branch_ms"]) for overlap in overlaps),
+            "critical_branch": dict(
+                Counter(overlap["critical_branch"] for overlap in overlaps)
+            ),
+        }
+        for stage, overlaps in stage_runs.items()
+        if overlaps
+    }
+    return {"classes": classes, "parallel": parallel}
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"{'class':<36} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'LLM calls':>10} {'serial hops':>12}"
+    )
+    for label, row in summary["classes"].items():
+        print(
+            f"{label:<36} {row['runs']:>5} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+            f"{row['llm_calls']:>10.2f} {row['serial_hops']:>12.2f}"
+        )
+
+    for stage, row in summary["parallel"].items():
+        critical = ", ".join(
+            f"{branch} {count}" for branch, count in row["critical_branch"].items()
+        )
+        print(
+            f"\n{stage}: {row['runs']} runs, {row['wall_ms']:.1f} ms mean wall, "
+            f"overlap {row['overlap']:.2f} of {row['branches']}"
+        )
+        print(f"  critical branch: {critical}")
@@ -0,0 +1,109 @@
+"""
+JSON repair benchmark: malformed analysis replies recovered without a retry
+
+Takes the stub's classification and analysis outputs for the golden corpus,
+damages them the ways Gemini replies go wrong, and counts how many each
+parser still reads as a valid state model: json.loads as ADK's output_schema
+check does, and validate_state with the tolerant repair parser. Every reply
+json.loads rejects would otherwise fail the turn or cost a retry call. Run
+with:
+
+    python -m tutoring_agent.bench.json_repair
+"""
+
+import json
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ..agents.state_models import STATE_MODELS, validate_state
+from .canned_outputs import canned_output
+from .golden import load_corpus
+
+
+def _fenced(text: str) -> str:
+    return f"```json\n{text}\n```"
+
+
+def _prose(text: str) -> str:
+    return f"Here is the analysis:\n{text}\nLet me know if you need more."
+
+
+def _trailing_commas(text: str) -> str:
+    return text.replace("]", ",]").replace("}", ",}")
+
+
+def _python_repr(text: str) -> str:
+    return repr(json.loads(text))
+
+
+def _pretty_missing_commas(text: str) -> str:
+    return json.dumps(json.loads(text), ensure_ascii=False, indent=2).replace(
+        ",\n", "\n"
+    )
+
+
+def _cut_off(text: str) -> str:
+    return text[: int(len(text) * 0.8)]
+
+
+# Defect name → function damaging a compact JSON reply
+DEFECTS: Dict[str, Callable[[str], str]] = {
+    "clean": lambda text: text,
+    "code fence": _fenced,
+    "prose around": _prose,
+    "trailing commas": _trailing_commas,
+    "python repr": _python_repr,
+    "missing commas": _pretty_missing_commas,
+    "cut off": _cut_off,
+    "fence + commas": lambda text: _fenced(_trailing_commas(text)),
+}
+
+
+def _strict(model, text: str) -> bool:
+    try:
+        model.model_validate_json(text)
+    except ValueError:
+        return False
+    return True
+
+
+def benchmark_repair() -> List[Tuple[str, int, int, int, float]]:
+    """
+    Parse every damaged reply strictly and with repair
+
+    Returns:
+        List of (defect, replies, strict successes, repaired successes,
+        mean repair microseconds) rows
+    """
+    replies = [
+        (model, canned_output(key, record["query"]))
+        for record in load_corpus()
+        for key, model in STATE_MODELS.items()
+    ]
+    rows = []
+    for defect, damage in DEFECTS.items():
+        strict = repaired = 0
+        times = []
+        for model, reply in replies:
+            text = damage(reply)
+            strict += _strict(model, text)
+            start = time.perf_counter()
+            repaired += validate_state(model, text) is not None
+            times.append((time.perf_counter() - start) * 1e6)
+        rows.append((defect, len(replies), strict, repaired, statistics.mean(times)))
+    return rows
+
+
+def main() -> None:
+    rows = benchmark_repair()
+    print(f"{'defect':<18} {'replies':>7} {'strict':>7} {'repaired':>8} {'µs':>7}")
+    for defect, count, strict, repaired, micros in rows:
+        print(
+            f"{defect:<18} {count:>7} {strict / count:>7.0%} "
+            f"{repaired / count:>8.0%} {micros:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Math formatter benchmark: documented rules, cost and streaming lag
+
+Checks format_math against the before/after examples the ResponseFormatter
+LLM stage was instructed with, measures the cost of formatting a synthesized
+solution as a whole and as a token stream, and how much text the stream
+formatter holds back. Run with:
+
+    python -m tutoring_agent.bench.math_formatter
+"""
+
+import statistics
+from typing import List, Tuple
+
+from ..tools.math_formatter import MathStreamFormatter, format_math
+from .text_processing import print_rows, time_per_call
+
+# (before, after) pairs from the ResponseFormatter instruction, plus the
+# notation rules it listed
+DOCUMENTED_EXAMPLES: List[Tuple[str, str]] = [
+    ("x^2+2x+1=0", "x² + 2x + 1 = 0"),
+    ("F=ma", "F = ma"),
+    ("H2SO4", "H₂SO₄"),
+    ("3*10^8 m/s", "3.0 × 10⁸ m/s"),
+    ("sin(theta)=opposite/hypotenuse", "sin θ = opposite/hypotenuse"),
+    ("E=mc^2", "E = mc²"),
+    ("a^3 and 10^6", "a³ and 10⁶"),
+    ("H2O, CO2, x_1, x_2", "H₂O, CO₂, x₁, x₂"),
+    ("1/2 and 3/4", "½ and ¾"),
+    ("+/- 5, x != 0, a <= b, c >= d", "± 5, x ≠ 0, a ≤ b, c ≥ d"),
+    ("sqrt(x), pi, theta, alpha, beta", "√x, π, θ, α, β"),
+    ("6.022*10^23 particles", "6.022 × 10²³ particles"),
+    ("CaCO3 and NH4NO3", "CaCO₃ and NH₄NO₃"),
+    ("9.8 m/s^2", "9.8 m/s²"),
+]
+
+# Names that look like formulas and must be left as written
+FORMULA_LOOKALIKES = ["B12 vitamin", "H1N1 virus", "U2 band", "Vitamin K2"]
+
+SOLUTION = """**Solving x^2-5x+6=0**
+
+1. Concept introduction: a quadratic has the form ax^2+bx+c=0 with a != 0.
+2. Factor: x^2-5x+6=(x-2)(x-3), so x=2 or x=3.
+3. The discriminant b^2-4ac=25-24=1 is positive, so there are two real roots.
+
+In chemistry, H2SO4 reacts with 2NaOH to give Na2SO4 and 2H2O. Light travels
+at 3*10^8 m/s and one mole holds 6.022 x 10^23 particles. For an angle theta,
+sin(theta)=opposite/hypotenuse and the area of a circle is pi*r^2.
+
+```python
+print(x**2 - 5*x + 6)
+```
+
+Common mistakes to avoid: writing x^2 as 2x, or forgetting the +/- in
+x=(-b +/- sqrt(b^2-4ac))/(2a). Practice: solve 2x^2+5x-3=0 and x^2-9=0.
+"""
+
+CHUNK_CHARS = 16
+
+
+def check_documented_examples() -> List[Tuple[str, str, str]]:
+    """
+    Format every documented example
+
+    Returns:
+        List of (before, expected, got) rows that did not match
+    """
+    return [
+        (before, after, format_math(before))
+        for before, after in DOCUMENTED_EXAMPLES
+        if format_math(before) != after
+    ]
+
+
+def chunks(text: str, size: int = CHUNK_CHARS) -> List[str]:
+    """Split text into stream-sized chunks"""
+    return [text[index : index + size] for index in range(0, len(text), size)]
+
+
+def stream_format(pieces: List[str]) -> str:
+    formatter = MathStreamFormatter()
+    return "".join(formatter.feed(piece) for piece in pieces) + formatter.flush()
+
+
+def benchmark_cost(repeat: int = 8) -> List[Tuple[str, str, float]]:
+    """
+    Cost of formatting a synthesized solution
+
+    Returns:
+        List of (function, input, microseconds per call) rows
+    """
+    text = SOLUTION * repeat
+    pieces = chunks(text)
+    label = f"{len(text) // 1000}k"
+    return [
+        ("format_math", label, time_per_call(lambda: format_math(text))),
+        (
+            f"MathStreamFormatter ({CHUNK_CHARS} chars)",
+            label,
+            time_per_call(lambda: stream_format(pieces)),
+        ),
+    ]
+
+
+def measure_lag(repeat: int = 8) -> Tuple[float, int]:
+    """
+    Characters received but not yet emitted after each streamed chunk
+
+    Returns:
+        Tuple of (mean, max) held-back characters
+    """
+    formatter = MathStreamFormatter()
+    held = []
+    for piece in chunks(SOLUTION * repeat):
+        formatter.feed(piece)
+        held.append(formatter.pending)
+    return statistics.mean(held), max(held)
+
+
+def main() -> None:
+    mismatches = check_documented_examples()
+    print(
+        f"Documented examples: {len(DOCUMENTED_EXAMPLES) - len(mismatches)}"
+        f"/{len(DOCUMENTED_EXAMPLES)} formatted as instructed"
+    )
+    for before, after, got in mismatches:
+        print(f"  {before!r}: expected {after!r}, got {got!r}")
+
+    for text in FORMULA_LOOKALIKES:
+        assert format_math(text) == text, (text, format_math(text))
+    assert format_math("O2, N2 and Cl2") == "O₂, N₂ and Cl₂"
+
+    text = SOLUTION * 8
+    assert stream_format(chunks(text)) == format_math(text)
+    print_rows("Formatting cost", benchmark_cost())
+
+    mean, peak = measure_lag()
+    print(
+        f"\nStreaming lag ({CHUNK_CHARS}-char chunks): {mean:.0f} characters "
+        f"held back on average, {peak} at most"
+    )
+
+
+if __name__ == "__main__":
+    main()
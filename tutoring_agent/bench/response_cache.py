@@ -0,0 +1,218 @@
+"""
+Response cache benchmark: repeated questions with and without the cache
+
+Measures cache lookups and stores, then asks the same analysis-pipeline
+questions twice through root_agent on a stub model with a fixed round-trip
+latency, once with the response cache off and once with it on. Rephrasings
+that normalize to the same key are asked as well. The cache file lives in a
+temporary directory for the run. Run with:
+
+    python -m tutoring_agent.bench.response_cache
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..agent import root_agent
+from ..agents.analysis_pipeline.agent import response_cache
+from ..agents.solution_pipeline.agent import search_cache
+from ..tools.response_cache import ResponseCache, cache_key, question_cache_key
+from .equation_solving import STUB_LATENCY, run_question
+from .stub_model import StubLlm, use_model
+from .text_processing import print_rows, time_per_call
+
+# Each question is asked once more as written, then in the rephrased form
+REPEATED_QUESTIONS: List[Tuple[str, str]] = [
+    (
+        "Explain photosynthesis process in plants",
+        "explain photosynthesis process in plants?",
+    ),
+    (
+        "Solve the quadratic equation 2x^2 + 5x - 3 = 0 step by step",
+        "Solve the quadratic equation 2x² + 5x − 3 = 0  step by step",
+    ),
+    (
+        "নিউটনের দ্বিতীয় সূত্র ব্যাখ্যা কর",
+        "নিউটনের দ্বিতীয় সূত্র ব্যাখ্যা কর।",
+    ),
+    (
+        "Why does ice float on water? Explain with density",
+        "why does ice float on water? explain with density.",
+    ),
+]
+
+
+@contextlib.contextmanager
+def temporary_cache_file() -> Iterator[str]:
+    """Point the pipeline's response cache at an empty temporary file"""
+    path = response_cache.path
+    response_cache.close()
+    with tempfile.TemporaryDirectory() as directory:
+        response_cache.path = os.path.join(directory, "responses.sqlite3")
+        try:
+            yield response_cache.path
+        finally:
+            response_cache.close()
+            response_cache.path = path
+
+
+def benchmark_operations(cache: ResponseCache) -> List[Tuple[str, str, float]]:
+    """
+    Time key derivation, lookups and stores on a cache with one entry
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    question = REPEATED_QUESTIONS[0][0]
+    key = question_cache_key(question)
+    response = "**Photosynthesis** " * 200
+    cache.put(key, response, 1.8)
+    return [
+        (
+            "question_cache_key",
+            question,
+            time_per_call(lambda: question_cache_key(question)),
+        ),
+        ("get hit", f"{len(response)} chars", time_per_call(lambda: cache.get(key))),
+        ("get miss", "unknown key", time_per_call(lambda: cache.get("0" * 64))),
+        (
+            "put",
+            f"{len(response)} chars",
+            time_per_call(lambda: cache.put(key, response)),
+        ),
+    ]
+
+
+async def benchmark_repeats(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, int, float, int, float]]:
+    """
+    Ask every question, then ask it again as written and rephrased
+
+    The first pass runs without the cache, the second with it.
+
+    Returns:
+        List of (question, calls without cache, seconds without cache, calls
+        with cache, seconds with cache) rows, three per question
+    """
+    model = StubLlm(
+        latency=latency,
+        transfers={
+            "ConversationRouter": "AnalysisPipelineAgent",
+            "QuestionAnalyzer": "SolutionPipelineAgent",
+        },
+    )
+    rows = []
+    with use_model(root_agent, model):
+        for question, rephrased in REPEATED_QUESTIONS:
+            for asked in (question, question, rephrased):
+                uncached = await run_question(root_agent, model, asked)
+                cached = await run_question(root_agent, model, asked, use_cache=True)
+                rows.append((asked, *uncached, *cached))
+    return rows
+
+
+# A question and a follow-up whose answer depends on it
+CONVERSATION = [
+    "Solve the quadratic equation 2x^2 + 5x - 3 = 0 step by step",
+    "Can you explain the second step in more detail please",
+]
+
+
+async def ask_conversation(model: StubLlm, questions: Sequence[str]) -> None:
+    """Ask questions one after another in a single session"""
+    runner = InMemoryRunner(agent=root_agent, app_name="bench")
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="student"
+    )
+    for question in questions:
+        model.reset()
+        # The stub answers from the session's first message; give every turn
+        # its own answer, as the synthesizer would
+        model.replies["SolutionSynthesizerAgent"] = f"**Answer:** {question}"
+        message = types.Content(role="user", parts=[types.Part(text=question)])
+        async for _ in runner.run_async(
+            user_id="student", session_id=session.id, new_message=message
+        ):
+            pass
+
+
+async def check_session_scope(latency: float = STUB_LATENCY) -> None:
+    """
+    Check that only first turns are cached and formulas keep their case
+
+    A follow-up answered in one conversation must not be stored, or another
+    student asking the same words would get an answer about a question they
+    never asked.
+
+    Raises:
+        AssertionError: A follow-up was stored or served, or "CO" and "Co"
+            share a key
+    """
+    assert cache_key("What is CO?", "english", "9-10") != cache_key(
+        "What is Co?", "english", "9-10"
+    )
+    assert cache_key("What is CO?", "english", "9-10") == cache_key(
+        "what is CO", "english", "9-10"
+    )
+
+    model = StubLlm(
+        latency=latency,
+        transfers={
+            "ConversationRouter": "AnalysisPipelineAgent",
+            "QuestionAnalyzer": "SolutionPipelineAgent",
+        },
+    )
+    with use_model(root_agent, model), temporary_cache_file():
+        response_cache.clear()
+        await ask_conversation(model, CONVERSATION)
+        assert response_cache.stats()["entries"] == 1, "follow-up was stored"
+        await ask_conversation(model, CONVERSATION[1:])
+        assert response_cache.stats()["hits"] == 0, "follow-up was served"
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    with search_cache.disabled():
+        asyncio.run(check_session_scope())
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, "responses.sqlite3"))
+        print_rows("Response cache", benchmark_operations(cache))
+        cache.close()
+
+    # Only the response cache is measured; search results are not stored
+    with temporary_cache_file(), search_cache.disabled():
+        rows = asyncio.run(benchmark_repeats())
+        stats: Dict[str, float] = response_cache.stats()
+
+    print(f"\nStub model latency: {STUB_LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'question':<40} {'no cache':>16} {'cache':>16}")
+    for question, calls, seconds, cached_calls, cached_seconds in rows:
+        label = question if len(question) <= 38 else question[:35] + "..."
+        print(
+            f"{label:<40} {calls:>4} calls {seconds:>5.2f}s "
+            f"{cached_calls:>4} calls {cached_seconds:>5.2f}s"
+        )
+    total = sum(row[2] for row in rows)
+    cached_total = sum(row[4] for row in rows)
+    print(f"\nTotal: no cache {total:.2f}s, cache {cached_total:.2f}s")
+    print(
+        f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%}), {stats['latency_saved_seconds']:.2f}s "
+        f"pipeline time saved, {stats['entries']} entries, {stats['bytes']} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
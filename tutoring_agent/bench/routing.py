@@ -0,0 +1,215 @@
+"""
+Routing benchmark for the local analysis callbacks
+
+Runs a labelled sample of student messages through the local classifier and
+analyzers and reports how many LLM calls they replace. Run with:
+
+    python -m tutoring_agent.bench.routing
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..tools.context_analysis import LOCAL_CONTEXT_ANALYSIS_THRESHOLD, analyze_context
+from ..tools.input_analysis import LOCAL_INPUT_ANALYSIS_THRESHOLD, analyze_input
+from ..tools.query_classifier import LOCAL_CLASSIFICATION_THRESHOLD, classify_query
+from .text_processing import time_per_call
+
+# (message, expected classification) in English, Bengali and Banglish
+SAMPLE_QUERIES: List[Tuple[str, str]] = [
+    # Greetings and social messages
+    ("hello", "GENERAL"),
+    ("Hi!", "GENERAL"),
+    ("Good morning", "GENERAL"),
+    ("Hello, how are you?", "GENERAL"),
+    ("What's your name?", "GENERAL"),
+    ("Who created you?", "GENERAL"),
+    ("What can you do?", "GENERAL"),
+    ("Tell me a joke", "GENERAL"),
+    ("I'm feeling stressed about exams", "GENERAL"),
+    ("Thank you so much!", "GENERAL"),
+    ("bye, see you tomorrow", "GENERAL"),
+    ("আসসালামু আলাইকুম", "GENERAL"),
+    ("হ্যালো, কেমন আছেন?", "GENERAL"),
+    ("আপনার নাম কি?", "GENERAL"),
+    ("আপনি কি করতে পারেন?", "GENERAL"),
+    ("ধন্যবাদ", "GENERAL"),
+    ("kemon acho?", "GENERAL"),
+    ("Can you help me with my studies?", "GENERAL"),
+    ("Nice weather today", "GENERAL"),
+    ("Are you ChatGPT?", "GENERAL"),
+    ("Whats his name", "GENERAL"),
+    # Single calculations, equations, definitions and formulas
+    ("What is photosynthesis?", "SIMPLE_EDUCATIONAL"),
+    ("সালোকসংশ্লেষণ কাকে বলে?", "SIMPLE_EDUCATIONAL"),
+    ("বল কী?", "SIMPLE_EDUCATIONAL"),
+    ("Area of circle formula", "SIMPLE_EDUCATIONAL"),
+    ("What is the formula for kinetic energy?", "SIMPLE_EDUCATIONAL"),
+    ("x + y = 5 and x - y = 1", "SIMPLE_EDUCATIONAL"),
+    ("12.5 + 7.25", "SIMPLE_EDUCATIONAL"),
+    # Equations, calculations and subject questions
+    ("Solve 2x + 5 = 13", "SIMPLE_EDUCATIONAL"),
+    ("সমাধান কর 2x+5=13", "SIMPLE_EDUCATIONAL"),
+    ("২x + ৫ = ১৩ সমাধান করুন", "SIMPLE_EDUCATIONAL"),
+    ("What is 15 * 8?", "SIMPLE_EDUCATIONAL"),
+    (
+        "Solve the quadratic equation 2x^2 + 5x - 3 = 0 step by step",
+        "COMPLEX_EDUCATIONAL",
+    ),
+    (
+        "A particle moves along x(t) = 2cos(3t) + t^2, y(t) = 3sin(2t). "
+        "Find the velocity and acceleration at t = 1.",
+        "COMPLEX_EDUCATIONAL",
+    ),
+    ("Find the derivative of sin(x) * x^2", "COMPLEX_EDUCATIONAL"),
+    ("Explain photosynthesis process in plants", "COMPLEX_EDUCATIONAL"),
+    ("Define atom", "SIMPLE_EDUCATIONAL"),
+    (
+        "What is the difference between velocity and acceleration?",
+        "COMPLEX_EDUCATIONAL",
+    ),
+    (
+        "The lengths of the three sides of a right-angled triangle are (x-1) cm, "
+        "x cm, and (x+1) cm. What is the length of the hypotenuse?",
+        "COMPLEX_EDUCATIONAL",
+    ),
+    (
+        "A rectangle has length (2x+3) and width (x-1). If the area is 50, find x.",
+        "COMPLEX_EDUCATIONAL",
+    ),
+    (
+        "Prove that the sum of angles in a triangle is 180 degrees",
+        "COMPLEX_EDUCATIONAL",
+    ),
+    ("একটি বস্তুর উপর ১০ নিউটন বল প্রয়োগ করলে ত্বরণ কত হবে?", "COMPLEX_EDUCATIONAL"),
+    ("সালোকসংশ্লেষণ প্রক্রিয়া ব্যাখ্যা কর", "COMPLEX_EDUCATIONAL"),
+    ("কোষের গঠন বর্ণনা কর", "COMPLEX_EDUCATIONAL"),
+    ("দ্বিঘাত সমীকরণ x^2 - 5x + 6 = 0 সমাধান কর", "SIMPLE_EDUCATIONAL"),
+    ("What is an acid and a base?", "COMPLEX_EDUCATIONAL"),
+    ("How does DNA replication work in a cell?", "COMPLEX_EDUCATIONAL"),
+    ("Hi! Can you explain Newton's law of force and motion?", "COMPLEX_EDUCATIONAL"),
+    ("amake ei math ta bujhao", "COMPLEX_EDUCATIONAL"),
+    ("Why is the sky blue?", "COMPLEX_EDUCATIONAL"),
+    ("What is light?", "COMPLEX_EDUCATIONAL"),
+    ("Help me with question 5 from the book", "COMPLEX_EDUCATIONAL"),
+    # "his", "this" and "hits" are not greetings
+    ("Who discovered gravity and his laws", "COMPLEX_EDUCATIONAL"),
+    ("Explain this step of the derivation", "COMPLEX_EDUCATIONAL"),
+    ("How many hits does it take to break the glass?", "COMPLEX_EDUCATIONAL"),
+]
+
+
+def evaluate_routing(
+    queries: List[Tuple[str, str]] = SAMPLE_QUERIES,
+    threshold: float = LOCAL_CLASSIFICATION_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Measure how many classifier LLM calls the local decision removes
+
+    Args:
+        queries: (message, expected classification) pairs
+        threshold: Confidence needed to skip the LLM classifier
+
+    Returns:
+        Dictionary with totals, skipped and escalated counts, the number of
+        skipped decisions that disagree with the label, and per-class counts
+    """
+    skipped = Counter()
+    escalated = Counter()
+    disagreements = []
+    for text, expected in queries:
+        result = classify_query(text)
+        if result["confidence"] >= threshold:
+            skipped[expected] += 1
+            if result["classification"] != expected:
+                disagreements.append((text, expected, result["classification"]))
+        else:
+            escalated[expected] += 1
+
+    total = len(queries)
+    return {
+        "total": total,
+        "skipped": sum(skipped.values()),
+        "escalated": sum(escalated.values()),
+        "skip_rate": sum(skipped.values()) / total if total else 0.0,
+        "disagreements": disagreements,
+        "skipped_by_class": dict(skipped),
+        "escalated_by_class": dict(escalated),
+    }
+
+
+def evaluate_local_coverage(
+    analyze: Callable[[str], Dict[str, Any]],
+    threshold: float,
+    confidence_field: str = "confidence_score",
+    texts: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Count how many educational queries a local analyzer answers on its own
+
+    Args:
+        analyze: Local replacement for an LLM analysis agent
+        threshold: Confidence needed to skip the LLM call
+        confidence_field: Key of the confidence value in the analysis
+        texts: Queries to analyze; defaults to the educational samples
+
+    Returns:
+        Dictionary with total, local and escalated counts, the escalated
+        texts, and the analyzer cost in microseconds per query
+    """
+    if texts is None:
+        texts = [t for t, label in SAMPLE_QUERIES if label != "GENERAL"]
+    escalated = [t for t in texts if analyze(t)[confidence_field] < threshold]
+    cost = time_per_call(lambda: [analyze(t) for t in texts]) / len(texts)
+    return {
+        "total": len(texts),
+        "local": len(texts) - len(escalated),
+        "escalated": escalated,
+        "cost_us": cost,
+    }
+
+
+def print_coverage(title: str, report: Dict[str, Any]) -> None:
+    """Print an evaluate_local_coverage report"""
+    print(f"\n{title}")
+    print(
+        f"answered locally:        {report['local']}/{report['total']}"
+        f" ({report['local'] / report['total']:.0%}), {report['cost_us']:.1f} us/query"
+    )
+    for text in report["escalated"]:
+        print(f"  escalated: {text!r}")
+
+
+def main() -> None:
+    report = evaluate_routing()
+    print(f"\nLocal pre-classifier (threshold {LOCAL_CLASSIFICATION_THRESHOLD})")
+    print(f"sample queries:          {report['total']}")
+    print(
+        f"LLM classifier skipped:  {report['skipped']} ({report['skip_rate']:.0%})"
+        f"  by class {report['skipped_by_class']}"
+    )
+    print(
+        f"escalated to the LLM:    {report['escalated']}"
+        f"  by class {report['escalated_by_class']}"
+    )
+    print(f"wrong skipped decisions: {len(report['disagreements'])}")
+    for text, expected, got in report["disagreements"]:
+        print(f"  {text!r}: expected {expected}, got {got}")
+    assert not report["disagreements"], "confident local decision is wrong"
+
+    texts = [text for text, _ in SAMPLE_QUERIES]
+    cost = time_per_call(lambda: [classify_query(t) for t in texts]) / len(texts)
+    print(f"classify_query cost:     {cost:.1f} us/query")
+
+    print_coverage(
+        f"InputAnalyzerAgent (threshold {LOCAL_INPUT_ANALYSIS_THRESHOLD})",
+        evaluate_local_coverage(analyze_input, LOCAL_INPUT_ANALYSIS_THRESHOLD),
+    )
+    print_coverage(
+        f"ContextAnalyzerAgent (threshold {LOCAL_CONTEXT_ANALYSIS_THRESHOLD})",
+        evaluate_local_coverage(analyze_context, LOCAL_CONTEXT_ANALYSIS_THRESHOLD),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Search cache benchmark: a class asking the same question at once
+
+Sends the same complex question from a class of students concurrently
+through root_agent on a stub model, where KnowledgeRetriever's call takes as
+long as a grounded web search. The question is outside the local curriculum
+index, so every student needs the web tier. Compares the search cache off,
+the in-memory backend, the SQLite backend, and the SQLite backend after a
+restart, counting KnowledgeRetriever model calls and per-student latency.
+The response cache is off throughout so every student runs the pipeline.
+Run with:
+
+    python -m tutoring_agent.bench.search_cache
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Iterator, List, Tuple, Union
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..agent import root_agent
+from ..agents.analysis_pipeline.agent import response_cache
+from ..agents.solution_pipeline.agent import knowledge_retriever, search_cache
+from ..tools.response_cache import MemoryResponseCache, ResponseCache
+from .curriculum_index import WEB_SEARCH_LATENCY
+from .equation_solving import STUB_LATENCY
+from .stub_model import StubLlm, use_model
+
+QUESTION = "Explain how black holes form"
+STUDENTS = 40
+
+
+@contextlib.contextmanager
+def cache_backend(
+    backend: Union[ResponseCache, MemoryResponseCache],
+) -> Iterator[None]:
+    """Serve KnowledgeRetriever's search cache from backend for a while"""
+    previous = search_cache.backend
+    search_cache.backend = backend
+    try:
+        yield
+    finally:
+        search_cache.backend = previous
+
+
+async def ask_class(
+    model: StubLlm, question: str = QUESTION, students: int = STUDENTS
+) -> Tuple[int, List[float]]:
+    """
+    Ask question from every student at the same time
+
+    Returns:
+        Tuple of (KnowledgeRetriever model calls, seconds per student)
+    """
+    runner = InMemoryRunner(agent=root_agent, app_name="bench")
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+
+    async def ask(student: int) -> float:
+        session = await runner.session_service.create_session(
+            app_name="bench", user_id=f"student-{student}"
+        )
+        start = time.perf_counter()
+        async for _ in runner.run_async(
+            user_id=f"student-{student}", session_id=session.id, new_message=message
+        ):
+            pass
+        return time.perf_counter() - start
+
+    model.reset()
+    times = await asyncio.gather(*(ask(student) for student in range(students)))
+    return model.calls.count(knowledge_retriever.name), list(times)
+
+
+async def benchmark_class(
+    latency: float = STUB_LATENCY,
+) -> List[Tuple[str, int, int, float, float]]:
+    """
+    Ask the class question under each cache setting
+
+    Returns:
+        List of (setting, searches, coalesced, p50 seconds, max seconds) rows
+    """
+    model = StubLlm(
+        latency=latency,
+        agent_latency={knowledge_retriever.name: WEB_SEARCH_LATENCY},
+        transfers={"QuestionAnalyzer": "SolutionPipelineAgent"},
+    )
+    rows = []
+
+    async def run(setting: str) -> None:
+        coalesced = search_cache.stats()["coalesced"]
+        searches, times = await ask_class(model)
+        rows.append(
+            (
+                setting,
+                searches,
+                search_cache.stats()["coalesced"] - coalesced,
+                statistics.median(times),
+                max(times),
+            )
+        )
+
+    with use_model(root_agent, model), response_cache.disabled():
+        with search_cache.disabled():
+            # The first wave pays for imports and first-call setup
+            await ask_class(model)
+            await run("no cache")
+        with cache_backend(MemoryResponseCache()):
+            await run("memory")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search_cache.sqlite3")
+            for setting in ("sqlite", "sqlite after restart"):
+                backend = ResponseCache(path)
+                with cache_backend(backend):
+                    await run(setting)
+                backend.close()
+    return rows
+
+
+async def check_failed_search(latency: float = STUB_LATENCY) -> None:
+    """
+    Check that a search whose model call raises does not hold up later ones
+
+    Raises:
+        AssertionError: The failed search is still in flight, or the next
+            identical search waited for it
+    """
+    model = StubLlm(
+        latency=latency,
+        failures={knowledge_retriever.name: ConnectionError("search failed")},
+        transfers={"QuestionAnalyzer": "SolutionPipelineAgent"},
+    )
+    with use_model(root_agent, model), response_cache.disabled():
+        with cache_backend(MemoryResponseCache()):
+            try:
+                await ask_class(model, students=1)
+            except ConnectionError:
+                pass
+            assert not search_cache._flights, "failed search still in flight"
+
+            model.failures.clear()
+            timeouts = search_cache.stats()["timeouts"]
+            searches, _ = await ask_class(model, students=1)
+            assert searches == 1
+            assert search_cache.stats()["timeouts"] == timeouts
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    asyncio.run(check_failed_search())
+    rows = asyncio.run(benchmark_class())
+    print(
+        f"{STUDENTS} students asking {QUESTION!r} at once, "
+        f"{STUB_LATENCY * 1000:.0f} ms per model call and "
+        f"{WEB_SEARCH_LATENCY * 1000:.0f} ms per web-grounded retrieval\n"
+    )
+    print(
+        f"{'setting':<22} {'searches':>8} {'saved':>6} {'coalesced':>9} "
+        f"{'p50 s':>7} {'max s':>7}"
+    )
+    baseline = rows[0][1]
+    for setting, searches, coalesced, p50, peak in rows:
+        saved = baseline - searches
+        print(
+            f"{setting:<22} {searches:>8} {saved:>6} {coalesced:>9} "
+            f"{p50:>7.2f} {peak:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
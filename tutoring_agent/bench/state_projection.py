@@ -0,0 +1,150 @@
+"""
+State projection benchmark: instruction tokens per agent
+
+Runs a question mix through root_agent on a stub model, then renders the
+instruction of every agent built with ProjectedInstruction from the final
+session state twice: with ADK's whole-value dumps and with the agent's
+compact views. Tokens are estimated at four characters per token, as the stub
+model does. The stub's enriched_context and generated_examples are shorter
+than Gemini's, so the synthesizer's reduction is a lower bound. Run with:
+
+    python -m tutoring_agent.bench.state_projection
+"""
+
+import asyncio
+import logging
+import statistics
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Tuple
+
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..agent import root_agent
+from ..agents.analysis_pipeline.agent import response_cache
+from ..agents.callbacks import walk_agents
+from ..agents.solution_pipeline.agent import search_cache
+from ..agents.state_projection import (
+    ProjectedInstruction,
+    project_state,
+    render_instruction,
+)
+from .fast_track_routing import model_routing
+from .stub_model import StubLlm, use_model
+
+QUESTIONS = [
+    "Explain photosynthesis process in plants",
+    "Explain Newton's second law of motion with an example",
+    "Solve the quadratic equation 2x^2 + 5x - 3 = 0 step by step",
+    "How does refraction of light happen? Explain with Snell's law",
+    "শক্তির সংরক্ষণশীলতা নীতি উদাহরণসহ ব্যাখ্যা কর",
+    "Explain how black holes form",
+    "Why do noble gases not react easily?",
+    "What is 3/4 of 20?",
+    "Define acceleration",
+    "Help me with this",
+]
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def projected_agents() -> List[LlmAgent]:
+    """Agents of root_agent whose instruction renders compact state views"""
+    return [
+        agent
+        for agent in walk_agents(root_agent)
+        if isinstance(getattr(agent, "instruction", None), ProjectedInstruction)
+    ]
+
+
+def measure(agent: LlmAgent, state: Mapping[str, Any]) -> Tuple[int, int, int, int]:
+    """
+    Instruction tokens of agent for a session state
+
+    Returns:
+        Tuple of (raw state tokens, projected state tokens, raw instruction
+        tokens, projected instruction tokens)
+    """
+    instruction = agent.instruction
+    raw_state = projected_state = 0
+    for key, fields in instruction.views.items():
+        raw_state += _tokens(str(state[key]))
+        projected_state += _tokens(
+            project_state(state[key], fields, instruction.max_chars)
+        )
+    raw = render_instruction(instruction.template, state)
+    projected = render_instruction(
+        instruction.template, state, instruction.views, instruction.max_chars
+    )
+    return raw_state, projected_state, _tokens(raw), _tokens(projected)
+
+
+async def final_state(model: StubLlm, question: str) -> Dict[str, Any]:
+    """Session state after root_agent answers question"""
+    runner = InMemoryRunner(agent=root_agent, app_name="bench")
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="student"
+    )
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    async for _ in runner.run_async(
+        user_id="student", session_id=session.id, new_message=message
+    ):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="bench", user_id="student", session_id=session.id
+    )
+    return dict(session.state)
+
+
+async def benchmark_projection() -> Dict[str, List[Tuple[int, int, int, int]]]:
+    """
+    Measure every projected agent on every question whose state it reads
+
+    Returns:
+        Agent name → list of measure rows
+    """
+    model = StubLlm(
+        transfers={
+            "ConversationRouter": "AnalysisPipelineAgent",
+            "QuestionAnalyzer": "SolutionPipelineAgent",
+        },
+    )
+    agents = projected_agents()
+    rows = defaultdict(list)
+    with use_model(root_agent, model), model_routing():
+        with response_cache.disabled(), search_cache.disabled():
+            for question in QUESTIONS:
+                state = await final_state(model, question)
+                for agent in agents:
+                    if all(key in state for key in agent.instruction.views):
+                        rows[agent.name].append(measure(agent, state))
+    return rows
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    rows = asyncio.run(benchmark_projection())
+    print(f"{len(QUESTIONS)} questions, mean tokens per instruction (4 chars/token)\n")
+    print(
+        f"{'agent':<28} {'questions':>9} {'state tokens':>16} {'saved':>6} "
+        f"{'instruction tokens':>20} {'saved':>6}"
+    )
+    for name, measured in rows.items():
+        raw_state, state, raw, projected = (
+            statistics.mean(column) for column in zip(*measured)
+        )
+        print(
+            f"{name:<28} {len(measured):>9} {raw_state:>7.0f} → {state:<6.0f} "
+            f"{1 - state / raw_state:>6.0%} {raw:>9.0f} → {projected:<8.0f} "
+            f"{1 - projected / raw:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
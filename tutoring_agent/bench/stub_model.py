@@ -0,0 +1,196 @@
+"""
+Stub LLM for benchmarking agent pipelines without network calls
+
+StubLlm answers every request after a configurable delay and records which
+agent made it and when, so a benchmark can count LLM hops and measure how much
+of a pipeline's latency comes from model round-trips. Replies are canned
+outputs shaped like each agent's output_key.
+"""
+
+import asyncio
+import contextlib
+import json
+import random
+import re
+import time
+from typing import AsyncGenerator, Dict, Iterator, List, Literal, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+from .canned_outputs import canned_output
+
+_AGENT_NAME = re.compile(r'Your internal name is "([^"]+)"')
+
+
+class StubLlm(BaseLlm):
+    """
+    Model that replies instantly from a script instead of calling an API
+
+    Attributes:
+        latency: Median seconds to wait before each reply, standing in for a
+            real model round-trip
+        distribution: How the wait varies between calls: "fixed", "uniform"
+            (latency ± spread × latency) or "lognormal" (sigma spread)
+        spread: Width of the distribution
+        agent_latency: Agent name → median latency overriding latency
+        seed: Seed of the latency draws, so runs are reproducible
+        transfers: Agent name → sub-agent it transfers to
+        tool_calls: Agent name → (tool, argument) called with the user text
+            before the agent answers
+        replies: Agent name → fixed reply text, e.g. an escape-hatch marker
+        failures: Agent name → exception raised after the wait, as a network
+            error from a real model is
+        output_keys: Agent name → output_key, filled in by use_model; agents
+            with a canned output for their key get it as the reply
+        calls: Names of the agents that called the model, in order
+        intervals: (agent, start, end) perf_counter times of every call
+    """
+
+    # Built-in tools such as google_search only accept Gemini 2 model names
+    model: str = "gemini-2.0-flash-stub"
+    latency: float = 0.0
+    distribution: Literal["fixed", "uniform", "lognormal"] = "fixed"
+    spread: float = 0.0
+    agent_latency: Dict[str, float] = Field(default_factory=dict)
+    seed: int = 0
+    transfers: Dict[str, str] = Field(default_factory=dict)
+    tool_calls: Dict[str, Tuple[str, str]] = Field(default_factory=dict)
+    replies: Dict[str, str] = Field(default_factory=dict)
+    failures: Dict[str, Exception] = Field(default_factory=dict)
+    output_keys: Dict[str, str] = Field(default_factory=dict)
+    calls: List[str] = Field(default_factory=list)
+    intervals: List[Tuple[str, float, float]] = Field(default_factory=list)
+    _random: random.Random = PrivateAttr(default_factory=random.Random)
+
+    def model_post_init(self, __context) -> None:
+        self._random.seed(self.seed)
+
+    def reset(self) -> None:
+        """Forget recorded calls before the next run"""
+        self.calls.clear()
+        self.intervals.clear()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        agent = _agent_name(llm_request)
+        self.calls.append(agent)
+        start = time.perf_counter()
+        delay = self._delay(agent)
+        if delay:
+            await asyncio.sleep(delay)
+        if agent in self.failures:
+            raise self.failures[agent]
+        content = self._reply(agent, llm_request)
+        self.intervals.append((agent, start, time.perf_counter()))
+        yield LlmResponse(content=content, usage_metadata=_usage(llm_request, content))
+
+    def _delay(self, agent: str) -> float:
+        median = self.agent_latency.get(agent, self.latency)
+        if self.distribution == "uniform":
+            return max(
+                0.0, median * self._random.uniform(1 - self.spread, 1 + self.spread)
+            )
+        if self.distribution == "lognormal":
+            return median * self._random.lognormvariate(0.0, self.spread)
+        return median
+
+    def _reply(self, agent: str, llm_request: LlmRequest) -> types.Content:
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered_tool = bool(
+            last and any(part.function_response for part in last.parts or [])
+        )
+
+        if not answered_tool and agent in self.transfers:
+            return _function_call(
+                "transfer_to_agent", {"agent_name": self.transfers[agent]}
+            )
+        if not answered_tool and agent in self.tool_calls:
+            tool, argument = self.tool_calls[agent]
+            if tool in llm_request.tools_dict:
+                return _function_call(tool, {argument: _first_user_text(llm_request)})
+
+        # Valid JSON keeps agents that parse their state inputs working
+        text = (
+            self.replies.get(agent)
+            or canned_output(self.output_keys.get(agent), _first_user_text(llm_request))
+            or json.dumps({"stub_response": agent})
+        )
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+@contextlib.contextmanager
+def use_model(root: BaseAgent, model: BaseLlm) -> Iterator[BaseLlm]:
+    """
+    Temporarily run every LlmAgent under root on the given model
+
+    Args:
+        root: Top of the agent tree
+        model: Model instance to install
+
+    Returns:
+        Context manager yielding the model; the original models are restored
+        on exit
+    """
+    originals = []
+    for agent in _walk(root):
+        if isinstance(agent, LlmAgent):
+            originals.append((agent, agent.model))
+            agent.model = model
+            if isinstance(model, StubLlm) and agent.output_key:
+                model.output_keys[agent.name] = agent.output_key
+    try:
+        yield model
+    finally:
+        for agent, original in originals:
+            agent.model = original
+
+
+def _walk(agent: BaseAgent) -> Iterator[BaseAgent]:
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def _agent_name(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else ""
+    match = _AGENT_NAME.search(str(instruction or ""))
+    return match.group(1) if match else "unknown"
+
+
+def _first_user_text(llm_request: LlmRequest) -> str:
+    for content in llm_request.contents:
+        if content.role == "user":
+            return "".join(part.text or "" for part in content.parts or [])
+    return ""
+
+
+def _usage(
+    llm_request: LlmRequest, content: types.Content
+) -> types.GenerateContentResponseUsageMetadata:
+    """Token counts estimated at four characters per token, as for Gemini"""
+    instruction = llm_request.config.system_instruction if llm_request.config else ""
+    prompt = len(str(instruction or "")) + sum(
+        len(str(part.text or part.function_call or part.function_response or ""))
+        for request_content in llm_request.contents
+        for part in request_content.parts or []
+    )
+    completion = sum(
+        len(str(part.text or part.function_call or "")) for part in content.parts
+    )
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt // 4 + 1,
+        candidates_token_count=completion // 4 + 1,
+        total_token_count=(prompt + completion) // 4 + 2,
+    )
+
+
+def _function_call(name: str, args: Dict[str, str]) -> types.Content:
+    return types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+    )
@@ -0,0 +1,574 @@
+"""
+Micro-benchmarks for the local text processing tools
+
+Reports the per-call cost of the text_processing functions on short questions
+and on large pasted inputs. Run with:
+
+    python -m tutoring_agent.bench.text_processing
+"""
+
+import random
+import re
+import time
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from ..tools import text_processing
+from ..tools.context_analysis import analyze_context
+from ..tools.input_analysis import LOCAL_INPUT_ANALYSIS_THRESHOLD, analyze_input
+from ..tools.memoization import memoize
+from ..tools.batch_processing import classify_subject_batch, detect_language_batch
+from ..tools.text_processing import (
+    analyze_question,
+    assess_grade_level,
+    classify_subject,
+    detect_language,
+    extract_educational_context,
+    extract_mathematical_expressions,
+    normalize_stream,
+    normalize_text,
+    validate_question_completeness,
+)
+
+# Typical single questions in English, Bengali and Banglish
+SHORT_INPUTS = [
+    "Solve 2x + 5 = 13",
+    "২x + ৫ = ১৩ সমাধান করুন",
+    "Explain photosynthesis process in plants",
+    "একটি বস্তুর উপর ১০ নিউটন বল প্রয়োগ করলে ত্বরণ কত হবে?",
+    "Find the velocity and acceleration of a particle in motion",
+]
+
+_PARAGRAPH = (
+    "A particle moves along x(t) = 2cos(3t) + t^2 with velocity and acceleration "
+    "given by the derivative. The force on an ion in an electric field depends on "
+    "its charge. কোষের গঠন এবং সালোকসংশ্লেষণ প্রক্রিয়া ব্যাখ্যা কর। "
+    "দ্বিঘাত সমীকরণ x^2 - 5x + 6 = 0 সমাধান কর এবং বলের একক লেখ। "
+)
+
+
+def make_large_input(size: int = 10_000) -> str:
+    """
+    Build a pasted-document style input of roughly the requested size
+
+    Args:
+        size: Target length in characters
+
+    Returns:
+        Mixed Bengali and English text
+    """
+    repeats = size // len(_PARAGRAPH) + 1
+    return (_PARAGRAPH * repeats)[:size]
+
+
+def make_exercise_page(size: int = 10_000) -> str:
+    """
+    Build a pasted exercise sheet of roughly the requested size
+
+    Args:
+        size: Target length in characters
+
+    Returns:
+        Numbered equation exercises, one per line
+    """
+    lines = []
+    total = 0
+    while total < size:
+        n = len(lines) + 1
+        line = f"Q{n}. Solve {n}x + {n % 7 + 2} = {3 * n} and find x^2 - {n}/4.\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)[:size]
+
+
+# Regex extractor used before the math lexer: six overlapping patterns whose
+# matches were de-duplicated pairwise, kept as the benchmark reference
+_LEGACY_MATH_PATTERNS = [
+    (expr_type, re.compile(pattern, re.IGNORECASE))
+    for expr_type, pattern in {
+        "equation": r"[0-9a-zA-Z\+\-\*/\(\)\s]*=\s*[0-9a-zA-Z\+\-\*/\(\)\s]+",
+        "algebraic": r"[0-9]*[a-zA-Z][0-9]*[\+\-\*/\^]*[0-9a-zA-Z\+\-\*/\(\)\s]*",
+        "arithmetic": r"[0-9]+[\+\-\*/][0-9\+\-\*/\(\)\s]+",
+        "function": r"\b(?:sin|cos|tan|log|ln|sqrt|exp)\s*\([^)]+\)",
+        "fraction": r"[0-9]+/[0-9]+",
+        "power": r"[0-9a-zA-Z]+\^[0-9]+",
+    }.items()
+]
+
+
+def legacy_extract_expressions(text: str) -> List[Dict[str, Any]]:
+    """Reference implementation of the former regex-based extractor"""
+    expressions = [
+        {"type": expr_type, "start_pos": m.start(), "end_pos": m.end()}
+        for expr_type, pattern in _LEGACY_MATH_PATTERNS
+        for m in pattern.finditer(text)
+    ]
+    expressions.sort(key=lambda x: (x["start_pos"], x["start_pos"] - x["end_pos"]))
+    filtered: List[Dict[str, Any]] = []
+    for expr in expressions:
+        if not any(
+            expr["start_pos"] < kept["end_pos"] and expr["end_pos"] > kept["start_pos"]
+            for kept in filtered
+        ):
+            filtered.append(expr)
+    return filtered
+
+
+def time_per_call(func: Callable[[], object], min_time: float = 0.2) -> float:
+    """
+    Measure the average cost of one call in microseconds
+
+    Args:
+        func: Zero-argument callable to benchmark
+        min_time: Minimum total measurement time in seconds
+
+    Returns:
+        Average microseconds per call
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    while elapsed < min_time:
+        number *= 2
+        elapsed = timer.timeit(number)
+    return elapsed / number * 1e6
+
+
+# (text, physics keywords classify_subject must find): the verb বলা (to say)
+# must not read as বল (force) plus a case ending
+KEYWORD_MATCH_EXAMPLES: List[Tuple[str, List[str]]] = [
+    ("তুমি কি বলতে পারো গল্পটা কেমন?", []),
+    ("আমি তাকে বললাম", []),
+    ("বস্তুর উপর বলের মান কত?", ["বলের"]),
+    ("বলকে ভর দিয়ে ভাগ করো", ["বলকে"]),
+    ("Newton's second law relates force and motion", ["force", "motion"]),
+]
+
+
+def check_keyword_matches() -> None:
+    """
+    Check the physics keywords found in KEYWORD_MATCH_EXAMPLES
+
+    Raises:
+        AssertionError: A keyword was missed or matched inside another word
+    """
+    for text, keywords in KEYWORD_MATCH_EXAMPLES:
+        physics = classify_subject(text)["all_scores"]["physics"]
+        assert physics["matched_keywords"] == keywords, (text, physics)
+
+
+def benchmark_keyword_classification() -> List[Tuple[str, str, float]]:
+    """
+    Benchmark keyword scanning, classify_subject and assess_grade_level
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    inputs: Dict[str, List[str]] = {
+        "short": SHORT_INPUTS,
+        "10KB": [make_large_input(10_000)],
+    }
+    matcher = text_processing._KEYWORD_MATCHER
+    keywords = list(matcher._owners)
+
+    rows = []
+    for label, texts in inputs.items():
+        lowered = [t.lower() for t in texts]
+        # Reference: one substring scan per keyword, as before the matcher
+        rows.append(
+            (
+                "keywords: substring scan",
+                label,
+                time_per_call(
+                    lambda: [[k for k in keywords if k in t] for t in lowered]
+                )
+                / len(texts),
+            )
+        )
+        rows.append(
+            (
+                "keywords: KeywordMatcher",
+                label,
+                time_per_call(lambda: [matcher.match(t) for t in lowered]) / len(texts),
+            )
+        )
+        rows.append(
+            (
+                "classify_subject",
+                label,
+                time_per_call(lambda: [classify_subject(t) for t in texts])
+                / len(texts),
+            )
+        )
+        rows.append(
+            (
+                "assess_grade_level",
+                label,
+                time_per_call(lambda: [assess_grade_level(t, "math") for t in texts])
+                / len(texts),
+            )
+        )
+    return rows
+
+
+def benchmark_expression_extraction() -> List[Tuple[str, str, float]]:
+    """
+    Benchmark the math lexer against the legacy regex extractor
+
+    The exercise sheets grow to 100KB to show how each approach scales with
+    the length of a pasted input.
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    inputs: Dict[str, List[str]] = {
+        "short": SHORT_INPUTS,
+        "10KB": [make_large_input(10_000)],
+        "100KB": [make_large_input(100_000)],
+        "ex 10KB": [make_exercise_page(10_000)],
+        "ex 100KB": [make_exercise_page(100_000)],
+    }
+    rows = []
+    for label, texts in inputs.items():
+        for name, func in (
+            ("extract: legacy regex", legacy_extract_expressions),
+            ("extract: math lexer", extract_mathematical_expressions),
+        ):
+            rows.append(
+                (
+                    name,
+                    label,
+                    time_per_call(lambda: [func(t) for t in texts], min_time=0.1)
+                    / len(texts),
+                )
+            )
+    return rows
+
+
+def legacy_normalize_text(text: str) -> str:
+    """Reference implementation of normalize_text before the translation table"""
+    text = re.sub(r"\s+", " ", text.strip())
+    for digit in range(10):
+        text = text.replace(chr(0x09E6 + digit), str(digit))
+    text = text.replace("×", "*").replace("÷", "/").replace("−", "-")
+    text = re.sub(r"([0-9])\s*([x])\s*([0-9])", r"\1*\3", text)
+    return re.sub(r"([0-9])\s*\*\s*([a-zA-Z])", r"\1*\2", text)
+
+
+def benchmark_normalization() -> List[Tuple[str, str, float]]:
+    """
+    Benchmark normalize_text against the replace chain and streamed chunks
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    inputs: Dict[str, List[str]] = {
+        "short": SHORT_INPUTS,
+        "100KB": [make_large_input(100_000)],
+        "ex 100KB": [make_exercise_page(100_000)],
+    }
+    rows = []
+    for label, texts in inputs.items():
+        chunked = [[t[i : i + 4096] for i in range(0, len(t), 4096)] for t in texts]
+        candidates = [
+            (
+                "normalize: replace chain",
+                lambda: [legacy_normalize_text(t) for t in texts],
+            ),
+            ("normalize_text", lambda: [normalize_text(t) for t in texts]),
+            (
+                "normalize_stream (4KB chunks)",
+                lambda: ["".join(normalize_stream(c)) for c in chunked],
+            ),
+        ]
+        for name, run in candidates:
+            rows.append((name, label, time_per_call(run) / len(texts)))
+    return rows
+
+
+def _analyze_separately(text: str) -> None:
+    """Run the individual analysis functions one after another"""
+    detect_language(text)
+    normalize_text(text)
+    subject = classify_subject(text)
+    assess_grade_level(text, subject["subject"])
+    validate_question_completeness(text)
+    extract_educational_context(text)
+
+
+def benchmark_question_analysis() -> List[Tuple[str, str, float]]:
+    """
+    Benchmark the fused analyze_question against separate function calls
+
+    Returns:
+        List of (function, input label, microseconds per call) rows
+    """
+    inputs: Dict[str, List[str]] = {
+        "short": SHORT_INPUTS,
+        "10KB": [make_large_input(10_000)],
+    }
+    rows = []
+    for label, texts in inputs.items():
+        rows.append(
+            (
+                "separate functions",
+                label,
+                time_per_call(lambda: [_analyze_separately(t) for t in texts])
+                / len(texts),
+            )
+        )
+        rows.append(
+            (
+                "analyze_question",
+                label,
+                time_per_call(lambda: [analyze_question(t) for t in texts])
+                / len(texts),
+            )
+        )
+    return rows
+
+
+def make_corpus(size: int = 20_000, seed: int = 0) -> List[str]:
+    """
+    Build a synthetic corpus of logged questions
+
+    Args:
+        size: Number of questions
+        seed: Random seed
+
+    Returns:
+        Questions recombined from the words of the sample inputs
+    """
+    rng = random.Random(seed)
+    words = " ".join(SHORT_INPUTS + [_PARAGRAPH]).split()
+    return [" ".join(rng.choices(words, k=rng.randint(3, 20))) for _ in range(size)]
+
+
+def benchmark_batch_throughput() -> List[Tuple[str, str, float]]:
+    """
+    Compare scalar and batch APIs over a question corpus
+
+    Returns:
+        List of (function, input label, questions per second) rows
+    """
+    corpus = make_corpus()
+    label = f"{len(corpus) // 1000}k"
+    candidates = [
+        ("detect_language", lambda: [detect_language(t) for t in corpus]),
+        ("detect_language_batch", lambda: detect_language_batch(corpus)),
+        ("classify_subject", lambda: [classify_subject(t) for t in corpus]),
+        ("classify_subject_batch", lambda: classify_subject_batch(corpus)),
+    ]
+    rows = []
+    for name, run in candidates:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        rows.append((name, label, len(corpus) / best))
+    return rows
+
+
+def make_classroom_log(
+    students: int = 40, questions: int = 50, seed: int = 0
+) -> List[str]:
+    """
+    Build a request log where a class asks the same homework questions
+
+    Each student types every question with their own spacing and digits, so
+    repeats only match after normalization.
+
+    Args:
+        students: Number of students
+        questions: Number of distinct homework questions
+        seed: Random seed
+
+    Returns:
+        Shuffled question texts
+    """
+    rng = random.Random(seed)
+    homework = make_corpus(questions, seed=seed)
+    digits = str.maketrans("0123456789", "০১২৩৪৫৬৭৮৯")
+    log = []
+    for _ in range(students):
+        for question in homework:
+            if rng.random() < 0.3:
+                question = question.replace(" ", "  ")
+            if rng.random() < 0.3:
+                question = question.translate(digits)
+            log.append(question)
+    rng.shuffle(log)
+    return log
+
+
+def benchmark_memoization() -> List[Tuple[str, str, float]]:
+    """
+    Compare uncached and memoized analysis over a classroom request log
+
+    Returns:
+        List of (function, input label, microseconds per call) rows, followed
+        by a hit-rate row in percent
+    """
+    log = make_classroom_log()
+    label = f"{len(log)} req"
+
+    def analyze(text: str) -> None:
+        subject = classify_subject(text)
+        assess_grade_level(text, subject["subject"])
+
+    rows = []
+    start = time.perf_counter()
+    for text in log:
+        analyze(text)
+    rows.append(("uncached", label, (time.perf_counter() - start) / len(log) * 1e6))
+
+    cached_classify = memoize(maxsize=256, normalize=normalize_text)(classify_subject)
+    cached_grade = memoize(maxsize=256, normalize=normalize_text)(assess_grade_level)
+    start = time.perf_counter()
+    for text in log:
+        subject = cached_classify(text)
+        cached_grade(text, subject["subject"])
+    rows.append(("memoize", label, (time.perf_counter() - start) / len(log) * 1e6))
+    info = cached_classify.cache_info()
+
+    # A hit returns what the function computes for the normalized text,
+    # whichever variant filled the entry
+    for text in log[:200]:
+        assert cached_classify(text) == classify_subject(normalize_text(text))
+    # Exact-text keys by default: variants are never answered for each other
+    cached_language = memoize()(detect_language)
+    for text in ["২+৩ = ?", "2+3 = ?"]:
+        assert cached_language(text) == detect_language(text), text
+
+    rows.append(
+        ("memoize hit rate (%)", label, 100 * info["hits"] / len(log)),
+    )
+    return rows
+
+
+# Examples documented in InputAnalyzerAgent's instruction → fields it gives
+ANALYZER_PROMPT_EXAMPLES: List[Tuple[str, Dict[str, Any]]] = [
+    (
+        "A particle moves along x(t) = 2cos(3t) + t², y(t) = 3sin(2t) - "
+        "e^(-t/2), z(t) = t³ - 4t + ln(t+1)",
+        {
+            "detected_language": "english",
+            "mathematical_content_detected": True,
+            "requires_calculus": True,
+            "requires_vector_analysis": True,
+            "needs_clarification": False,
+        },
+    ),
+    (
+        "২x + ৫ = ১৩ সমাধান করুন",
+        {
+            "detected_language": "bengali",
+            "mathematical_content_detected": True,
+            "mathematical_complexity": "basic",
+            "needs_clarification": False,
+        },
+    ),
+    (
+        "Find the velocity and acceleration vectors for the parametric motion",
+        {
+            "detected_language": "english",
+            "requires_calculus": True,
+            "requires_vector_analysis": True,
+            "physics_content_type": "kinematics",
+            "needs_clarification": False,
+        },
+    ),
+    (
+        "Explain photosynthesis process",
+        {
+            "detected_language": "english",
+            "mathematical_content_detected": False,
+            "needs_clarification": False,
+        },
+    ),
+    (
+        "Help me with math",
+        {"detected_language": "english", "needs_clarification": True},
+    ),
+    (
+        "How to solve this?",
+        {"detected_language": "english", "needs_clarification": True},
+    ),
+]
+
+
+def check_prompt_examples() -> None:
+    """
+    Check analyze_input against the examples in InputAnalyzerAgent's prompt
+
+    An example the local analysis answers itself must give the documented
+    fields, with clarification questions exactly when clarification is
+    needed; an example below the confidence threshold goes to the LLM.
+
+    Raises:
+        AssertionError: A confident local analysis contradicts the prompt, or
+            the context analysis misses the physics of parametric motion
+    """
+    for text, expected in ANALYZER_PROMPT_EXAMPLES:
+        analysis = analyze_input(text)
+        if analysis["confidence_score"] < LOCAL_INPUT_ANALYSIS_THRESHOLD:
+            continue
+        for field, value in expected.items():
+            assert analysis[field] == value, (text, field, analysis[field])
+        assert bool(analysis["clarification_questions"]) == bool(
+            analysis["needs_clarification"]
+        ), text
+
+        # The context analysis must agree on parametric motion
+        if expected.get("requires_calculus"):
+            context = analyze_context(text)
+            assert context["physics_subfield"] == "kinematics", text
+            assert "differentiation" in context["mathematical_operations_required"]
+
+
+# Quantities given in numbers without an expression the lexer can parse
+NUMERIC_QUANTITY_EXAMPLES = [
+    "১০ কেজি ভরের বস্তুতে ২০ নিউটন বল প্রয়োগ করলে ত্বরণ কত?",
+    "A 5 kg mass is pushed with a force of 20 N. Find its acceleration",
+]
+
+
+def check_numeric_quantities() -> None:
+    """
+    Check that numbers given with quantities count as mathematical content
+
+    Raises:
+        AssertionError: A quantity question has no mathematical content, or
+            is answered locally although the lexer found no expression
+    """
+    for text in NUMERIC_QUANTITY_EXAMPLES:
+        analysis = analyze_input(text)
+        assert analysis["mathematical_content_detected"], text
+        assert analysis["mathematical_complexity"] != "none", text
+        assert analysis["confidence_score"] < LOCAL_INPUT_ANALYSIS_THRESHOLD, text
+
+
+def print_rows(
+    title: str, rows: List[Tuple[str, str, float]], unit: str = "us/call"
+) -> None:
+    """Print benchmark rows as an aligned table"""
+    print(f"\n{title}")
+    print(f"{'function':<32} {'input':<8} {unit:>12}")
+    for name, label, micros in rows:
+        print(f"{name:<32} {label:<8} {micros:>12.1f}")
+
+
+def main() -> None:
+    check_keyword_matches()
+    check_prompt_examples()
+    check_numeric_quantities()
+    print_rows("Keyword classification", benchmark_keyword_classification())
+    print_rows("Question analysis", benchmark_question_analysis())
+    print_rows("Expression extraction", benchmark_expression_extraction())
+    print_rows("Normalization", benchmark_normalization())
+    print_rows("Memoization", benchmark_memoization())
+    print_rows("Batch throughput", benchmark_batch_throughput(), unit="questions/s")
+
+
+if __name__ == "__main__":
+    main()
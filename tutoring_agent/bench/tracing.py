@@ -0,0 +1,116 @@
+"""
+Tracing benchmark: span tree of a request and the cost of tracing
+
+Runs a complex question through root_agent on a stub model with tracing on,
+prints its span tree and how the branches of the parallel stages overlapped,
+then measures request time on an instant stub model with tracing disabled and
+enabled. Run with:
+
+    python -m tutoring_agent.bench.tracing
+"""
+
+import asyncio
+import logging
+import statistics
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from ..agent import agent_tracer, root_agent
+from ..agents.tracing import parallel_overlap, span_tree
+from .equation_solving import STUB_LATENCY, run_question
+from .stub_model import StubLlm, use_model
+from .text_processing import print_rows, time_per_call
+
+QUESTION = "Explain photosynthesis process in plants"
+
+PARALLEL_STAGES = ["ParallelAnalysisStage", "ParallelSolutionProcessing"]
+
+
+def make_model(latency: float) -> StubLlm:
+    return StubLlm(
+        latency=latency,
+        transfers={"QuestionAnalyzer": "SolutionPipelineAgent"},
+    )
+
+
+async def trace_question(latency: float = STUB_LATENCY) -> InMemorySpanExporter:
+    """Run QUESTION with tracing on and return the collected spans"""
+    exporter = InMemorySpanExporter()
+    model = make_model(latency)
+    agent_tracer.enable(exporter)
+    try:
+        with use_model(root_agent, model):
+            await run_question(root_agent, model, QUESTION)
+    finally:
+        agent_tracer.disable()
+    return exporter
+
+
+async def benchmark_overhead(runs: int = 20) -> List[Tuple[str, float]]:
+    """
+    Median request time on an instant stub model with tracing off and on
+
+    Returns:
+        List of (setting, milliseconds per request) rows
+    """
+    model = make_model(0.0)
+    rows = []
+    with use_model(root_agent, model):
+        for label, enabled in (("disabled", False), ("enabled", True)):
+            if enabled:
+                agent_tracer.enable(InMemorySpanExporter())
+            times = []
+            for _ in range(runs):
+                times.append((await run_question(root_agent, model, QUESTION))[1])
+            agent_tracer.disable()
+            rows.append((label, statistics.median(times) * 1000))
+    return rows
+
+
+def main() -> None:
+    # ADK's parallel agents trip OpenTelemetry's context detach check; the
+    # errors are harmless here and drown out the table
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    spans = asyncio.run(trace_question()).get_finished_spans()
+    print(f"Stub model latency: {STUB_LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'start ms':>8} {'ms':>8}  span")
+    print("\n".join(span_tree(spans)))
+
+    for stage in PARALLEL_STAGES:
+        for run in parallel_overlap(spans, stage):
+            print(
+                f"\n{stage}: {run['wall_ms']:.1f} ms wall, overlap "
+                f"{run['overlap']:.2f} of {len(run['branch_ms'])}, critical "
+                f"branch {run['critical_branch']}"
+            )
+            for branch, duration in run["branch_ms"].items():
+                print(
+                    f"  {branch:<28} {duration:7.1f} ms, finished "
+                    f"{run['slack_ms'][branch]:6.1f} ms before the critical branch"
+                )
+
+    context = SimpleNamespace(agent_name="InputAnalyzerAgent", invocation_id="bench")
+    print()
+    print_rows(
+        "Disabled tracing callback",
+        [
+            (
+                "before_agent",
+                "tracing off",
+                time_per_call(lambda: agent_tracer.before_agent(context)),
+            )
+        ],
+    )
+
+    print("\nRequest time, instant stub model (median of 20)")
+    for label, milliseconds in asyncio.run(benchmark_overhead()):
+        print(f"  tracing {label:<9} {milliseconds:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,72 @@ Focuses on language detection, mathematical expression parsing, and educational
 """
 
 from .text_processing import (
+    analyze_question,
     detect_language,
     normalize_text,
+    normalize_stream,
     extract_mathematical_expressions,
     classify_subject,
     assess_grade_level,
     validate_question_completeness,
     generate_clarifying_questions,
-    format_mathematical_expression,
     extract_educational_context,
 )
+from .math_formatter import (
+    MathStreamFormatter,
+    format_math,
+    format_math_stream,
+    format_mathematical_expression,
+)
+from .batch_processing import detect_language_batch, classify_subject_batch
+from .memoization import memoize
+from .query_classifier import classify_query
+from .input_analysis import analyze_input
+from .context_analysis import analyze_context
+from .calculator import CalculationError, evaluate_expression
+from .equation_solver import solve_equations
+from .glossary import GlossaryStore, get_glossary
+from .curriculum_index import (
+    CurriculumIndex,
+    build_index,
+    get_curriculum_index,
+    search_curriculum,
+)
+from .json_repair import parse_json_object, repair_json
+from .clarification import assess_clarification, clarification_reply
 
 __all__ = [
+    "analyze_question",
     "detect_language",
     "normalize_text",
+    "normalize_stream",
     "extract_mathematical_expressions",
     "classify_subject",
     "assess_grade_level",
     "validate_question_completeness",
     "generate_clarifying_questions",
-    "format_mathematical_expression",
     "extract_educational_context",
+    "format_mathematical_expression",
+    "format_math",
+    "format_math_stream",
+    "MathStreamFormatter",
+    "detect_language_batch",
+    "classify_subject_batch",
+    "memoize",
+    "classify_query",
+    "analyze_input",
+    "analyze_context",
+    "CalculationError",
+    "evaluate_expression",
+    "solve_equations",
+    "GlossaryStore",
+    "get_glossary",
+    "CurriculumIndex",
+    "build_index",
+    "get_curriculum_index",
+    "search_curriculum",
+    "parse_json_object",
+    "repair_json",
+    "assess_clarification",
+    "clarification_reply",
 ]
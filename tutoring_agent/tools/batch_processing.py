@@ -0,0 +1,210 @@
+"""
+Batch text processing tools for the AI tutoring system
+Vectorized language detection and subject scoring over large question corpora
+"""
+
+from itertools import chain
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .keyword_matcher import WORD_PATTERN
+from .text_processing import (
+    _KEYWORD_MATCHER,
+    _SUBJECT_KEYWORDS,
+    _TextFeatures,
+    _classify_subject,
+)
+
+_LANGUAGES = np.array(["english", "bengali", "mixed"], dtype=object)
+
+# Subject keyword entries, numbered in (subject, position) order so that
+# sorting entry ids reproduces the declared keyword order of each subject
+_SUBJECT_ENTRIES = [
+    (subject, keyword)
+    for subject, data in _SUBJECT_KEYWORDS.items()
+    for keyword in data["keywords"]
+]
+_ENTRY_IDS: Dict[str, List[int]] = {}
+for _entry_id, (_, _keyword) in enumerate(_SUBJECT_ENTRIES):
+    _ENTRY_IDS.setdefault(_keyword, []).append(_entry_id)
+
+_SUBJECT_KEYS = [("subject", subject) for subject in _SUBJECT_KEYWORDS]
+_ENTRY_SUBJECTS = np.array(
+    [list(_SUBJECT_KEYWORDS).index(subject) for subject, _ in _SUBJECT_ENTRIES],
+    dtype=np.int64,
+)
+_ENTRY_KEYWORDS = np.array([keyword for _, keyword in _SUBJECT_ENTRIES], dtype=object)
+
+
+def _codepoint_counts(texts: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Count Bengali and English letters of every text in one vectorized pass
+
+    Args:
+        texts: Input texts
+
+    Returns:
+        Dictionary with 'bengali' and 'english' count arrays
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codepoints = np.frombuffer(
+        "".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    )
+    bounds = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=bounds[1:])
+
+    def per_text(mask: np.ndarray) -> np.ndarray:
+        totals = np.zeros(len(codepoints) + 1, dtype=np.int64)
+        np.cumsum(mask, out=totals[1:])
+        return totals[bounds[1:]] - totals[bounds[:-1]]
+
+    lower = codepoints | 0x20  # folds A-Z onto a-z
+    return {
+        "bengali": per_text((codepoints >= 0x0980) & (codepoints <= 0x09FF)),
+        "english": per_text((lower >= ord("a")) & (lower <= ord("z"))),
+    }
+
+
+def detect_language_batch(texts: Sequence[str]) -> List[str]:
+    """
+    Detect the primary language of many texts at once
+
+    Gives the same result as detect_language for every text.
+
+    Args:
+        texts: Input texts to analyze
+
+    Returns:
+        List of 'bengali', 'english', or 'mixed', one per text
+    """
+    if not texts:
+        return []
+
+    counts = _codepoint_counts(texts)
+    bengali_chars = counts["bengali"]
+    total_chars = bengali_chars + counts["english"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bengali_ratio = bengali_chars / total_chars
+        english_ratio = counts["english"] / total_chars
+
+    # 0 → english, 1 → bengali, 2 → mixed
+    codes = np.where(bengali_ratio > 0.6, 1, np.where(english_ratio > 0.6, 0, 2))
+    codes[total_chars == 0] = 0
+    return _LANGUAGES[codes].tolist()
+
+
+def _subject_hit_pairs(lowered: Sequence[str]) -> np.ndarray:
+    """
+    Build the sparse text × subject-keyword hit matrix
+
+    Every distinct word of the batch is resolved against the keyword index
+    once, then the token → keyword expansion and de-duplication run as array
+    operations over the whole corpus.
+
+    Args:
+        lowered: Lowercased texts
+
+    Returns:
+        Sorted, unique int64 keys of the form text_index * n_entries + entry_id
+    """
+    n_entries = len(_SUBJECT_ENTRIES)
+    words_per_text = [WORD_PATTERN.findall(text) for text in lowered]
+    lengths = np.fromiter(map(len, words_per_text), dtype=np.int64, count=len(lowered))
+
+    vocabulary: Dict[str, int] = {}
+    token_ids = np.fromiter(
+        (
+            vocabulary.setdefault(w, len(vocabulary))
+            for w in chain.from_iterable(words_per_text)
+        ),
+        dtype=np.int64,
+        count=int(lengths.sum()),
+    )
+    text_ids = np.repeat(np.arange(len(lowered), dtype=np.int64), lengths)
+
+    # Resolve each distinct word once into a CSR table of entry ids
+    entry_lists = [
+        [
+            e
+            for keyword in _KEYWORD_MATCHER.lookup(word)
+            for e in _ENTRY_IDS.get(keyword, ())
+        ]
+        for word in vocabulary
+    ]
+    vocab_counts = np.fromiter(
+        map(len, entry_lists), dtype=np.int64, count=len(entry_lists)
+    )
+    vocab_start = np.zeros(len(entry_lists) + 1, dtype=np.int64)
+    np.cumsum(vocab_counts, out=vocab_start[1:])
+    vocab_entries = np.fromiter(
+        chain.from_iterable(entry_lists), dtype=np.int64, count=int(vocab_start[-1])
+    )
+
+    # Expand every token into the entries its word resolves to
+    token_counts = vocab_counts[token_ids]
+    hit = token_counts > 0
+    token_counts = token_counts[hit]
+    hit_starts = vocab_start[token_ids[hit]]
+    offsets = np.arange(int(token_counts.sum()), dtype=np.int64) - np.repeat(
+        np.cumsum(token_counts) - token_counts, token_counts
+    )
+    entries = vocab_entries[np.repeat(hit_starts, token_counts) + offsets]
+    pair_keys = [np.repeat(text_ids[hit], token_counts) * n_entries + entries]
+
+    # Multi-word keywords are searched only in texts containing their first word
+    for word, vocab_id in vocabulary.items():
+        for pattern, keyword in _KEYWORD_MATCHER.phrases(word):
+            if keyword not in _ENTRY_IDS:
+                continue
+            for text_id in np.unique(text_ids[token_ids == vocab_id]):
+                if pattern.search(lowered[text_id]):
+                    pair_keys.append(
+                        text_id * n_entries
+                        + np.array(_ENTRY_IDS[keyword], dtype=np.int64)
+                    )
+
+    return np.unique(np.concatenate(pair_keys))
+
+
+def classify_subject_batch(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Classify the subject area of many questions at once
+
+    Gives the same result as classify_subject for every text.
+
+    Args:
+        texts: Question texts
+
+    Returns:
+        List of subject classification dictionaries, one per text
+    """
+    if not texts:
+        return []
+
+    n_entries = len(_SUBJECT_ENTRIES)
+    pairs = _subject_hit_pairs([text.lower() for text in texts])
+    pair_entries = pairs % n_entries
+    keywords = _ENTRY_KEYWORDS[pair_entries].tolist()
+
+    # Pairs are sorted by (text, entry), so each (text, subject) group of
+    # matched keywords is one contiguous run in declared keyword order
+    groups, starts = np.unique(
+        pairs // n_entries * len(_SUBJECT_KEYS) + _ENTRY_SUBJECTS[pair_entries],
+        return_index=True,
+    )
+    ends = np.append(starts[1:], len(pairs))
+
+    keyword_hits: List[Dict[Any, List[str]]] = [{} for _ in texts]
+    for group, start, end in zip(groups.tolist(), starts.tolist(), ends.tolist()):
+        text_index, subject_index = divmod(group, len(_SUBJECT_KEYS))
+        keyword_hits[text_index][_SUBJECT_KEYS[subject_index]] = keywords[start:end]
+
+    results = []
+    for text, hits in zip(texts, keyword_hits):
+        features = _TextFeatures(text)
+        features.keyword_hits = hits
+        results.append(_classify_subject(features))
+
+    return results
@@ -0,0 +1,221 @@
+"""
+Safe arithmetic evaluation for the AI tutoring system
+Walks a validated syntax tree with size limits and records every operation in order
+"""
+
+import ast
+import functools
+import math
+from fractions import Fraction
+from typing import Any, Dict, List, Union
+
+from .text_processing import normalize_text
+
+Number = Union[int, float, Fraction]
+
+# Limits that keep a single expression from tying up a worker
+MAX_EXPRESSION_LENGTH = 256
+MAX_NODES = 100
+MAX_EXPONENT = 100
+MAX_MAGNITUDE = 10**15
+
+_MAX_DIGITS = math.log10(MAX_MAGNITUDE)
+
+# Operator → (symbol, description of one step)
+_OPERATORS = {
+    ast.Add: ("+", "Adding {left} and {right} together"),
+    ast.Sub: ("-", "Subtracting {right} from {left}"),
+    ast.Mult: ("×", "Multiplying {left} by {right}"),
+    ast.Div: ("÷", "Dividing {left} by {right}"),
+    ast.FloorDiv: ("//", "Dividing {left} by {right} and rounding down"),
+    ast.Pow: ("^", "Raising {left} to the power {right}"),
+}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Constant,
+    ast.UAdd,
+    ast.USub,
+    *_OPERATORS,
+)
+
+
+class CalculationError(ValueError):
+    """Raised when an expression is not allowed or cannot be evaluated"""
+
+
+def evaluate_expression(expression: str, exact: bool = False) -> Dict[str, Any]:
+    """
+    Evaluate an arithmetic expression without eval
+
+    Numbers, parentheses, unary signs and + - * / // ** (or ^) are allowed.
+    Bengali digits and the × ÷ − signs are normalized first. Operations run in
+    the usual order and each one is recorded as a step. Exponents above
+    MAX_EXPONENT, operands or results above MAX_MAGNITUDE, and expressions
+    with more than MAX_NODES syntax nodes are rejected before any large
+    number is built.
+
+    Args:
+        expression: Arithmetic expression, e.g. "2 + 3 * 4"
+        exact: Evaluate with fractions, so 1/3 + 1/6 gives 1/2
+
+    Returns:
+        Dictionary with the normalized expression, the result, the formatted
+        result and the list of steps in evaluation order
+
+    Raises:
+        CalculationError: If the expression is invalid or exceeds a limit
+    """
+    normalized = normalize_text(expression)
+    # Students write powers as 2^3; ** keeps their precedence and associativity
+    tree = _parse(normalized.replace("^", "**"))
+    steps: List[Dict[str, Any]] = []
+    result = _evaluate(tree.body, exact, steps)
+    return {
+        "expression": normalized,
+        "result": result,
+        "formatted_result": format_number(result),
+        "exact": exact,
+        "steps": steps,
+    }
+
+
+def format_number(value: Number) -> str:
+    """Format a result for display, e.g. 2.0 as 2 and Fraction(1, 2) as 1/2"""
+    # type() checks: isinstance against the Fraction ABC machinery is slow
+    kind = type(value)
+    if kind is Fraction:
+        return str(value.numerator) if value.denominator == 1 else str(value)
+    if kind is float:
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.12g}"
+    return str(value)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse(expression: str) -> ast.Expression:
+    """Parse and validate an expression; trees are cached by expression text"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError(
+            f"Expression longer than {MAX_EXPRESSION_LENGTH} characters"
+        )
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except (SyntaxError, ValueError, MemoryError, RecursionError):
+        raise CalculationError("Invalid expression") from None
+
+    nodes = 0
+    for node in ast.walk(tree):
+        nodes += 1
+        if nodes > MAX_NODES:
+            raise CalculationError(f"Expression has more than {MAX_NODES} parts")
+        if not isinstance(node, _ALLOWED_NODES):
+            raise CalculationError(
+                "Invalid expression - only basic math operations allowed"
+            )
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, (int, float))
+        ):
+            raise CalculationError("Only numbers are allowed")
+    return tree
+
+
+def _evaluate(node: ast.AST, exact: bool, steps: List[Dict[str, Any]]) -> Number:
+    """Evaluate a validated node depth-first, left operand before right"""
+    kind = type(node)
+    if kind is ast.Constant:
+        value = node.value
+        if exact and type(value) is float:
+            # str() keeps 0.1 as 1/10 instead of the binary approximation
+            value = Fraction(str(value))
+        return _check_magnitude(value)
+
+    if kind is ast.UnaryOp:
+        operand = _evaluate(node.operand, exact, steps)
+        return -operand if type(node.op) is ast.USub else operand
+
+    left = _evaluate(node.left, exact, steps)
+    right = _evaluate(node.right, exact, steps)
+    operator = type(node.op)
+    result = _check_magnitude(_apply(operator, left, right, exact))
+
+    symbol, description = _OPERATORS[operator]
+    left_text, right_text = format_number(left), format_number(right)
+    steps.append(
+        {
+            "operation": f"{left_text} {symbol} {right_text} = {format_number(result)}",
+            "description": description.format(left=left_text, right=right_text),
+            "result": result,
+        }
+    )
+    return result
+
+
+def _apply(operator: type, left: Number, right: Number, exact: bool) -> Number:
+    """Apply one binary operator with division and power guards"""
+    if operator is ast.Add:
+        return left + right
+    if operator is ast.Sub:
+        return left - right
+    if operator is ast.Mult:
+        return left * right
+    if right == 0 and operator in (ast.Div, ast.FloorDiv):
+        raise CalculationError("Division by zero")
+    if operator is ast.Div:
+        if exact:
+            return Fraction(left) / Fraction(right)
+        return left / right
+    if operator is ast.FloorDiv:
+        return left // right
+    return _power(left, right, exact)
+
+
+def _power(base: Number, exponent: Number, exact: bool) -> Number:
+    """Raise base to exponent after estimating the size of the result"""
+    if abs(exponent) > MAX_EXPONENT:
+        raise CalculationError(f"Exponent larger than {MAX_EXPONENT}")
+    if base == 0:
+        if exponent < 0:
+            raise CalculationError("Division by zero")
+        return base**exponent
+    if base < 0 and exponent != int(exponent):
+        raise CalculationError("Fractional power of a negative number")
+
+    # Digits the result (or, for fractions, its denominator) would need
+    if isinstance(base, Fraction):
+        size = max(abs(base.numerator), base.denominator)
+        digits = abs(exponent) * math.log10(size)
+    else:
+        digits = exponent * math.log10(abs(base))
+    if digits > _MAX_DIGITS:
+        if abs(base) < 1 or exponent < 0:
+            raise CalculationError("Result needs too much precision")
+        raise CalculationError("Result is too large")
+
+    if isinstance(exponent, Fraction):
+        # Exact powers need whole exponents; others fall back to floats
+        if exponent.denominator == 1:
+            exponent = exponent.numerator
+        else:
+            return float(base) ** float(exponent)
+    if exact and exponent < 0:
+        base = Fraction(base)
+    try:
+        return base**exponent
+    except OverflowError:
+        raise CalculationError("Result is too large") from None
+
+
+def _check_magnitude(value: Number) -> Number:
+    """Reject operands and intermediate results above MAX_MAGNITUDE"""
+    kind = type(value)
+    if kind is float and not math.isfinite(value):
+        raise CalculationError("Result is too large")
+    if abs(value) > MAX_MAGNITUDE:
+        raise CalculationError("Number is too large")
+    if kind is Fraction and value.denominator > MAX_MAGNITUDE:
+        raise CalculationError("Result needs too much precision")
+    return value
@@ -0,0 +1,528 @@
+"""
+Local clarification for the AI tutoring system
+Spots questions too incomplete to answer and asks the student for the missing details without an LLM call
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, Optional
+
+from .text_processing import (
+    _TextFeatures,
+    _validate_question_completeness,
+    generate_clarifying_questions,
+)
+
+# Longest message that can still be clarified locally; longer ones go to the
+# analysis agents even if every word is filler
+CLARIFY_MAX_WORDS = 12
+
+_TOKEN = re.compile(r"[a-z0-9']+|[\u0980-\u09FF\u200c\u200d]+")
+
+
+def _words(words: Iterable[str]) -> frozenset:
+    return frozenset(unicodedata.normalize("NFC", word) for word in words)
+
+
+# Words that ask for help, express confusion or glue a sentence together
+# without naming what the student needs help with
+_FILLER_WORDS = _words(
+    [
+        # English
+        "a",
+        "about",
+        "again",
+        "all",
+        "am",
+        "an",
+        "and",
+        "any",
+        "anything",
+        "are",
+        "assignment",
+        "at",
+        "book",
+        "can",
+        "can't",
+        "cant",
+        "chapter",
+        "class",
+        "confused",
+        "confusing",
+        "could",
+        "difficult",
+        "do",
+        "does",
+        "don't",
+        "dont",
+        "exam",
+        "explain",
+        "exercise",
+        "for",
+        "get",
+        "getting",
+        "got",
+        "hard",
+        "help",
+        "helping",
+        "homework",
+        "how",
+        "i",
+        "i'm",
+        "im",
+        "in",
+        "is",
+        "it",
+        "lesson",
+        "lost",
+        "me",
+        "my",
+        "need",
+        "needs",
+        "not",
+        "of",
+        "on",
+        "or",
+        "please",
+        "pls",
+        "plz",
+        "problem",
+        "question",
+        "really",
+        "show",
+        "so",
+        "some",
+        "something",
+        "stuck",
+        "stuff",
+        "subject",
+        "teach",
+        "tell",
+        "that",
+        "the",
+        "these",
+        "thing",
+        "this",
+        "those",
+        "to",
+        "topic",
+        "tough",
+        "understand",
+        "very",
+        "want",
+        "what",
+        "what's",
+        "whats",
+        "with",
+        "you",
+        "solve",
+        # Bengali
+        "আমাকে",
+        "আমার",
+        "আমি",
+        "তুমি",
+        "আপনি",
+        "একটু",
+        "সাহায্য",
+        "করো",
+        "কর",
+        "করুন",
+        "করবে",
+        "করবেন",
+        "দরকার",
+        "লাগবে",
+        "লাগে",
+        "লাগছে",
+        "চাই",
+        "বুঝি",
+        "বুঝিনা",
+        "বুঝতে",
+        "বুঝছি",
+        "বুঝলাম",
+        "বুঝিয়ে",
+        "বোঝাও",
+        "বুঝাও",
+        "দাও",
+        "দিন",
+        "পারছি",
+        "পারি",
+        "পারিনা",
+        "না",
+        "নাই",
+        "নি",
+        "এই",
+        "এটা",
+        "এটি",
+        "ওটা",
+        "সেটা",
+        "এগুলো",
+        "অধ্যায়",
+        "অধ্যায়টা",
+        "অধ্যায়টি",
+        "পড়া",
+        "পড়াটা",
+        "বিষয়",
+        "বিষয়টা",
+        "টপিক",
+        "সমস্যা",
+        "প্রশ্ন",
+        "প্রশ্নটা",
+        "হোমওয়ার্ক",
+        "কঠিন",
+        "খুব",
+        "কিছু",
+        "কিছুই",
+        "কি",
+        "কী",
+        "ব্যাখ্যা",
+        "ও",
+        "আর",
+        "একদম",
+        "মোটেও",
+        "হচ্ছে",
+        "সব",
+        "সমাধান",
+        # Banglish
+        "ami",
+        "amake",
+        "amar",
+        "tumi",
+        "apni",
+        "koro",
+        "kore",
+        "korte",
+        "dao",
+        "den",
+        "bujhi",
+        "bujhina",
+        "bujhte",
+        "bujhtesi",
+        "bujhtechi",
+        "bujhchi",
+        "bujhiye",
+        "bujhao",
+        "parchi",
+        "parchina",
+        "pari",
+        "na",
+        "nai",
+        "ni",
+        "ei",
+        "eita",
+        "eta",
+        "ota",
+        "ta",
+        "ti",
+        "e",
+        "te",
+        "lagbe",
+        "lage",
+        "dorkar",
+        "chai",
+        "kichu",
+        "kisu",
+        "khub",
+        "onek",
+        "kothin",
+        "kotin",
+        "shob",
+        "sob",
+        "ki",
+        "ektu",
+        "somadhan",
+    ]
+)
+
+# Words that ask for help or say something is not understood; a message
+# without one of these, a reference or a subject is not a request for help
+_HELP_WORDS = _words(
+    [
+        "help",
+        "helping",
+        "need",
+        "needs",
+        "explain",
+        "understand",
+        "confused",
+        "confusing",
+        "lost",
+        "stuck",
+        "teach",
+        "solve",
+        "get",
+        "সাহায্য",
+        "দরকার",
+        "লাগবে",
+        "বুঝি",
+        "বুঝিনা",
+        "বুঝতে",
+        "বুঝছি",
+        "বুঝিয়ে",
+        "বোঝাও",
+        "বুঝাও",
+        "ব্যাখ্যা",
+        "কঠিন",
+        "সমাধান",
+        "bujhi",
+        "bujhina",
+        "bujhte",
+        "bujhtesi",
+        "bujhtechi",
+        "bujhchi",
+        "bujhiye",
+        "bujhao",
+        "lagbe",
+        "dorkar",
+        "kothin",
+        "somadhan",
+    ]
+)
+
+# Words that only point at something the student has not shared
+_REFERENCE_WORDS = _words(
+    [
+        "this",
+        "that",
+        "it",
+        "these",
+        "those",
+        "chapter",
+        "lesson",
+        "book",
+        "homework",
+        "assignment",
+        "exercise",
+        "question",
+        "problem",
+        "এই",
+        "এটা",
+        "এটি",
+        "ওটা",
+        "সেটা",
+        "এগুলো",
+        "অধ্যায়",
+        "অধ্যায়টা",
+        "অধ্যায়টি",
+        "প্রশ্নটা",
+        "পড়াটা",
+        "হোমওয়ার্ক",
+        "ei",
+        "eita",
+        "eta",
+        "ota",
+        "chapter",
+    ]
+)
+
+# Words that mark Latin-script text as Banglish, answered in Bengali
+_BANGLISH_WORDS = _words(
+    [
+        "ami",
+        "amake",
+        "amar",
+        "koro",
+        "korte",
+        "dao",
+        "bujhi",
+        "bujhina",
+        "bujhte",
+        "bujhtesi",
+        "bujhtechi",
+        "bujhchi",
+        "bujhiye",
+        "bujhao",
+        "parchi",
+        "parchina",
+        "nai",
+        "lagbe",
+        "lage",
+        "dorkar",
+        "kichu",
+        "kisu",
+        "ektu",
+        "eita",
+        "eta",
+        "kothin",
+        "somadhan",
+    ]
+)
+
+# Question words that, with only a subject name after them, ask what the
+# subject is: "What is physics?", "গণিত কি?"
+_INTERROGATIVE_WORDS = _words(
+    ["what", "what's", "whats", "is", "are", "কি", "কী", "ki"]
+)
+
+# Subject names the student may give without a topic
+_SUBJECT_WORDS = {
+    unicodedata.normalize("NFC", word): subject
+    for subject, words in {
+        "math": [
+            "math",
+            "maths",
+            "mathematics",
+            "onko",
+            "ganit",
+            "অংক",
+            "অঙ্ক",
+            "গণিত",
+            "গণিতে",
+            "গণিতের",
+            "ম্যাথ",
+            "ম্যাথে",
+        ],
+        "physics": [
+            "physics",
+            "podartho",
+            "পদার্থবিজ্ঞান",
+            "পদার্থবিজ্ঞানে",
+            "পদার্থবিদ্যা",
+            "ফিজিক্স",
+        ],
+        "chemistry": ["chemistry", "rosayon", "রসায়ন", "রসায়নে", "কেমিস্ট্রি"],
+        "biology": ["biology", "জীববিজ্ঞান", "জীববিজ্ঞানে", "বায়োলজি"],
+        "science": ["science", "biggan", "বিজ্ঞান", "বিজ্ঞানে"],
+    }.items()
+    for word in words
+}
+
+_BENGALI_SUBJECT_NAMES = {
+    "math": "গণিত",
+    "physics": "পদার্থবিজ্ঞান",
+    "chemistry": "রসায়ন",
+    "biology": "জীববিজ্ঞান",
+    "science": "বিজ্ঞান",
+}
+
+# First question for a vague message: the topic within the subject named, or
+# the subject itself when none was named
+_SUBJECT_TOPIC = {
+    "bengali": "{subject}ের কোন টপিকে তোমার সাহায্য দরকার?",
+    "english": "Which topic in {subject} do you need help with?",
+}
+_WHICH_SUBJECT = {
+    "bengali": "কোন বিষয়ে তোমার সাহায্য দরকার: গণিত, পদার্থবিজ্ঞান, রসায়ন নাকি জীববিজ্ঞান?",
+    "english": "Which subject is it: math, physics, chemistry or biology?",
+}
+
+_REPLY_TEMPLATES = {
+    "bengali": (
+        "হাই! 👋 আমি তোমাকে সাহায্য করতে চাই!\n\n"
+        "আমাকে আরেকটু বলো যাতে আমি তোমাকে ভালো সাহায্য দিতে পারি: 🤔\n\n"
+        "{questions}\n\n"
+        "চিন্তা করো না, আমরা একসাথে এটা সমাধান করব! 💪✨"
+    ),
+    "english": (
+        "Hi there! 👋 I want to help you!\n\n"
+        "Tell me a bit more so I can give you the best help: 🤔\n\n"
+        "{questions}\n\n"
+        "Don't worry, we'll figure this out together! 💪✨"
+    ),
+}
+
+_ISSUE_ORDER = ["too_vague", "missing_equation", "missing_context"]
+
+
+def assess_clarification(text: str) -> Dict[str, Any]:
+    """
+    Decide whether a question can only be answered with a clarification
+
+    A message is clearly incomplete when it asks for help, points at unseen
+    material or names a bare subject, and apart from that says nothing: no
+    topic, no number and no expression. Messages with completeness issues
+    that still name something are borderline and left to the analysis agents.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Dictionary with decision ("clarify", "escalate" or "answer"),
+        language, subject, issues and clarification_questions
+    """
+    features = _TextFeatures(text)
+    completeness = _validate_question_completeness(features)
+    tokens = _TOKEN.findall(
+        unicodedata.normalize("NFC", features.lower.replace("’", "'"))
+    )
+
+    language = "english"
+    if re.search(r"[\u0980-\u09FF]", text) or _BANGLISH_WORDS.intersection(tokens):
+        language = "bengali"
+    subjects = [_SUBJECT_WORDS[token] for token in tokens if token in _SUBJECT_WORDS]
+    subject = subjects[0] if subjects else None
+
+    content = [
+        token
+        for token in tokens
+        if token not in _FILLER_WORDS and token not in _SUBJECT_WORDS
+    ]
+    result: Dict[str, Any] = {
+        "decision": "answer" if completeness["is_complete"] else "escalate",
+        "language": language,
+        "subject": subject,
+        "issues": completeness["issues"],
+        "clarification_questions": [],
+    }
+    # "What is physics?" asks about the subject itself and is complete
+    asks_definition = bool(
+        subject
+        and _INTERROGATIVE_WORDS.intersection(tokens)
+        and all(
+            token in _INTERROGATIVE_WORDS | _SUBJECT_WORDS.keys() for token in tokens
+        )
+    )
+    if (
+        not tokens
+        or content
+        or asks_definition
+        or not (subject or (_HELP_WORDS | _REFERENCE_WORDS).intersection(tokens))
+        or features.math_expressions
+        or len(tokens) > CLARIFY_MAX_WORDS
+    ):
+        return result
+
+    issues = set(completeness["issues"])
+    if subject or not _REFERENCE_WORDS.intersection(tokens):
+        issues.add("too_vague")
+    else:
+        issues.add("missing_context")
+    issues = [issue for issue in _ISSUE_ORDER if issue in issues]
+
+    questions = generate_clarifying_questions(
+        {"language": language, "subject": subject or "general", "issues": issues}
+    )
+    if "too_vague" in issues:
+        if subject is None:
+            questions[0] = _WHICH_SUBJECT[language]
+        else:
+            name = subject
+            if language == "bengali":
+                name = _BENGALI_SUBJECT_NAMES[subject]
+            questions[0] = _SUBJECT_TOPIC[language].format(subject=name)
+
+    result.update(decision="clarify", issues=issues, clarification_questions=questions)
+    return result
+
+
+def clarification_reply(text: str) -> Optional[str]:
+    """
+    Friendly clarification request for a clearly incomplete question
+
+    Args:
+        text: Question text
+
+    Returns:
+        Reply in the student's language, or None if the question should go to
+        the analysis agents
+    """
+    assessment = assess_clarification(text)
+    if assessment["decision"] != "clarify":
+        return None
+
+    questions = "\n".join(
+        f"{number}. {question}"
+        for number, question in enumerate(
+            assessment["clarification_questions"], start=1
+        )
+    )
+    return _REPLY_TEMPLATES[assessment["language"]].format(questions=questions)
@@ -0,0 +1,259 @@
+"""
+Concept feature tables for the AI tutoring system
+Detects calculus, vector, parametric motion and physics sub-field content in a question
+"""
+
+import re
+from typing import Any, Dict
+
+from .keyword_matcher import KeywordMatcher
+from .text_processing import _TextFeatures
+
+# Physics sub-fields in priority order; ties go to the earlier sub-field
+PHYSICS_SUBFIELDS = {
+    "dynamics": [
+        "force",
+        "momentum",
+        "newton",
+        "friction",
+        "torque",
+        "mass",
+        "work",
+        "energy",
+        "বল",
+        "বলের",
+        "বলকে",
+        "ভরবেগ",
+        "ঘর্ষণ",
+        "কাজ",
+        "শক্তি",
+    ],
+    "kinematics": [
+        "velocity",
+        "acceleration",
+        "displacement",
+        "speed",
+        "motion",
+        "moves",
+        "moving",
+        "trajectory",
+        "projectile",
+        "particle",
+        "jerk",
+        "বেগ",
+        "ত্বরণ",
+        "সরণ",
+        "দ্রুতি",
+        "গতি",
+    ],
+    "electromagnetism": [
+        "electric",
+        "electricity",
+        "magnetic",
+        "magnetism",
+        "current",
+        "voltage",
+        "charge",
+        "circuit",
+        "resistance",
+        "বিদ্যুৎ",
+        "তড়িৎ",
+        "চুম্বক",
+        "রোধ",
+    ],
+    "thermodynamics": [
+        "heat",
+        "temperature",
+        "entropy",
+        "thermodynamics",
+        "তাপ",
+        "তাপমাত্রা",
+    ],
+    "optics": [
+        "light",
+        "lens",
+        "mirror",
+        "reflection",
+        "refraction",
+        "optics",
+        "আলো",
+        "লেন্স",
+        "দর্পণ",
+        "প্রতিফলন",
+        "প্রতিসরণ",
+    ],
+    "quantum": [
+        "quantum",
+        "photon",
+        "planck",
+        "relativity",
+        "nuclear",
+        "radioactivity",
+        "কোয়ান্টাম",
+        "ফোটন",
+        "আপেক্ষিকতা",
+        "তেজস্ক্রিয়তা",
+    ],
+}
+
+CONCEPT_TERMS = {
+    "differentiation": [
+        "derivative",
+        "differentiate",
+        "differentiation",
+        "rate of change",
+        "slope of the tangent",
+        "maxima",
+        "minima",
+        "maximum",
+        "minimum",
+        "অন্তরীকরণ",
+        "অন্তরজ",
+    ],
+    "integration": [
+        "integral",
+        "integrate",
+        "integration",
+        "antiderivative",
+        "area under",
+        "যোগজীকরণ",
+        "যোগজ",
+    ],
+    "calculus": [
+        "calculus",
+        "limit",
+        "differential equation",
+        "ক্যালকুলাস",
+        "অন্তরক সমীকরণ",
+    ],
+    "vector": [
+        "vector",
+        "dot product",
+        "cross product",
+        "unit vector",
+        "position vector",
+        "gradient",
+        "divergence",
+        "curl",
+        "ভেক্টর",
+    ],
+    "parametric": [
+        "parametric",
+        "trajectory",
+        "path of the particle",
+        "প্যারামেট্রিক",
+        "গতিপথ",
+    ],
+    "motion_rate": ["velocity", "acceleration", "jerk", "বেগ", "ত্বরণ"],
+    "trigonometry": [
+        "sin",
+        "cos",
+        "tan",
+        "trigonometry",
+        "trigonometric",
+        "ত্রিকোণমিতি",
+    ],
+    "exponential": ["exponential", "logarithm", "log", "ln", "exp", "লগারিদম"],
+    "matrix": ["matrix", "determinant", "ম্যাট্রিক্স", "নির্ণায়ক"],
+    "definition": ["define", "definition", "meaning", "সংজ্ঞা", "অর্থ"],
+    "explanation": ["explain", "describe", "ব্যাখ্যা", "বর্ণনা"],
+    "problem_solving": ["how much", "how many", "কত", "নির্ণয়", "বের কর", "সমাধান"],
+    "comparison": [
+        "difference between",
+        "compare",
+        "comparison",
+        "versus",
+        "vs",
+        "পার্থক্য",
+        "তুলনা",
+    ],
+    "modeling": ["model", "modeling", "modelling", "মডেল"],
+}
+
+_CONCEPT_MATCHER = KeywordMatcher(
+    {
+        **{("physics", name): terms for name, terms in PHYSICS_SUBFIELDS.items()},
+        **CONCEPT_TERMS,
+    }
+)
+
+# Symbols that only appear in calculus or vector notation
+_DIFFERENTIATION_SYMBOLS = ("d/dt", "d/dx", "dy/dx", "∂")
+_INTEGRATION_SYMBOLS = ("∫",)
+_VECTOR_SYMBOLS = ("î", "ĵ", "k̂", "⃗", "∇")
+
+# Terms that name the parametric form itself, rather than a path it describes
+_PARAMETRIC_FORMS = ("parametric", "প্যারামেট্রিক")
+
+# Function calls inside formulas ("2cos(3t)" is a single word to the matcher)
+_TRIG_CALL = re.compile(r"(?:sin|cos|tan)\s*\(")
+_EXPONENTIAL_CALL = re.compile(r"(?:log|ln|exp)\s*\(|e\^")
+
+
+def detect_concepts(features: _TextFeatures) -> Dict[str, Any]:
+    """
+    Detect advanced mathematical and physics concepts in a question
+
+    Args:
+        features: Shared text features of the question
+
+    Returns:
+        Dictionary with the matched terms per concept, the number of
+        parametric components, the parametric motion flag, calculus and
+        vector flags, the differentiation and integration flags,
+        trigonometric and exponential flags, and the strongest physics
+        sub-field (or "none")
+    """
+    text = features.text
+    hits = _CONCEPT_MATCHER.match(features.lower)
+
+    # Functions of t with two or more components describe parametric motion
+    parametric_components = sum(
+        1
+        for expr in features.math_expressions
+        if expr["type"] == "equation" and "(t)" in expr["expression"]
+    )
+    # Motion given by functions of t is analysed by differentiating them
+    parametric_form = parametric_components >= 2 or any(
+        term in _PARAMETRIC_FORMS for term in hits.get("parametric", [])
+    )
+    motion = bool(hits.get("motion_rate") or hits.get(("physics", "kinematics")))
+    parametric_motion = bool((parametric_components or parametric_form) and motion)
+    differentiation = bool(
+        hits.get("differentiation")
+        or any(symbol in text for symbol in _DIFFERENTIATION_SYMBOLS)
+        or parametric_motion
+    )
+    integration = bool(
+        hits.get("integration")
+        or any(symbol in text for symbol in _INTEGRATION_SYMBOLS)
+    )
+    requires_vector_analysis = bool(
+        hits.get("vector")
+        or any(symbol in text for symbol in _VECTOR_SYMBOLS)
+        or parametric_components >= 2
+    )
+
+    subfield_hits = {
+        name: len(hits[("physics", name)])
+        for name in PHYSICS_SUBFIELDS
+        if ("physics", name) in hits
+    }
+    physics_subfield = "none"
+    if subfield_hits:
+        physics_subfield = max(subfield_hits, key=subfield_hits.get)
+
+    return {
+        "terms": {key: terms for key, terms in hits.items() if isinstance(key, str)},
+        "parametric_components": parametric_components,
+        "differentiation": differentiation,
+        "integration": integration,
+        "parametric_motion": parametric_motion,
+        "requires_calculus": bool(
+            differentiation or integration or parametric_form or hits.get("calculus")
+        ),
+        "requires_vector_analysis": requires_vector_analysis,
+        "trigonometric": bool(hits.get("trigonometry") or _TRIG_CALL.search(text)),
+        "exponential": bool(hits.get("exponential") or _EXPONENTIAL_CALL.search(text)),
+        "physics_subfield": physics_subfield,
+    }
@@ -0,0 +1,243 @@
+"""
+Local context analysis for the AI tutoring system
+Builds the preliminary_context state for a question without an LLM call
+"""
+
+from typing import Any, Dict, List
+
+from .concept_features import detect_concepts
+from .text_processing import (
+    _TextFeatures,
+    _assess_grade_level,
+    _classify_subject,
+    _extract_educational_context,
+)
+
+# Confidence at or above which the local analysis replaces the LLM analyzer
+LOCAL_CONTEXT_ANALYSIS_THRESHOLD = 0.8
+
+# classify_subject result → preliminary_context subject_category
+_SUBJECT_CATEGORIES = {
+    "math": "pure_mathematics",
+    "physics": "classical_mechanics",
+    "chemistry": "chemistry",
+    "biology": "biology",
+    "general": "other",
+}
+
+# Grade range → complexity_level for questions without calculus
+_GRADE_COMPLEXITY = {
+    "6-8": "elementary",
+    "9-10": "secondary",
+    "11-12": "higher_secondary",
+}
+
+
+def analyze_context(text: str) -> Dict[str, Any]:
+    """
+    Produce the preliminary_context schema for a question locally
+
+    Subject, grade and question type come from the text_processing tools;
+    calculus, vector and parametric motion content from the concept tables.
+    Classical physics sub-fields share the classical_mechanics category, and
+    quantum, relativity and nuclear topics map to modern_physics.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Dictionary with every preliminary_context field, including
+        confidence_score
+    """
+    features = _TextFeatures(text)
+    subject = _classify_subject(features)
+    concepts = detect_concepts(features)
+    context = _extract_educational_context(features)
+    expressions = features.math_expressions
+    terms = concepts["terms"]
+
+    scores = {name: data["score"] for name, data in subject["all_scores"].items()}
+    scored_subjects = [name for name, score in scores.items() if score]
+    # Parametric motion is physics even when no physics keyword names it
+    is_physics = bool(scores["physics"]) or concepts["parametric_motion"]
+    parametric = concepts["parametric_components"]
+    calculus = concepts["requires_calculus"]
+    vectors = concepts["requires_vector_analysis"]
+
+    # Subject category
+    if parametric >= 2 or (is_physics and (calculus or vectors)):
+        category = "mathematical_physics"
+    elif len(scored_subjects) > 1 and not {"math", "physics"} >= set(scored_subjects):
+        category = "interdisciplinary"
+    elif subject["subject"] == "physics" and concepts["physics_subfield"] == "quantum":
+        category = "modern_physics"
+    else:
+        category = _SUBJECT_CATEGORIES[subject["subject"]]
+        if category == "other" and (expressions or calculus):
+            category = "pure_mathematics"
+
+    # Complexity and grade
+    if parametric >= 2 or (calculus and vectors):
+        complexity, grade = "university", "university"
+    elif calculus or vectors:
+        complexity, grade = "higher_secondary", "11-12"
+    else:
+        grade_subject = (
+            subject["subject"] if subject["subject"] != "general" else "math"
+        )
+        grade = _assess_grade_level(features, grade_subject)["grade_level"]
+        complexity = _GRADE_COMPLEXITY[grade]
+
+    question_type = _question_type(context, concepts, expressions)
+    operations = _operations(concepts, expressions)
+    tools = _tools_needed(concepts, terms, operations)
+
+    # Processing priority and solution length
+    if complexity == "university":
+        priority, steps = "complex", "10+" if parametric >= 3 else "6-10"
+    elif calculus or vectors:
+        priority, steps = "complex", "6-10"
+    elif question_type in ("definition", "calculation"):
+        priority = "immediate" if complexity == "elementary" else "fast"
+        steps = "1-2"
+    elif question_type in ("problem_solving", "proof", "mathematical_modeling"):
+        priority = "standard"
+        steps = "6-10" if len(expressions) > 2 else "3-5"
+    else:
+        priority, steps = "standard", "3-5"
+
+    # Weak signals are left to the LLM analyzer; an expression counts double
+    signals = len(subject["matched_keywords"]) + 2 * len(expressions) + len(terms)
+    if subject["subject"] == "general" and not (expressions or calculus):
+        confidence = 0.5
+    elif category == "interdisciplinary":
+        confidence = 0.7
+    elif signals >= 2:
+        confidence = 0.9
+    else:
+        confidence = 0.75
+
+    return {
+        "subject_category": category,
+        "complexity_level": complexity,
+        "question_type": question_type,
+        "key_concepts": _key_concepts(subject, terms, parametric),
+        "mathematical_operations_required": operations,
+        "grade_level_estimate": grade,
+        "processing_priority": priority,
+        "requires_specialized_knowledge": category
+        in ("mathematical_physics", "modern_physics", "interdisciplinary")
+        or complexity == "university",
+        "confidence_score": confidence,
+        "analysis_notes": _analysis_notes(subject, concepts, expressions),
+        "estimated_solution_steps": steps,
+        "mathematical_tools_needed": tools,
+        "physics_subfield": concepts["physics_subfield"] if is_physics else "none",
+    }
+
+
+def _question_type(
+    context: Dict[str, Any],
+    concepts: Dict[str, Any],
+    expressions: List[Dict[str, Any]],
+) -> str:
+    """Pick the preliminary_context question_type"""
+    question_types = context["question_types"]
+    terms = concepts["terms"]
+    if "proof_based" in question_types:
+        return "proof"
+    if "comparison" in terms:
+        return "comparison"
+    if concepts["parametric_components"] >= 2 or "modeling" in terms:
+        return "mathematical_modeling"
+    if concepts["requires_calculus"]:
+        return "problem_solving"
+    if expressions:
+        # Numbers only, e.g. "15 * 8" or "3/4"
+        if not any(c.isalpha() for expr in expressions for c in expr["expression"]):
+            return "calculation"
+        return "problem_solving"
+    if "problem_solving" in question_types or "problem_solving" in terms:
+        return "problem_solving"
+    if "definition" in terms:
+        return "definition"
+    if "explanation" in terms or "conceptual_understanding" in question_types:
+        return "explanation"
+    if "analytical" in question_types:
+        return "analysis"
+    return "explanation"
+
+
+def _operations(
+    concepts: Dict[str, Any], expressions: List[Dict[str, Any]]
+) -> List[str]:
+    """List the mathematical operations a solution needs"""
+    operations = []
+    if concepts["differentiation"]:
+        operations.append("differentiation")
+    if concepts["integration"]:
+        operations.append("integration")
+    if concepts["requires_vector_analysis"]:
+        operations.append("vector_operations")
+    if concepts["trigonometric"]:
+        operations.append("trigonometry")
+    if any(expr["type"] == "equation" for expr in expressions):
+        operations.append("algebra")
+    elif expressions:
+        operations.append("arithmetic")
+    return operations
+
+
+def _tools_needed(
+    concepts: Dict[str, Any], terms: Dict[str, List[str]], operations: List[str]
+) -> List[str]:
+    """List the mathematical tool families a solution draws on"""
+    tools = []
+    if concepts["requires_calculus"]:
+        tools.append("calculus")
+    if "differential equation" in terms.get("calculus", []):
+        tools.append("differential_equations")
+    if concepts["requires_vector_analysis"] or "matrix" in terms:
+        tools.append("linear_algebra")
+    if concepts["trigonometric"]:
+        tools.append("trigonometry")
+    if concepts["exponential"]:
+        tools.append("exponentials_and_logarithms")
+    if "algebra" in operations:
+        tools.append("algebra")
+    return tools
+
+
+def _key_concepts(
+    subject: Dict[str, Any], terms: Dict[str, List[str]], parametric: int
+) -> List[str]:
+    """Combine concept groups and matched subject keywords"""
+    concepts = []
+    if parametric >= 2 or "parametric" in terms:
+        concepts.append("parametric_equations")
+    for name in ("differentiation", "integration", "calculus", "vector", "matrix"):
+        if name in terms:
+            concepts.append(name)
+    concepts.extend(subject["matched_keywords"])
+    return list(dict.fromkeys(concepts))
+
+
+def _analysis_notes(
+    subject: Dict[str, Any],
+    concepts: Dict[str, Any],
+    expressions: List[Dict[str, Any]],
+) -> str:
+    """Summarize what the local analysis found"""
+    notes = [f"Subject: {subject['subject']} (confidence {subject['confidence']:.2f})"]
+    if expressions:
+        notes.append(f"{len(expressions)} expression(s)")
+    if concepts["parametric_components"]:
+        notes.append(f"{concepts['parametric_components']} parametric component(s)")
+    flags = [
+        name
+        for name in ("requires_calculus", "requires_vector_analysis")
+        if concepts[name]
+    ]
+    if flags:
+        notes.append(", ".join(flags))
+    return "; ".join(notes)
@@ -0,0 +1,725 @@
+"""
+Curriculum index for the AI tutoring system
+Answers knowledge searches from a memory-mapped BM25 index over textbook text and our own notes, so the web is searched only when local recall is poor
+"""
+
+import argparse
+import array
+import functools
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .glossary import DEFAULT_GLOSSARY_PATH
+
+_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+)
+
+# Bundled notes and any NCTB textbook text (.jsonl, .md or .txt) put next to
+# them; the glossary is indexed as well
+DEFAULT_CURRICULUM_DIR = os.path.join(_DATA_DIR, "curriculum")
+DEFAULT_SOURCES = (DEFAULT_GLOSSARY_PATH, DEFAULT_CURRICULUM_DIR)
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "tutoring_agent", "curriculum.idx"
+)
+
+# Bump when the file layout or the tokenizer changes, so existing index
+# files are rebuilt instead of read with the wrong terms
+INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title words count this many times, so a passage about a topic outranks one
+# that mentions it
+TITLE_WEIGHT = 2
+
+# Share of the search phrases the top passages must cover before the web
+# search is skipped
+LOCAL_RECALL_THRESHOLD = 0.6
+
+# Textbook sections longer than this are split at paragraph boundaries
+MAX_PASSAGE_CHARS = 1200
+
+SOURCE_EXTENSIONS = (".jsonl", ".md", ".txt")
+
+_MAGIC = b"CIDX"
+_PREAMBLE = struct.Struct("<4sIQ")
+_ALIGNMENT = 8
+
+# Passage kind → priority_based_content field of the knowledge_content schema
+KIND_PRIORITIES = {
+    "definition": "definitions",
+    "term": "definitions",
+    "explanation": "definitions",
+    "example": "examples",
+    "procedure": "procedures",
+    "formula": "formulas",
+    "application": "applications",
+}
+
+_BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+_TOKENS = re.compile(r"[a-z0-9]+|[\u0980-\u09FF\u200c\u200d]+")
+
+# Question and task words carry no topic, in English, Bengali and Banglish
+STOPWORDS = frozenset("""
+    a about also an and any are as at be been between by can could define
+    derive describe determine did do does explain find for from give had has
+    have how i if in into is it its me mean meaning my of on or our please
+    prove show so solve step steps tell than that the their them then there
+    these they this those to us using was we were what when where which who
+    why will with would you your
+    ki keno kivabe kibhabe bolo bujhiye dao koro somadhan ta er
+    কি কী কেন কীভাবে কিভাবে কাকে বলে বলতে এবং ও বা এর একটি এই সেই করুন করো
+    কর করে ব্যাখ্যা বুঝিয়ে বুঝাও দাও দিন লিখ লেখ হয় হলো হল থেকে জন্য সাথে
+    মধ্যে যে যা আমাকে আমি তুমি আপনি সমাধান নির্ণয় প্রমাণ
+    """.split())
+
+# Bengali case and plural endings, longest first; stripped only when at least
+# MIN_BENGALI_STEM code points remain
+BENGALI_SUFFIXES = (
+    "গুলোকে",
+    "গুলোতে",
+    "দেরকে",
+    "গুলোর",
+    "গুলির",
+    "গুলো",
+    "গুলি",
+    "দের",
+    "টির",
+    "টার",
+    "েরা",
+    "ের",
+    "কে",
+    "তে",
+    "টি",
+    "টা",
+    "ে",
+)
+# Genitive "র" follows these vowel signs (গতির, আলোর); after a consonant or
+# "া" it is usually part of the word (সূত্র, ক্ষার)
+_GENITIVE_VOWELS = ("ি", "ো")
+MIN_BENGALI_STEM = 2
+
+
+def _stem(token: str) -> str:
+    if token[0] >= "\u0980":
+        for suffix in BENGALI_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_BENGALI_STEM:
+                return token[: -len(suffix)]
+        if (
+            token.endswith("র")
+            and token[-2:-1] in _GENITIVE_VOWELS
+            and len(token) > MIN_BENGALI_STEM
+        ):
+            return token[:-1]
+        return token
+    # English plurals only; "physics" and "mitosis" keep their ending
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("sses", "xes", "ches", "shes")):
+        return token[:-2]
+    if (
+        len(token) > 3
+        and token.endswith("s")
+        and not token.endswith(("ss", "us", "is"))
+    ):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split English, Bengali or mixed text into index terms
+
+    Text is NFC normalized and case folded, Bengali digits become ASCII
+    digits, Latin and Bengali runs are separated, stopwords and single Latin
+    letters are dropped, and plural and case endings are stripped, so
+    "নিউটনের সূত্রগুলো" and "Newton's laws" reach the same terms as the
+    passages about them.
+
+    Args:
+        text: Passage, title or search phrase
+
+    Returns:
+        Terms in order of appearance, repeats included
+    """
+    text = unicodedata.normalize("NFC", text).casefold().translate(_BENGALI_DIGITS)
+    terms = []
+    for token in _TOKENS.findall(text):
+        token = token.strip("\u200c\u200d")
+        if not token or token in STOPWORDS:
+            continue
+        if len(token) == 1 and token.isalpha():
+            continue
+        terms.append(_stem(token))
+    return terms
+
+
+def _glossary_passage(record: Dict[str, Any]) -> Dict[str, Any]:
+    body = record.get("definition") or record.get("formula", "")
+    parts = [body, record.get("explanation", ""), record.get("example", "")]
+    aliases = record.get("aliases", [])
+    return {
+        "id": f"glossary-{record['kind']}-{record['name']}",
+        "title": record["name"],
+        "bn": record.get("bn", ""),
+        "aliases": aliases,
+        "subject": record.get("subject", ""),
+        "grade": record.get("grade", ""),
+        "kind": "definition" if record["kind"] == "term" else "formula",
+        "text": " ".join(part for part in parts if part),
+    }
+
+
+def _jsonl_passages(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "text" not in record:
+                if "name" not in record:
+                    raise ValueError(
+                        f"{path}:{number}: record has neither text nor name"
+                    )
+                record = _glossary_passage(record)
+            record.setdefault("id", f"{os.path.basename(path)}:{number}")
+            yield record
+
+
+def _split_paragraphs(text: str) -> Iterator[str]:
+    """Group paragraphs into chunks of at most MAX_PASSAGE_CHARS"""
+    chunk = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if chunk and len(chunk) + len(paragraph) > MAX_PASSAGE_CHARS:
+            yield chunk
+            chunk = ""
+        chunk = f"{chunk}\n\n{paragraph}" if chunk else paragraph
+    if chunk:
+        yield chunk
+
+
+def _text_passages(path: str) -> Iterator[Dict[str, Any]]:
+    """Passages of a Markdown or plain text file, one or more per heading"""
+    with open(path, encoding="utf-8") as file:
+        content = file.read()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    sections = re.split(r"^#{1,6}[ \t]+(.+)$", content, flags=re.MULTILINE)
+    # re.split with a group alternates body, heading, body, ...
+    titled = [(stem, sections[0])] + list(zip(sections[1::2], sections[2::2]))
+    number = 0
+    for title, body in titled:
+        for chunk in _split_paragraphs(body):
+            number += 1
+            yield {
+                "id": f"{stem}-{number}",
+                "title": title.strip(),
+                "subject": "",
+                "grade": "",
+                "kind": "explanation",
+                "text": chunk,
+            }
+
+
+def source_files(sources: Iterable[str]) -> List[str]:
+    """
+    Expand source paths into the data files they contain
+
+    Args:
+        sources: Files, or directories searched recursively for .jsonl, .md
+            and .txt files
+
+    Returns:
+        Absolute file paths in a stable order
+    """
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            for directory, _, names in sorted(os.walk(source)):
+                files.extend(
+                    os.path.join(directory, name)
+                    for name in sorted(names)
+                    if name.endswith(SOURCE_EXTENSIONS)
+                )
+        else:
+            files.append(source)
+    return [os.path.abspath(path) for path in files]
+
+
+def _signature(files: List[str]) -> List[List[Any]]:
+    signature = []
+    for path in files:
+        status = os.stat(path)
+        signature.append([path, status.st_size, status.st_mtime_ns])
+    return signature
+
+
+def read_passages(files: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Passages of every source file, with the file recorded as source"""
+    for path in files:
+        reader = _jsonl_passages if path.endswith(".jsonl") else _text_passages
+        for passage in reader(path):
+            passage["source"] = os.path.basename(path)
+            yield passage
+
+
+def _passage_terms(passage: Dict[str, Any]) -> List[str]:
+    title = " ".join(
+        [passage.get("title", ""), passage.get("bn", ""), *passage.get("aliases", [])]
+    )
+    return tokenize(title) * TITLE_WEIGHT + tokenize(passage["text"])
+
+
+def _pad(file, position: int) -> int:
+    padding = -position % _ALIGNMENT
+    file.write(b"\0" * padding)
+    return position + padding
+
+
+def build_index(
+    sources: Iterable[str] = DEFAULT_SOURCES, output: str = DEFAULT_INDEX_PATH
+) -> Dict[str, Any]:
+    """
+    Ingest source files into an index file
+
+    The file holds a JSON header, the vocabulary with each term's postings
+    offset and document frequency, the postings as (passage, term frequency)
+    integer pairs, passage lengths, and the passage records themselves. It is
+    written next to output and renamed into place, so processes still
+    mapping the old file keep a consistent view.
+
+    Args:
+        sources: Files or directories, see source_files
+        output: Path of the index file
+
+    Returns:
+        Header of the written index
+    """
+    files = source_files(sources)
+    signature = _signature(files)
+
+    postings: Dict[str, List[int]] = {}
+    lengths = array.array("I")
+    records: List[bytes] = []
+    for passage in read_passages(files):
+        terms = _passage_terms(passage)
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            postings.setdefault(term, []).extend((len(lengths), count))
+        lengths.append(len(terms))
+        records.append(json.dumps(passage, ensure_ascii=False).encode("utf-8"))
+
+    vocabulary: Dict[str, Tuple[int, int]] = {}
+    flat = array.array("I")
+    for term in sorted(postings):
+        vocabulary[term] = (len(flat), len(postings[term]) // 2)
+        flat.extend(postings[term])
+    offsets = array.array("Q", [0])
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    sections = [
+        ("vocabulary", json.dumps(vocabulary, ensure_ascii=False).encode("utf-8")),
+        ("postings", flat.tobytes()),
+        ("lengths", lengths.tobytes()),
+        ("offsets", offsets.tobytes()),
+        ("records", b"".join(records)),
+    ]
+    header: Dict[str, Any] = {
+        "version": INDEX_VERSION,
+        "byteorder": sys.byteorder,
+        "passages": len(lengths),
+        "terms": len(vocabulary),
+        "average_length": sum(lengths) / len(lengths) if lengths else 0.0,
+        "sources": signature,
+        "sections": {},
+    }
+    # Section offsets are relative to the end of the header, whose own length
+    # depends on them
+    position = 0
+    for name, data in sections:
+        position += -position % _ALIGNMENT
+        header["sections"][name] = [position, len(data)]
+        position += len(data)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_bytes += b" " * (-(_PREAMBLE.size + len(header_bytes)) % _ALIGNMENT)
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(_PREAMBLE.pack(_MAGIC, INDEX_VERSION, len(header_bytes)))
+            file.write(header_bytes)
+            position = 0
+            for _, data in sections:
+                position = _pad(file, position)
+                file.write(data)
+                position += len(data)
+        os.replace(temporary, output)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return header
+
+
+class CurriculumIndex:
+    """
+    Read-only BM25 index over curriculum passages
+
+    Postings, passage lengths and records are read straight from the mapped
+    file; only the vocabulary is decoded on load. Processes forked after
+    loading share the mapped pages.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        """
+        Map an index file written by build_index
+
+        Args:
+            path: Index file
+
+        Raises:
+            ValueError: If the file is not an index of the current version
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._data)
+        if magic != _MAGIC or version != INDEX_VERSION:
+            self._data.close()
+            raise ValueError(f"{path} is not a version {INDEX_VERSION} index")
+        start = _PREAMBLE.size
+        self.header = json.loads(self._data[start : start + header_length])
+        if self.header["byteorder"] != sys.byteorder:
+            self._data.close()
+            raise ValueError(
+                f"{path} was written on a {self.header['byteorder']}-endian machine"
+            )
+
+        body = start + header_length
+        view = memoryview(self._data)
+        sections = {
+            name: view[body + offset : body + offset + length]
+            for name, (offset, length) in self.header["sections"].items()
+        }
+        self._vocabulary: Dict[str, List[int]] = json.loads(
+            bytes(sections["vocabulary"])
+        )
+        self._postings = sections["postings"].cast("I")
+        self._lengths = sections["lengths"].cast("I")
+        self._offsets = sections["offsets"].cast("Q")
+        self._records = sections["records"]
+        self._average_length = self.header["average_length"] or 1.0
+        self._counts = {"searches": 0, "sufficient": 0}
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def record(self, passage_id: int) -> Dict[str, Any]:
+        """Decode one passage from the mapped file"""
+        start, end = self._offsets[passage_id], self._offsets[passage_id + 1]
+        return json.loads(bytes(self._records[start:end]))
+
+    def is_current(self, sources: Iterable[str]) -> bool:
+        """Whether the index was built from the sources as they are now"""
+        try:
+            return self.header["sources"] == _signature(source_files(sources))
+        except OSError:
+            return False
+
+    def rank(self, terms: Iterable[str], limit: int) -> List[Tuple[float, int]]:
+        """
+        Score passages against index terms with BM25
+
+        Args:
+            terms: Terms from tokenize; repeats are ignored
+            limit: Maximum number of passages
+
+        Returns:
+            List of (score, passage id), best first
+        """
+        documents = len(self._lengths)
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            entry = self._vocabulary.get(term)
+            if entry is None:
+                continue
+            start, frequency = entry
+            idf = math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
+            pairs = self._postings[start : start + 2 * frequency]
+            for passage_id, count in zip(pairs[::2], pairs[1::2]):
+                norm = (
+                    1
+                    - BM25_B
+                    + BM25_B * self._lengths[passage_id] / self._average_length
+                )
+                score = idf * count * (BM25_K1 + 1) / (count + BM25_K1 * norm)
+                scores[passage_id] = scores.get(passage_id, 0.0) + score
+        return heapq.nlargest(limit, ((score, pid) for pid, score in scores.items()))
+
+    def search(
+        self,
+        primary_search_terms: List[str],
+        bengali_search_terms: Optional[List[str]] = None,
+        limit: int = 3,
+    ) -> Dict[str, Any]:
+        """
+        Find passages for English and Bengali search phrases
+
+        Recall is the share of phrases whose every term occurs in one of the
+        returned passages, taken for the English and the Bengali phrases
+        separately; the better of the two counts, since either language is
+        enough to answer from.
+
+        Args:
+            primary_search_terms: English (or mixed) search phrases
+            bengali_search_terms: Bengali search phrases
+            limit: Maximum number of passages
+
+        Returns:
+            Dictionary with passages (records with score added), recall,
+            sufficient (recall reaches LOCAL_RECALL_THRESHOLD) and search_ms
+        """
+        start = time.perf_counter()
+        phrase_sets = [
+            [set(tokenize(phrase)) for phrase in phrases or []]
+            for phrases in (primary_search_terms, bengali_search_terms)
+        ]
+        phrase_sets = [[terms for terms in phrases if terms] for phrases in phrase_sets]
+        query = [term for phrases in phrase_sets for terms in phrases for term in terms]
+
+        passages = []
+        covered_terms = []
+        for score, passage_id in self.rank(query, limit):
+            passage = self.record(passage_id)
+            covered_terms.append(set(_passage_terms(passage)))
+            passage["score"] = round(score, 3)
+            passages.append(passage)
+
+        recall = 0.0
+        for phrases in phrase_sets:
+            if phrases:
+                covered = sum(
+                    any(terms <= passage for passage in covered_terms)
+                    for terms in phrases
+                )
+                recall = max(recall, covered / len(phrases))
+
+        sufficient = bool(passages) and recall >= LOCAL_RECALL_THRESHOLD
+        self._counts["searches"] += 1
+        self._counts["sufficient"] += sufficient
+        return {
+            "passages": passages,
+            "recall": round(recall, 3),
+            "sufficient": sufficient,
+            "search_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Index size and search counters since it was loaded
+
+        Returns:
+            Dictionary with passages, terms, bytes, searches, sufficient and
+            local_rate (share of searches answered locally)
+        """
+        searches = self._counts["searches"]
+        return {
+            "passages": len(self._lengths),
+            "terms": len(self._vocabulary),
+            "bytes": len(self._data),
+            **self._counts,
+            "local_rate": self._counts["sufficient"] / searches if searches else 0.0,
+        }
+
+    def close(self) -> None:
+        for view in (self._postings, self._lengths, self._offsets, self._records):
+            view.release()
+        self._data.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_curriculum_index(
+    path: str = DEFAULT_INDEX_PATH, sources: Tuple[str, ...] = DEFAULT_SOURCES
+) -> CurriculumIndex:
+    """
+    Shared curriculum index, built or rebuilt on first use
+
+    The index is rebuilt when it is missing, of another version, or older
+    than its source files. Call this before forking workers so they share
+    the mapping.
+
+    Args:
+        path: Index file
+        sources: Files or directories the index is built from
+
+    Returns:
+        CurriculumIndex for the file
+    """
+    try:
+        index = CurriculumIndex(path)
+    except (OSError, ValueError):
+        index = None
+    if index is not None and index.is_current(sources):
+        return index
+    if index is not None:
+        index.close()
+    build_index(sources, path)
+    return CurriculumIndex(path)
+
+
+def search_curriculum(
+    primary_search_terms: List[str],
+    bengali_search_terms: Optional[List[str]] = None,
+    limit: int = 3,
+) -> Dict[str, Any]:
+    """
+    Search the local curriculum index for textbook passages and notes
+
+    Use this before searching the web. When "sufficient" is true the
+    passages cover the search terms and answer from them; otherwise search
+    the web.
+
+    Args:
+        primary_search_terms: English search phrases, e.g. ["Newton's second law"]
+        bengali_search_terms: Bengali search phrases, e.g. ["নিউটনের দ্বিতীয় সূত্র"]
+        limit: Maximum number of passages to return
+
+    Returns:
+        Dictionary with passages (id, title, bn, subject, grade, kind, text,
+        source, score), recall, sufficient and search_ms
+    """
+    return get_curriculum_index().search(
+        primary_search_terms, bengali_search_terms, limit
+    )
+
+
+def curriculum_knowledge(
+    search_context: Dict[str, Any], question: str = "", limit: int = 3
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the KnowledgeRetriever output from local passages
+
+    Args:
+        search_context: preliminary_search_context with primary_search_terms
+            and bengali_search_terms
+        question: Question to search for when the context has no terms
+        limit: Maximum number of passages
+
+    Returns:
+        knowledge_content dictionary with knowledge_source "local_curriculum",
+        or None when local recall is too poor to skip the web search
+    """
+    primary = list(search_context.get("primary_search_terms") or [])
+    bengali = list(search_context.get("bengali_search_terms") or [])
+    if not primary and not bengali:
+        primary = [search_context.get("original_question") or question]
+    result = search_curriculum(primary, bengali, limit)
+    if not result["sufficient"]:
+        return None
+
+    passages = result["passages"]
+
+    def joined(kinds: Optional[Tuple[str, ...]] = None, skip: int = 0) -> str:
+        return "\n\n".join(
+            f"{passage['title']}: {passage['text']}"
+            for passage in passages[skip:]
+            if kinds is None or passage.get("kind") in kinds
+        )
+
+    priorities = {
+        field: tuple(kind for kind, name in KIND_PRIORITIES.items() if name == field)
+        for field in dict.fromkeys(KIND_PRIORITIES.values())
+    }
+    return {
+        "direct_question_content": f"{passages[0]['title']}: {passages[0]['text']}",
+        "core_topic_explanations": joined(("definition", "term", "explanation")),
+        "supporting_concepts": joined(skip=1),
+        "multilingual_resources": "; ".join(
+            f"{p['title']} ({p['bn']})" if p.get("bn") else p["title"] for p in passages
+        ),
+        "hierarchical_knowledge": "",
+        "curriculum_aligned_content": "; ".join(
+            f"{p['title']} ({p.get('subject') or 'general'}, "
+            f"grade {p.get('grade') or 'any'})"
+            for p in passages
+        ),
+        "priority_based_content": {
+            field: joined(kinds) for field, kinds in priorities.items()
+        },
+        "prerequisite_knowledge": "",
+        "related_topics": "",
+        "misconception_prevention": joined(("misconception",)),
+        "difficulty_appropriate_content": "",
+        "source_specific_materials": "; ".join(
+            f"{p['source']}: {p['id']}" for p in passages
+        ),
+        "visual_and_reference_aids": "",
+        "knowledge_source": "local_curriculum",
+        "confidence_score": result["recall"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m tutoring_agent.tools.curriculum_index",
+        description="Build or query the local curriculum index",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="ingest source files into the index")
+    build.add_argument(
+        "sources",
+        nargs="*",
+        default=list(DEFAULT_SOURCES),
+        help="JSON lines, Markdown or text files, or directories of them",
+    )
+    build.add_argument("--output", default=DEFAULT_INDEX_PATH, help="index file")
+    search = commands.add_parser("search", help="query an existing index")
+    search.add_argument("terms", nargs="+", help="search phrases, English or Bengali")
+    search.add_argument("--index", default=DEFAULT_INDEX_PATH, help="index file")
+    search.add_argument("--limit", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        header = build_index(args.sources, args.output)
+        print(
+            f"Indexed {header['passages']} passages, {header['terms']} terms from "
+            f"{len(header['sources'])} files into {args.output} in "
+            f"{(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return
+
+    index = CurriculumIndex(args.index)
+    bengali = [term for term in args.terms if re.search("[\u0980-\u09ff]", term)]
+    primary = [term for term in args.terms if term not in bengali]
+    result = index.search(primary, bengali, args.limit)
+    print(
+        f"recall {result['recall']}, sufficient {result['sufficient']}, "
+        f"{result['search_ms']} ms"
+    )
+    for passage in result["passages"]:
+        print(f"  {passage['score']:7.3f}  {passage['id']}  {passage['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,648 @@
+"""
+Local equation solving for the AI tutoring system
+Solves one-variable linear and quadratic equations and 2×2 linear systems exactly
+"""
+
+import ast
+import math
+import re
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Tuple
+
+from .calculator import (
+    MAX_EXPONENT,
+    MAX_EXPRESSION_LENGTH,
+    MAX_MAGNITUDE,
+    MAX_NODES,
+    CalculationError,
+    format_number,
+)
+from .math_lexer import scan_expressions
+from .text_processing import normalize_text
+
+# A monomial is a sorted tuple of (variable, power); () is the constant term
+Monomial = Tuple[Tuple[str, int], ...]
+Polynomial = Dict[Monomial, Fraction]
+
+MAX_DEGREE = 2
+
+_SUPERSCRIPTS = {"²": "^2", "³": "^3"}
+_SUPERSCRIPT_PATTERN = re.compile("[²³]")
+# "2x", "3(x + 1)", "xy" and ")(" all mean multiplication
+_IMPLICIT_PRODUCT = re.compile(r"(?<=[0-9a-zA-Z).])\s*(?=[a-zA-Z(])")
+# Separators between the equations of a system
+_EQUATION_SEPARATOR = re.compile(r"[,;\n]|\band\b|এবং")
+
+# Largest prime factor tried when simplifying a square root
+_MAX_SQUARE_FACTOR = 1000
+
+
+def solve_equations(text: str) -> Dict[str, Any]:
+    """
+    Solve the equations in a question exactly
+
+    Handles one linear or quadratic equation in one variable and systems of
+    two linear equations in two variables. Equations are taken from the
+    question text ("Solve 2x + 5 = 13", "২x + ৫ = ১৩ সমাধান করুন") and
+    solved with rational arithmetic; irrational and complex roots are given
+    in simplified surd form with decimal approximations.
+
+    Args:
+        text: Question text or equations separated by commas, "and" or "এবং"
+
+    Returns:
+        Dictionary with solved, kind, variables, equations, solutions,
+        approximations, solution_set and the list of steps, or solved=False
+        with the reason
+    """
+    equations = _find_equations(text)
+    if not equations:
+        return _unsolved("No equation found")
+
+    try:
+        parsed = [_parse_equation(equation) for equation in equations]
+    except CalculationError as error:
+        return _unsolved(str(error), equations)
+
+    polynomials = [_subtract(left, right) for _, left, right in parsed]
+    # Unknowns that cancel out ("x + 1 = x + 2") still count
+    variables = sorted(
+        {var for _, left, right in parsed for var in _variables({**left, **right})}
+    )
+    shown = [shown for shown, _, _ in parsed]
+
+    if len(parsed) == 1 and len(variables) == 1:
+        variable = variables[0]
+        if _degree(polynomials[0]) == 2:
+            result = _solve_quadratic(polynomials[0], variable, parsed[0])
+        else:
+            result = _solve_linear(polynomials[0], variable, parsed[0])
+    elif len(parsed) == 2 and len(variables) == 2:
+        if any(_degree(poly) > 1 for poly in polynomials):
+            return _unsolved("Only linear systems are supported", shown)
+        result = _solve_system(polynomials, variables, parsed)
+    elif not variables:
+        return _unsolved("The equation has no unknown", shown)
+    else:
+        return _unsolved(
+            f"{len(parsed)} equation(s) in {len(variables)} unknown(s) "
+            "are not supported",
+            shown,
+        )
+
+    result.update({"solved": True, "variables": variables, "equations": shown})
+    return result
+
+
+def format_solution(result: Dict[str, Any]) -> str:
+    """
+    Render a solve_equations result as a numbered explanation
+
+    Args:
+        result: Dictionary returned by solve_equations
+
+    Returns:
+        Markdown text with the steps and the final answer
+    """
+    equations = "; ".join(result["equations"])
+    if not result["solved"]:
+        return f"Cannot solve {equations or 'the question'}: {result['reason']}"
+
+    lines = [f"**Solving {equations}**", ""]
+    for number, step in enumerate(result["steps"], 1):
+        lines.append(f"{number}. {step['description']}: {step['equation']}")
+
+    variables = ", ".join(result["variables"])
+    solution_set = result["solution_set"]
+    if solution_set == "none":
+        answer = "no solution"
+    elif solution_set == "all" and result["kind"] == "linear_system":
+        answer = "infinitely many solutions, one for every point on the line"
+    elif solution_set == "all":
+        answer = f"every value of {variables} is a solution"
+    else:
+        answer = " or ".join(
+            ", ".join(f"{var} = {value}" for var, value in solution.items())
+            for solution in result["solutions"]
+        )
+        if solution_set == "complex":
+            answer = f"no real roots; the complex roots are {answer}"
+    lines.extend(["", f"**Answer:** {answer}"])
+    return "\n".join(lines)
+
+
+def _unsolved(reason: str, equations: Optional[List[str]] = None) -> Dict[str, Any]:
+    return {"solved": False, "reason": reason, "equations": equations or []}
+
+
+def _find_equations(text: str) -> List[str]:
+    """Pick the equations out of a question, or split a bare list of them"""
+    found = [
+        expr["expression"]
+        for expr in scan_expressions(text)
+        if expr["type"] == "equation"
+    ]
+    if found:
+        return found
+    return [part for part in _EQUATION_SEPARATOR.split(text) if "=" in part]
+
+
+def _parse_equation(equation: str) -> Tuple[str, Polynomial, Polynomial]:
+    """Parse "left = right" into the display form and both polynomials"""
+    shown = normalize_text(equation)
+    if len(shown) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError(
+            f"Equation longer than {MAX_EXPRESSION_LENGTH} characters"
+        )
+    sides = shown.split("=")
+    if len(sides) != 2 or not all(side.strip() for side in sides):
+        raise CalculationError(f"Not a single equation: {shown}")
+
+    polynomials = []
+    for side in sides:
+        source = _SUPERSCRIPT_PATTERN.sub(lambda m: _SUPERSCRIPTS[m.group()], side)
+        source = _IMPLICIT_PRODUCT.sub("*", source.strip()).replace("^", "**")
+        try:
+            tree = ast.parse(source, mode="eval")
+        except (SyntaxError, ValueError, MemoryError, RecursionError):
+            raise CalculationError(f"Cannot read {side.strip()}") from None
+        if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+            raise CalculationError(f"Equation has more than {MAX_NODES} parts")
+        polynomials.append(_polynomial(tree.body))
+    return shown, polynomials[0], polynomials[1]
+
+
+def _polynomial(node: ast.AST) -> Polynomial:
+    """Convert a syntax tree into a polynomial with rational coefficients"""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalculationError(
+                "Only numbers and single-letter unknowns are allowed"
+            )
+        return _checked({(): Fraction(str(node.value))})
+    if isinstance(node, ast.Name):
+        if len(node.id) != 1 or not node.id.isalpha():
+            raise CalculationError(f"Unknown symbol {node.id}")
+        return {((node.id, 1),): Fraction(1)}
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        operand = _polynomial(node.operand)
+        if isinstance(node.op, ast.USub):
+            return {mono: -coef for mono, coef in operand.items()}
+        return operand
+    if not isinstance(node, ast.BinOp):
+        raise CalculationError("Only + - * / and powers are allowed")
+
+    left = _polynomial(node.left)
+    right = _polynomial(node.right)
+    if isinstance(node.op, ast.Add):
+        return _checked(_add(left, right))
+    if isinstance(node.op, ast.Sub):
+        return _checked(_subtract(left, right))
+    if isinstance(node.op, ast.Mult):
+        return _checked(_multiply(left, right))
+    if isinstance(node.op, ast.Div):
+        divisor = _constant(right)
+        if divisor is None:
+            raise CalculationError("Division by an unknown is not supported")
+        if divisor == 0:
+            raise CalculationError("Division by zero")
+        return _checked({mono: coef / divisor for mono, coef in left.items()})
+    if isinstance(node.op, ast.Pow):
+        exponent = _constant(right)
+        if exponent is None or exponent.denominator != 1 or exponent < 0:
+            raise CalculationError("Powers must be whole numbers")
+        if abs(exponent) > MAX_EXPONENT:
+            raise CalculationError(f"Exponent larger than {MAX_EXPONENT}")
+        base = _constant(left)
+        if base is not None:
+            size = max(abs(base.numerator), base.denominator, 1)
+            if exponent * math.log10(size) > math.log10(MAX_MAGNITUDE):
+                raise CalculationError("Number is too large")
+            return _checked({(): base ** int(exponent)})
+        if exponent * _degree(left) > MAX_DEGREE:
+            raise CalculationError(f"Degree higher than {MAX_DEGREE}")
+        result: Polynomial = {(): Fraction(1)}
+        for _ in range(int(exponent)):
+            result = _multiply(result, left)
+        return _checked(result)
+    raise CalculationError("Only + - * / and powers are allowed")
+
+
+def _checked(poly: Polynomial) -> Polynomial:
+    """Drop zero terms and reject oversized coefficients"""
+    poly = {mono: coef for mono, coef in poly.items() if coef}
+    for coef in poly.values():
+        if abs(coef) > MAX_MAGNITUDE or coef.denominator > MAX_MAGNITUDE:
+            raise CalculationError("Number is too large")
+    return poly
+
+
+def _add(left: Polynomial, right: Polynomial) -> Polynomial:
+    result = dict(left)
+    for mono, coef in right.items():
+        result[mono] = result.get(mono, 0) + coef
+    return {mono: coef for mono, coef in result.items() if coef}
+
+
+def _subtract(left: Polynomial, right: Polynomial) -> Polynomial:
+    return _add(left, {mono: -coef for mono, coef in right.items()})
+
+
+def _multiply(left: Polynomial, right: Polynomial) -> Polynomial:
+    if _degree(left) + _degree(right) > MAX_DEGREE:
+        raise CalculationError(f"Degree higher than {MAX_DEGREE}")
+    result: Polynomial = {}
+    for mono_a, coef_a in left.items():
+        for mono_b, coef_b in right.items():
+            powers: Dict[str, int] = dict(mono_a)
+            for var, power in mono_b:
+                powers[var] = powers.get(var, 0) + power
+            mono = tuple(sorted(powers.items()))
+            result[mono] = result.get(mono, 0) + coef_a * coef_b
+    return {mono: coef for mono, coef in result.items() if coef}
+
+
+def _constant(poly: Polynomial) -> Optional[Fraction]:
+    """Value of a constant polynomial, or None if it has unknowns"""
+    if any(mono for mono in poly):
+        return None
+    return poly.get((), Fraction(0))
+
+
+def _degree(poly: Polynomial) -> int:
+    return max((sum(power for _, power in mono) for mono in poly), default=0)
+
+
+def _variables(poly: Polynomial) -> List[str]:
+    return sorted({var for mono in poly for var, _ in mono})
+
+
+def _coefficient(poly: Polynomial, variable: str, power: int) -> Fraction:
+    mono = ((variable, power),) if power else ()
+    return poly.get(mono, Fraction(0))
+
+
+def _solve_linear(
+    poly: Polynomial, variable: str, parsed: Tuple[str, Polynomial, Polynomial]
+) -> Dict[str, Any]:
+    a = _coefficient(poly, variable, 1)
+    b = _coefficient(poly, variable, 0)
+    steps = [_step("Write the equation", parsed[0])]
+
+    if a == 0:
+        identity = b == 0
+        steps.append(
+            _step(
+                f"Collect the {variable} terms: they cancel out",
+                f"0 = {format_number(-b)}",
+            )
+        )
+        return {
+            "kind": "linear",
+            "solutions": [],
+            "approximations": [],
+            "solution_set": "all" if identity else "none",
+            "steps": steps,
+        }
+
+    steps.append(
+        _step(
+            f"Move the {variable} terms to the left and the numbers to the right",
+            f"{_format_term(a, ((variable, 1),), first=True)} = {format_number(-b)}",
+        )
+    )
+    root = -b / a
+    if a != 1:
+        steps.append(
+            _step(
+                f"Divide both sides by {format_number(a)}",
+                f"{variable} = {format_number(root)}",
+            )
+        )
+    steps.append(_check_step(parsed, {variable: root}))
+    return {
+        "kind": "linear",
+        "solutions": [{variable: format_number(root)}],
+        "approximations": [{variable: float(root)}],
+        "solution_set": "finite",
+        "steps": steps,
+    }
+
+
+def _solve_quadratic(
+    poly: Polynomial, variable: str, parsed: Tuple[str, Polynomial, Polynomial]
+) -> Dict[str, Any]:
+    a = _coefficient(poly, variable, 2)
+    b = _coefficient(poly, variable, 1)
+    c = _coefficient(poly, variable, 0)
+    if a < 0:
+        a, b, c = -a, -b, -c
+    standard = {((variable, 2),): a, ((variable, 1),): b, (): c}
+    steps = [
+        _step("Write the equation", parsed[0]),
+        _step(
+            "Bring every term to the left side (standard form ax² + bx + c = 0)",
+            f"{_format_polynomial(standard)} = 0",
+        ),
+        _step(
+            "Read off the coefficients",
+            f"a = {format_number(a)}, b = {format_number(b)}, c = {format_number(c)}",
+        ),
+    ]
+
+    discriminant = b * b - 4 * a * c
+    steps.append(
+        _step(
+            "Compute the discriminant D = b² - 4ac",
+            f"D = {_parenthesize(b)}² - 4({format_number(a)})({format_number(c)})"
+            f" = {format_number(discriminant)}",
+        )
+    )
+
+    center = -b / (2 * a)
+    root = _rational_sqrt(abs(discriminant))
+    formula = f"{variable} = (-b ± √D) / 2a"
+
+    if root is not None:
+        offset = root / (2 * a)
+        roots = sorted({center - offset, center + offset}, reverse=True)
+        if discriminant < 0:
+            solutions = [
+                {
+                    variable: _format_root(
+                        center, f"{_format_coefficient(offset)}i", sign
+                    )
+                }
+                for sign in "+-"
+            ]
+            approximations = [
+                {variable: _complex_value(center, sign * float(offset))}
+                for sign in (1, -1)
+            ]
+            steps.append(
+                _step(
+                    "D is negative, so there are no real roots; "
+                    f"use the formula {formula}",
+                    " or ".join(f"{variable} = {s[variable]}" for s in solutions),
+                )
+            )
+            solution_set = "complex"
+        else:
+            steps.append(
+                _step(
+                    f"D is a perfect square; use the formula {formula}",
+                    f"{variable} = ({format_number(-b)} ± {format_number(root)})"
+                    f" / {format_number(2 * a)}",
+                )
+            )
+            steps.append(
+                _step(
+                    (
+                        "Simplify both roots"
+                        if len(roots) == 2
+                        else "D = 0: one repeated root"
+                    ),
+                    " or ".join(f"{variable} = {format_number(r)}" for r in roots),
+                )
+            )
+            for value in roots:
+                steps.append(_check_step(parsed, {variable: value}))
+            solutions = [{variable: format_number(r)} for r in roots]
+            approximations = [{variable: float(r)} for r in roots]
+            solution_set = "finite"
+    else:
+        scale, radicand = _simplify_sqrt(abs(discriminant))
+        offset = scale / (2 * a)
+        surd = f"{_format_coefficient(offset)}√{radicand}"
+        if discriminant < 0:
+            surd += "i"
+        if center:
+            exact = f"{format_number(center)} ± {surd}"
+        else:
+            exact = f"±{surd}"
+        spread = float(offset) * math.sqrt(radicand)
+        steps.append(
+            _step(
+                f"Use the formula {formula}",
+                f"{variable} = ({format_number(-b)} ± √{format_number(discriminant)})"
+                f" / {format_number(2 * a)} = {exact}",
+            )
+        )
+        solutions = [{variable: _format_root(center, surd, sign)} for sign in "+-"]
+        if discriminant < 0:
+            approximations = [
+                {variable: _complex_value(center, sign * spread)} for sign in (1, -1)
+            ]
+            solution_set = "complex"
+        else:
+            approximations = [
+                {variable: float(center) + sign * spread} for sign in (1, -1)
+            ]
+            steps.append(
+                _step(
+                    "Approximate the roots",
+                    " or ".join(
+                        f"{variable} ≈ {value[variable]:.4f}"
+                        for value in approximations
+                    ),
+                )
+            )
+            solution_set = "finite"
+    return {
+        "kind": "quadratic",
+        "solutions": solutions,
+        "approximations": approximations,
+        "solution_set": solution_set,
+        "steps": steps,
+    }
+
+
+def _solve_system(
+    polynomials: List[Polynomial],
+    variables: List[str],
+    parsed: List[Tuple[str, Polynomial, Polynomial]],
+) -> Dict[str, Any]:
+    x, y = variables
+    rows = [
+        (
+            _coefficient(poly, x, 1),
+            _coefficient(poly, y, 1),
+            -_coefficient(poly, x, 0),
+        )
+        for poly in polynomials
+    ]
+    (a1, b1, c1), (a2, b2, c2) = rows
+    steps = [
+        _step("Write the equations", "; ".join(shown for shown, _, _ in parsed)),
+        _step(
+            f"Bring both into the form a{x} + b{y} = c",
+            "; ".join(
+                f"{_format_polynomial({((x, 1),): a, ((y, 1),): b})} = {format_number(c)}"
+                for a, b, c in rows
+            ),
+        ),
+    ]
+
+    determinant = a1 * b2 - a2 * b1
+    steps.append(
+        _step(
+            "Compute the determinant D = a₁b₂ - a₂b₁",
+            f"D = ({format_number(a1)})({format_number(b2)}) - "
+            f"({format_number(a2)})({format_number(b1)}) = {format_number(determinant)}",
+        )
+    )
+    if determinant == 0:
+        # Parallel lines: the same line (infinitely many) or no intersection
+        consistent = a1 * c2 == a2 * c1 and b1 * c2 == b2 * c1
+        steps.append(
+            _step(
+                "D = 0, so the lines are parallel",
+                (
+                    "Both equations describe the same line"
+                    if consistent
+                    else "The lines never meet"
+                ),
+            )
+        )
+        return {
+            "kind": "linear_system",
+            "solutions": [],
+            "approximations": [],
+            "solution_set": "all" if consistent else "none",
+            "steps": steps,
+        }
+
+    value_x = (c1 * b2 - c2 * b1) / determinant
+    value_y = (a1 * c2 - a2 * c1) / determinant
+    steps.append(
+        _step(
+            f"Solve for {x} with Cramer's rule: {x} = (c₁b₂ - c₂b₁) / D",
+            f"{x} = ({format_number(c1 * b2)} - {_parenthesize(c2 * b1)})"
+            f" / {_parenthesize(determinant)} = {format_number(value_x)}",
+        )
+    )
+    steps.append(
+        _step(
+            f"Solve for {y}: {y} = (a₁c₂ - a₂c₁) / D",
+            f"{y} = ({format_number(a1 * c2)} - {_parenthesize(a2 * c1)})"
+            f" / {_parenthesize(determinant)} = {format_number(value_y)}",
+        )
+    )
+    values = {x: value_x, y: value_y}
+    for equation in parsed:
+        steps.append(_check_step(equation, values))
+    return {
+        "kind": "linear_system",
+        "solutions": [{x: format_number(value_x), y: format_number(value_y)}],
+        "approximations": [{x: float(value_x), y: float(value_y)}],
+        "solution_set": "finite",
+        "steps": steps,
+    }
+
+
+def _rational_sqrt(value: Fraction) -> Optional[Fraction]:
+    """Square root of a non-negative fraction if it is rational"""
+    numerator = math.isqrt(value.numerator)
+    denominator = math.isqrt(value.denominator)
+    if numerator * numerator == value.numerator and (
+        denominator * denominator == value.denominator
+    ):
+        return Fraction(numerator, denominator)
+    return None
+
+
+def _simplify_sqrt(value: Fraction) -> Tuple[Fraction, int]:
+    """Write √value as scale·√radicand with a square-free integer radicand"""
+    # √(p/q) = √(pq) / q
+    radicand = value.numerator * value.denominator
+    scale = Fraction(1, value.denominator)
+    factor = 2
+    while factor <= _MAX_SQUARE_FACTOR and factor * factor <= radicand:
+        while radicand % (factor * factor) == 0:
+            radicand //= factor * factor
+            scale *= factor
+        factor += 1
+    return scale, radicand
+
+
+def _evaluate(poly: Polynomial, values: Dict[str, Fraction]) -> Fraction:
+    total = Fraction(0)
+    for mono, coef in poly.items():
+        term = coef
+        for var, power in mono:
+            term *= values[var] ** power
+        total += term
+    return total
+
+
+def _check_step(
+    parsed: Tuple[str, Polynomial, Polynomial], values: Dict[str, Fraction]
+) -> Dict[str, str]:
+    """Substitute the solution back into both sides of an equation"""
+    shown, left, right = parsed
+    substitution = ", ".join(f"{var} = {format_number(v)}" for var, v in values.items())
+    left_value = format_number(_evaluate(left, values))
+    right_value = format_number(_evaluate(right, values))
+    mark = "✓" if left_value == right_value else "✗"
+    return _step(
+        f"Check {substitution} in {shown}",
+        f"left side = {left_value}, right side = {right_value} {mark}",
+    )
+
+
+def _step(description: str, equation: str) -> Dict[str, str]:
+    return {"description": description, "equation": equation}
+
+
+def _format_polynomial(poly: Polynomial) -> str:
+    """Format terms by descending degree, e.g. 2x² - 5x + 6"""
+    terms = sorted(
+        ((mono, coef) for mono, coef in poly.items() if coef),
+        key=lambda item: (-sum(power for _, power in item[0]), item[0]),
+    )
+    if not terms:
+        return "0"
+    return "".join(
+        _format_term(coef, mono, first=index == 0)
+        for index, (mono, coef) in enumerate(terms)
+    )
+
+
+def _format_term(coef: Fraction, mono: Monomial, first: bool) -> str:
+    if first:
+        sign = "-" if coef < 0 else ""
+    else:
+        sign = " - " if coef < 0 else " + "
+    if not mono:
+        return sign + format_number(abs(coef))
+    powers = "".join(
+        var + ("" if power == 1 else "²" if power == 2 else f"^{power}")
+        for var, power in mono
+    )
+    return sign + _format_coefficient(abs(coef)) + powers
+
+
+def _format_coefficient(coef: Fraction) -> str:
+    """Coefficient in front of a symbol: 1 is omitted, fractions are bracketed"""
+    if coef == 1:
+        return ""
+    if coef.denominator != 1:
+        return f"({format_number(coef)})"
+    return format_number(coef)
+
+
+def _complex_value(real: Fraction, imaginary: float) -> Dict[str, float]:
+    """JSON-friendly approximation of a complex root"""
+    return {"real": float(real), "imaginary": imaginary}
+
+
+def _format_root(center: Fraction, term: str, sign: str) -> str:
+    """Format center ± term for one sign, e.g. -1 + 2i or -√2"""
+    if not center:
+        return f"-{term}" if sign == "-" else term
+    return f"{format_number(center)} {sign} {term}"
+
+
+def _parenthesize(value: Fraction) -> str:
+    text = format_number(value)
+    return f"({text})" if value < 0 or value.denominator != 1 else text
@@ -0,0 +1,375 @@
+"""
+Glossary store for the AI tutoring system
+Serves bilingual term definitions and formulas from a memory-mapped data file with exact, prefix and typo-tolerant lookup
+"""
+
+import functools
+import json
+import mmap
+import os
+import re
+import string
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_GLOSSARY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "glossary.jsonl",
+)
+
+# Edit distance allowed for a query of at most this many characters; longer
+# queries allow FUZZY_DISTANCES[-1][1]. Short keys such as "lcm" or "dna"
+# must match exactly, since one edit already lands on unrelated words.
+FUZZY_DISTANCES = ((3, 0), (5, 1), (None, 2))
+
+# Characters at the start of a key covered by the deletion index; longer
+# keys are matched on this prefix and confirmed with a full edit distance
+FUZZY_PREFIX_LENGTH = 7
+
+# Shortest query completed by prefix ("photosyn" → "photosynthesis")
+MIN_PREFIX_LENGTH = 4
+
+SUBJECT_ALIASES = {
+    "mathematics": "math",
+    "maths": "math",
+    "গণিত": "math",
+    "পদার্থবিজ্ঞান": "physics",
+    "রসায়ন": "chemistry",
+    "জীববিজ্ঞান": "biology",
+}
+
+_SUPERSCRIPTS = str.maketrans({"²": "^2", "³": "^3"})
+_DROPPED = re.compile(r"['’.]")
+_OPERATORS = "+\\-*/=^"
+# Word characters as in keyword_matcher, plus the operators kept in keys
+_SEPARATORS = re.compile(rf"[^\w\u0980-\u09FF\u200c\u200d{_OPERATORS}]+")
+_OPERATOR_SPACING = re.compile(rf"\s*([{_OPERATORS}])\s*")
+
+
+def normalize_key(text: str) -> str:
+    """
+    Reduce a term to its lookup key
+
+    Case, apostrophes, dots and punctuation are ignored, but arithmetic
+    operators are kept so "(a+b)²" and "(a-b)²" stay distinct.
+
+    Args:
+        text: Term, Bengali name, alias or user query
+
+    Returns:
+        Normalized key ("Newton's 2nd law" → "newtons 2nd law")
+    """
+    text = unicodedata.normalize("NFC", text).casefold().translate(_SUPERSCRIPTS)
+    text = _SEPARATORS.sub(" ", _DROPPED.sub("", text))
+    return _OPERATOR_SPACING.sub(r"\1", text).strip()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance, giving up once it exceeds limit
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Largest distance of interest
+
+    Returns:
+        Number of insertions, deletions, substitutions and adjacent
+        transpositions turning a into b, or limit + 1 if more are needed
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Shared leading and trailing characters never add to the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start : len(a) - end], b[start : len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = char_a != char_b
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _variants(key: str, distance: int) -> Set[str]:
+    """
+    The indexed prefix of a key and every string obtained by deleting up to
+    distance characters from it
+    """
+    level = {key[:FUZZY_PREFIX_LENGTH]}
+    variants = set(level)
+    for _ in range(distance):
+        level = {word[:i] + word[i + 1 :] for word in level for i in range(len(word))}
+        variants |= level
+    return variants
+
+
+def _max_distance(key: str) -> int:
+    for length, distance in FUZZY_DISTANCES:
+        if length is None or len(key) <= length:
+            return distance
+    return 0
+
+
+class _Trie:
+    """Character trie over lookup keys for prefix completion"""
+
+    _KEY = ""
+
+    def __init__(self):
+        self._root: Dict[str, dict] = {}
+
+    def add(self, key: str) -> None:
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[self._KEY] = key
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """Up to limit keys starting with prefix, shortest first"""
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found: List[str] = []
+        level = [node]
+        while level and len(found) < limit:
+            next_level = []
+            for current in level:
+                for char in sorted(current):
+                    if char == self._KEY:
+                        found.append(current[char])
+                    else:
+                        next_level.append(current[char])
+            level = next_level
+        return found[:limit]
+
+
+class GlossaryStore:
+    """
+    Read-only glossary of terms and formulas backed by a JSON lines file
+
+    The file is memory-mapped and only byte offsets are kept in the index, so
+    records are decoded on demand and processes forked after loading share
+    the mapped pages. Keys cover English names, Bengali names and aliases;
+    each resolves through an exact dictionary, a trie for prefixes and a
+    deletion index (SymSpell) for misspellings.
+    """
+
+    def __init__(self, path: str = DEFAULT_GLOSSARY_PATH):
+        """
+        Map the data file and build the lookup indexes
+
+        Args:
+            path: JSON lines file with one term or formula record per line
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # record id → (start, end) byte span in the mapped file
+        self._spans: List[Tuple[int, int]] = []
+        # record id → (kind, subject, display name)
+        self._headers: List[Tuple[str, str, str]] = []
+        # key → record ids
+        self._keys: Dict[str, List[int]] = {}
+        # key prefix or deletion of it → keys it was derived from
+        self._variants: Dict[str, List[str]] = {}
+        self._trie = _Trie()
+        self._counts = {"lookups": 0, "exact": 0, "prefix": 0, "fuzzy": 0, "misses": 0}
+
+        start = 0
+        size = len(self._data)
+        while start < size:
+            end = self._data.find(b"\n", start)
+            end = size if end == -1 else end
+            if end > start:
+                self._index(json.loads(self._data[start:end]), (start, end))
+            start = end + 1
+
+    def _index(self, record: Dict, span: Tuple[int, int]) -> None:
+        record_id = len(self._spans)
+        self._spans.append(span)
+        self._headers.append((record["kind"], record["subject"], record["name"]))
+        names = [record["name"], record.get("bn", ""), *record.get("aliases", [])]
+        for key in {normalize_key(name) for name in names} - {""}:
+            record_ids = self._keys.setdefault(key, [])
+            record_ids.append(record_id)
+            if len(record_ids) > 1:
+                continue
+            self._trie.add(key)
+            for variant in _variants(key, _max_distance(key)):
+                self._variants.setdefault(variant, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def record(self, record_id: int) -> Dict:
+        """Decode one record from the mapped file"""
+        start, end = self._spans[record_id]
+        return json.loads(self._data[start:end])
+
+    def lookup(
+        self, query: str, kind: Optional[str] = None, subject: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Find the record for a term, tolerating prefixes and misspellings
+
+        Args:
+            query: Term as the student or agent wrote it, in English or Bengali
+            kind: "term" or "formula" to restrict the search
+            subject: Preferred subject when a key is ambiguous
+
+        Returns:
+            Record dictionary with "match" ("exact", "prefix" or "fuzzy") and
+            "key" added, or None when nothing is close enough
+        """
+        self._counts["lookups"] += 1
+        key = normalize_key(query)
+        subject = SUBJECT_ALIASES.get(subject, subject) if subject else None
+
+        record_id = self._best(self._keys.get(key, ()), kind, subject)
+        match = "exact"
+        if record_id is None and len(key) >= MIN_PREFIX_LENGTH:
+            # Complete only when every completion names the same record
+            completions = {}
+            for completion in self._trie.complete(key, 8):
+                best = self._best(self._keys[completion], kind, subject)
+                if best is not None:
+                    completions.setdefault(best, completion)
+            if len(completions) == 1:
+                ((record_id, key),) = completions.items()
+                match = "prefix"
+        if record_id is None:
+            for candidate in self._fuzzy_keys(key):
+                record_id = self._best(self._keys[candidate], kind, subject)
+                if record_id is not None:
+                    key, match = candidate, "fuzzy"
+                    break
+
+        if record_id is None:
+            self._counts["misses"] += 1
+            return None
+        self._counts[match] += 1
+        record = self.record(record_id)
+        record.update(match=match, key=key)
+        return record
+
+    def suggest(
+        self, query: str, kind: Optional[str] = None, limit: int = 3
+    ) -> List[str]:
+        """
+        Names of records that complete the query or its leading words
+
+        Args:
+            query: Term that was not found
+            kind: "term" or "formula" to restrict the suggestions
+            limit: Maximum number of names
+
+        Returns:
+            Display names, closest completions first
+        """
+        words = normalize_key(query).split()
+        names: List[str] = []
+        while words and not names:
+            for key in self._trie.complete(" ".join(words), limit * 3):
+                for record_id in self._keys[key]:
+                    record_kind, _, name = self._headers[record_id]
+                    if (kind is None or record_kind == kind) and name not in names:
+                        names.append(name)
+            words.pop()
+        return names[:limit]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Lookup counters since the store was loaded
+
+        Returns:
+            Dictionary with lookups, exact, prefix, fuzzy and misses counts,
+            hit_rate, and the number of records and keys
+        """
+        lookups = self._counts["lookups"]
+        hits = lookups - self._counts["misses"]
+        return {
+            **self._counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "records": len(self._spans),
+            "keys": len(self._keys),
+        }
+
+    def close(self) -> None:
+        self._data.close()
+
+    def _best(
+        self, record_ids: List[int], kind: Optional[str], subject: Optional[str]
+    ) -> Optional[int]:
+        best = None
+        for record_id in record_ids:
+            record_kind, record_subject, _ = self._headers[record_id]
+            if kind is not None and record_kind != kind:
+                continue
+            if record_subject == subject:
+                return record_id
+            if best is None:
+                best = record_id
+        return best
+
+    def _fuzzy_keys(self, key: str) -> List[str]:
+        """Keys within the allowed edit distance, closest first"""
+        distance = _max_distance(key)
+        if not distance:
+            return []
+        candidates: Set[str] = set()
+        for variant in _variants(key, distance):
+            candidates.update(self._variants.get(variant, ()))
+
+        scored = []
+        for candidate in candidates:
+            score = edit_distance(key, candidate, distance)
+            if score <= distance:
+                scored.append((score, len(candidate), candidate))
+        return [candidate for _, _, candidate in sorted(scored)]
+
+
+@functools.lru_cache(maxsize=None)
+def get_glossary(path: str = DEFAULT_GLOSSARY_PATH) -> GlossaryStore:
+    """
+    Shared glossary store, loaded on first use
+
+    Call this before forking workers so they share the index and mapping.
+
+    Args:
+        path: JSON lines data file
+
+    Returns:
+        GlossaryStore for the file
+    """
+    return GlossaryStore(path)
+
+
+def display_name(record: Dict) -> str:
+    """Heading for a record: "Photosynthesis (সালোকসংশ্লেষণ)" """
+    name = record["name"]
+    if record["kind"] == "formula":
+        name = string.capwords(name)
+    else:
+        name = name[:1].upper() + name[1:]
+    return f"{name} ({record['bn']})" if record.get("bn") else name
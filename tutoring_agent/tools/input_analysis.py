@@ -0,0 +1,164 @@
+"""
+Local input analysis for the AI tutoring system
+Builds the input_analysis state for a question without an LLM call
+"""
+
+import re
+from typing import Any, Dict, List
+
+from .concept_features import detect_concepts
+from .text_processing import (
+    _TextFeatures,
+    _assess_grade_level,
+    _classify_subject,
+    _detect_language,
+    _validate_question_completeness,
+    generate_clarifying_questions,
+)
+
+# Confidence at or above which the local analysis replaces the LLM analyzer
+LOCAL_INPUT_ANALYSIS_THRESHOLD = 0.8
+
+# Sub-field names used by the input_analysis schema
+_PHYSICS_CONTENT_TYPES = {"electromagnetism": "electromagnetics"}
+
+# ASCII or Bengali digit
+_DIGIT = re.compile(r"[0-9০-৯]")
+
+# Confidence of an analysis that found numbers but no expression in them; the
+# lexer may have missed a calculation, so the LLM analyzer checks
+_UNPARSED_NUMBERS_CONFIDENCE = 0.7
+
+
+def analyze_input(text: str) -> Dict[str, Any]:
+    """
+    Produce the input_analysis schema for a question locally
+
+    Language, clarification needs and mathematical content come from the
+    text_processing tools. Mixed Bengali/English text is reported as
+    bengali, following the analyzer's language rules. Expressions are kept
+    exactly as written; only whitespace is collapsed.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Dictionary with every input_analysis field, including confidence_score
+    """
+    features = _TextFeatures(text)
+    language = _detect_language(features)
+    subject = _classify_subject(features)
+    completeness = _validate_question_completeness(features)
+    expressions = features.math_expressions
+    concepts = detect_concepts(features)
+
+    needs_clarification = not completeness["is_complete"]
+    clarification_questions = []
+    if needs_clarification:
+        clarification_questions = generate_clarifying_questions(
+            {
+                "language": "bengali" if language == "mixed" else language,
+                "subject": subject["subject"],
+                "issues": completeness["issues"],
+            }
+        )
+
+    parametric = concepts["parametric_components"]
+    requires_calculus = concepts["requires_calculus"]
+    requires_vector_analysis = concepts["requires_vector_analysis"]
+
+    # Content types are only assigned to questions with physics keywords or
+    # parametric motion, which is physics whatever words describe it
+    physics_type = "none"
+    if subject["all_scores"]["physics"]["score"] or concepts["parametric_motion"]:
+        subfield = concepts["physics_subfield"]
+        physics_type = _PHYSICS_CONTENT_TYPES.get(subfield, subfield)
+
+    math_keywords = subject["all_scores"]["math"]["matched_keywords"]
+    has_digits = bool(_DIGIT.search(text))
+    # Numbers given with physics or chemistry quantities are a calculation,
+    # as in "১০ কেজি ভরের বস্তুতে ২০ নিউটন বল প্রয়োগ করলে ত্বরণ কত?"
+    quantities = has_digits and bool(
+        subject["all_scores"]["physics"]["matched_keywords"]
+        or subject["all_scores"]["chemistry"]["matched_keywords"]
+    )
+    math_detected = bool(
+        expressions or math_keywords or requires_calculus or quantities
+    )
+
+    if not math_detected:
+        complexity = "none"
+    elif parametric >= 2:
+        complexity = "university_level"
+    elif requires_calculus or requires_vector_analysis:
+        complexity = "advanced"
+    else:
+        grade = _assess_grade_level(features, "math" if math_keywords else "physics")
+        has_powers = any(
+            expr["type"] == "power" or "^" in expr["expression"] for expr in expressions
+        )
+        if has_powers or grade["grade_level"] == "11-12":
+            complexity = "intermediate"
+        else:
+            complexity = "basic"
+
+    is_valid_question = bool(
+        expressions
+        or subject["subject"] != "general"
+        or requires_calculus
+        or text.strip().endswith(("?", "।"))
+    )
+
+    # Weak signals are left to the LLM analyzer
+    confidence = 0.95
+    if not (expressions or subject["subject"] != "general"):
+        confidence = 0.6
+    elif language == "mixed" and not expressions:
+        confidence = 0.8
+    if needs_clarification and not clarification_questions:
+        confidence = min(confidence, 0.6)
+    if has_digits and not expressions:
+        confidence = min(confidence, _UNPARSED_NUMBERS_CONFIDENCE)
+
+    return {
+        "detected_language": "english" if language == "english" else "bengali",
+        "Problem_text": " ".join(text.split()),
+        "is_valid_question": is_valid_question,
+        "needs_clarification": needs_clarification,
+        "clarification_questions": clarification_questions,
+        "processing_notes": _processing_notes(subject, expressions, completeness),
+        "confidence_score": confidence,
+        "language_notes": _language_notes(language),
+        "mathematical_content_detected": math_detected,
+        "mathematical_complexity": complexity,
+        "requires_calculus": requires_calculus,
+        "requires_vector_analysis": requires_vector_analysis,
+        "physics_content_type": physics_type,
+        "preserved_expressions": [expr["expression"] for expr in expressions],
+    }
+
+
+def _processing_notes(
+    subject: Dict[str, Any],
+    expressions: List[Dict[str, Any]],
+    completeness: Dict[str, Any],
+) -> str:
+    """Summarize what the local analysis found"""
+    notes = [f"Subject: {subject['subject']}"]
+    if subject["matched_keywords"]:
+        notes.append(f"keywords: {', '.join(subject['matched_keywords'])}")
+    if expressions:
+        kinds = sorted({expr["type"] for expr in expressions})
+        notes.append(f"{len(expressions)} expression(s): {', '.join(kinds)}")
+    if completeness["issues"]:
+        notes.append(f"issues: {', '.join(completeness['issues'])}")
+    return "; ".join(notes)
+
+
+def _language_notes(language: str) -> str:
+    """Explain the language decision"""
+    if language == "bengali":
+        return "Mostly Bengali script"
+    if language == "mixed":
+        return "Mixed Bengali and Latin script; reported as bengali"
+    return "Latin script without Bengali characters"
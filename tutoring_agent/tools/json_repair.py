@@ -0,0 +1,212 @@
+"""
+Tolerant JSON parsing for the AI tutoring system
+Reads the JSON objects LLMs return despite the usual defects, so a malformed reply is repaired locally instead of costing a retry call
+"""
+
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_FENCE = re.compile(r"```[A-Za-z]*\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_QUOTES = {'"': '"', "'": "'", "“": "”"}
+
+
+def _candidates(text: str) -> List[Tuple[str, int]]:
+    """(text, start) pairs to try: fenced blocks first, objects before arrays"""
+    candidates = []
+    for block in [match.group(1) for match in _FENCE.finditer(text)] + [text]:
+        for bracket in "{[":
+            start = block.find(bracket)
+            if start >= 0:
+                candidates.append((block, start))
+    return candidates
+
+
+def _repair(text: str, start: int) -> Tuple[str, Optional[str]]:
+    """
+    Rewrite the JSON value starting at text[start] as strict JSON
+
+    Skips prose before the value and after it, drops comments and trailing
+    commas, quotes bare keys, converts single-quoted and curly-quoted
+    strings and Python literals, escapes raw newlines in strings, inserts
+    commas missing between items on separate lines, and closes a value that
+    was cut off.
+
+    Returns:
+        Tuple of (repaired text, repaired text cut back to the last complete
+        item, for values cut off inside an item; None when not cut off)
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # out length and open brackets after each item separator
+    checkpoint: Optional[Tuple[int, List[str]]] = None
+    quote = ""  # closing quote of the string being read, if any
+    last = ""  # last significant character written outside strings
+    newline = False  # a line break since last
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if quote == "'" and text.startswith("\\'", i):
+                out.append("'")
+                i += 2
+                continue
+            if ch == "\\" and i + 1 < len(text):
+                out.append(text[i : i + 2])
+                i += 2
+                continue
+            if ch == quote or (quote == "”" and ch == '"'):
+                out.append('"')
+                quote, last, newline = "", '"', False
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch.isspace():
+            newline = newline or ch == "\n"
+            i += 1
+            continue
+        if text.startswith("//", i):
+            end = text.find("\n", i)
+            i = len(text) if end < 0 else end
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = len(text) if end < 0 else end + 2
+            continue
+
+        # A new item right after a complete one on the next line: a comma
+        # the model left out
+        starts_item = ch in _QUOTES or ch in "{[-" or ch.isalnum()
+        if stack and newline and starts_item and (last in '"}]' or last.isalnum()):
+            out.append(",")
+            checkpoint = (len(out) - 1, list(stack))
+            last = ","
+        newline = False
+
+        if ch in _QUOTES:
+            quote = _QUOTES[ch]
+            out.append('"')
+            i += 1
+            continue
+        if ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+            last = ch
+        elif ch in "}]":
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack:
+                break
+            out.append(stack.pop())
+            last = out[-1]
+            if not stack:
+                break
+        elif ch == ",":
+            if last not in ",{[":
+                out.append(",")
+                checkpoint = (len(out) - 1, list(stack))
+                last = ","
+        elif ch.isdigit() or (ch == "-" and _NUMBER.match(text, i)):
+            number = _NUMBER.match(text, i).group()
+            i += len(number)
+            out.append(number)
+            last = number[-1]
+            continue
+        elif ch.isascii() and (ch.isalpha() or ch == "_"):
+            word = _WORD.match(text, i).group()
+            i += len(word)
+            if word in _PYTHON_LITERALS:
+                word = _PYTHON_LITERALS[word]
+            elif word not in ("true", "false", "null"):
+                # A bare key, or a bare string value
+                word = json.dumps(word)
+            out.append(word)
+            last = word[-1]
+            continue
+        else:
+            out.append(ch)
+            last = ch
+        i += 1
+
+    truncated = bool(quote or stack)
+    if quote:
+        out.append('"')
+    if out and out[-1] in ",:":
+        out.pop()
+    repaired = "".join(out) + "".join(reversed(stack))
+    if not truncated or checkpoint is None:
+        return repaired, None
+    length, open_brackets = checkpoint
+    return repaired, "".join(out[:length]) + "".join(reversed(open_brackets))
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, RecursionError):
+        pass
+    # A Python dict repr, e.g. state rendered with str()
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Parse JSON an LLM wrote, repairing common defects
+
+    Handles markdown code fences, prose around the value, trailing commas,
+    comments, single quotes, bare keys, Python literals and dict reprs, raw
+    newlines inside strings, missing commas between lines, and replies cut
+    off before the value was closed.
+
+    Args:
+        text: Model reply
+
+    Returns:
+        Parsed value, or None if no JSON value can be recovered
+    """
+    text = text.strip()
+    if not text:
+        return None
+    value = _loads(text)
+    if value is not None:
+        return value
+    for candidate, start in _candidates(text):
+        repaired, cut = _repair(candidate, start)
+        for attempt in (repaired, cut):
+            if attempt:
+                value = _loads(attempt)
+                if value is not None:
+                    return value
+    return None
+
+
+def parse_json_object(text: Any) -> Optional[Dict[str, Any]]:
+    """
+    Read a JSON object from model text or session state
+
+    Args:
+        text: Dictionary, or text holding a JSON object
+
+    Returns:
+        Dictionary, or None if no object can be recovered
+    """
+    if isinstance(text, dict):
+        return text
+    if not isinstance(text, str):
+        return None
+    value = repair_json(text)
+    return value if isinstance(value, dict) else None
@@ -0,0 +1,172 @@
+"""
+Keyword matching tools for the AI tutoring system
+Finds bilingual keyword and phrase matches in a single pass over the words of a text
+"""
+
+import re
+from typing import Dict, Hashable, Iterable, List, Pattern, Set, Tuple
+
+# Word characters for English and Bengali. Python's \w does not cover Bengali
+# vowel signs and virama, so the whole Bengali block is listed explicitly.
+_WORD_CHARS = r"\w\u0980-\u09FF\u200c\u200d"
+WORD_PATTERN = re.compile(rf"[{_WORD_CHARS}]+")
+
+# Inflectional endings allowed on the last word of a keyword match
+# ("forces" → "force", "গতির" → "গতি")
+INFLECTION_SUFFIXES = (
+    # English plurals
+    "es",
+    "s",
+    # Bengali case endings and plural markers
+    "গুলো",
+    "গুলি",
+    "সমূহ",
+    "দের",
+    "য়ের",
+    "এর",
+    "ের",
+    "র",
+    "কে",
+    "তে",
+    "টি",
+    "টা",
+)
+
+# Shortest stem left after removing a suffix; shorter keywords list their
+# inflected forms, as "বলতে" (to say) is not "বল" (force) plus "তে"
+_MIN_STEM_LENGTH = 3
+
+
+class KeywordMatcher:
+    """
+    Word-boundary aware matcher for groups of single-word and multi-word keywords
+
+    The keyword tables are indexed once at construction. Matching tokenizes the
+    text with one regex pass and resolves the distinct words with set and
+    dictionary lookups, so the cost is linear in the length of the text and
+    independent of the number of keywords.
+    """
+
+    def __init__(
+        self,
+        groups: Dict[Hashable, Iterable[str]],
+        suffixes: Iterable[str] = INFLECTION_SUFFIXES,
+    ):
+        """
+        Build the keyword index
+
+        Args:
+            groups: Mapping of group key to keywords (lowercase). A keyword may
+                appear in several groups.
+            suffixes: Inflectional endings allowed on the last word of a
+                match; empty for exact whole-word matching
+        """
+        suffixes = tuple(suffixes)
+        suffix_pattern = "|".join(map(re.escape, suffixes))
+        # keyword → [(group, position in group)]
+        self._owners: Dict[str, List[Tuple[Hashable, int]]] = {}
+        # single word → keyword
+        self._words: Dict[str, str] = {}
+        # first word → [(phrase pattern, keyword)]
+        self._phrases: Dict[str, List[Tuple[Pattern[str], str]]] = {}
+        # last character → suffixes ending with it
+        self._suffixes: Dict[str, List[str]] = {}
+
+        for group, keywords in groups.items():
+            for position, keyword in enumerate(keywords):
+                owners = self._owners.setdefault(keyword, [])
+                owners.append((group, position))
+                if len(owners) > 1:
+                    continue
+
+                words = WORD_PATTERN.findall(keyword)
+                if len(words) == 1:
+                    self._words[words[0]] = keyword
+                else:
+                    # Phrase words may only be separated by whitespace
+                    pattern = re.compile(
+                        rf"(?<![{_WORD_CHARS}])"
+                        + r"\s+".join(map(re.escape, words))
+                        + (rf"(?:{suffix_pattern})?" if suffixes else "")
+                        + rf"(?![{_WORD_CHARS}])"
+                    )
+                    self._phrases.setdefault(words[0], []).append((pattern, keyword))
+
+        for suffix in suffixes:
+            self._suffixes.setdefault(suffix[-1], []).append(suffix)
+
+    def lookup(self, word: str) -> List[str]:
+        """
+        Find the single-word keywords matched by one word
+
+        Args:
+            word: Lowercased word produced by WORD_PATTERN
+
+        Returns:
+            Keywords equal to the word or to its stem after a known suffix
+        """
+        keywords = []
+        keyword = self._words.get(word)
+        if keyword is not None:
+            keywords.append(keyword)
+
+        for suffix in self._suffixes.get(word[-1], ()):
+            if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM_LENGTH:
+                keyword = self._words.get(word[: -len(suffix)])
+                if keyword is not None:
+                    keywords.append(keyword)
+        return keywords
+
+    def phrases(self, word: str) -> List[Tuple[Pattern[str], str]]:
+        """
+        Get the multi-word keywords starting with a word
+
+        Args:
+            word: Lowercased word produced by WORD_PATTERN
+
+        Returns:
+            List of (compiled phrase pattern, keyword) pairs
+        """
+        return self._phrases.get(word, [])
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find all keywords present in the text
+
+        Args:
+            text: Lowercased input text
+
+        Returns:
+            Set of matched keywords
+        """
+        found = set()
+        for word in set(WORD_PATTERN.findall(text)):
+            found.update(self.lookup(word))
+
+            # Phrases are only searched for when their first word occurs
+            for pattern, keyword in self._phrases.get(word, ()):
+                if pattern.search(text):
+                    found.add(keyword)
+
+        return found
+
+    def match(self, text: str) -> Dict[Hashable, List[str]]:
+        """
+        Find the matched keywords of every group
+
+        Args:
+            text: Lowercased input text
+
+        Returns:
+            Mapping of group key to matched keywords, in the order the keywords
+            were declared. Groups without matches are omitted.
+        """
+        hits: Dict[Hashable, List[Tuple[int, str]]] = {}
+        for keyword in self.find(text):
+            for group, position in self._owners[keyword]:
+                hits.setdefault(group, []).append((position, keyword))
+
+        return {
+            group: [keyword for _, keyword in sorted(matches)]
+            for group, matches in hits.items()
+        }
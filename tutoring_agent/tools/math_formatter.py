@@ -0,0 +1,424 @@
+"""
+Deterministic formatting of mathematical and scientific notation
+Rewrites exponents, subscripts, chemical formulas, scientific notation, Greek letters and operators as Unicode or LaTeX, in whole texts or token streams
+"""
+
+import re
+from typing import Iterable, Iterator, Literal, Match, Optional, Tuple
+
+FormatMode = Literal["unicode", "latex"]
+
+_SUPERSCRIPT = str.maketrans("0123456789+-=()niaxyk", "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿⁱᵃˣʸᵏ")
+_SUPERSCRIPT_CHARS = set("0123456789+-=()niaxyk")
+_SUBSCRIPT = str.maketrans("0123456789+-=()aeoxijn", "₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐₑₒₓᵢⱼₙ")
+_SUBSCRIPT_CHARS = set("0123456789+-=()aeoxijn")
+
+_GREEK = {
+    "alpha": ("α", r"\alpha"),
+    "beta": ("β", r"\beta"),
+    "gamma": ("γ", r"\gamma"),
+    "delta": ("δ", r"\delta"),
+    "epsilon": ("ε", r"\epsilon"),
+    "theta": ("θ", r"\theta"),
+    "lambda": ("λ", r"\lambda"),
+    "mu": ("μ", r"\mu"),
+    "pi": ("π", r"\pi"),
+    "rho": ("ρ", r"\rho"),
+    "sigma": ("σ", r"\sigma"),
+    "tau": ("τ", r"\tau"),
+    "phi": ("φ", r"\phi"),
+    "omega": ("ω", r"\omega"),
+    "Delta": ("Δ", r"\Delta"),
+    "Sigma": ("Σ", r"\Sigma"),
+    "Omega": ("Ω", r"\Omega"),
+}
+_GREEK_WORD = re.compile(r"\b(" + "|".join(_GREEK) + r")\b")
+_GREEK_LATEX = {symbol: latex for symbol, latex in _GREEK.values()}
+
+_ELEMENTS = set(
+    "H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni "
+    "Cu Zn Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I "
+    "Xe Cs Ba La Ce Nd Sm Eu Gd Pt Au Hg Tl Pb Bi Po At Rn Fr Ra U Pu".split()
+)
+_CHEMICAL = re.compile(r"(\d*)((?:[A-Z][a-z]?\d*|\((?:[A-Z][a-z]?\d*)+\)\d*)+)")
+_ELEMENT_COUNT = re.compile(r"([A-Z][a-z]?)(\d*)|([()])(\d*)")
+# Formulas of a single element; other tokens such as "B12" or "U2" are names
+_ELEMENT_MOLECULES = {"H2", "N2", "O2", "O3", "F2", "Cl2", "Br2", "I2", "P4", "S8"}
+
+# "3*10^8", "6.022 x 10^23", "1.6 × 10^(-19)" and "1.6e-19"
+_SCIENTIFIC = re.compile(
+    r"(?<![\w.])(\d+(?:\.\d+)?)\s*[*x×]\s*10\^(?:\(([+-]?\d+)\)|\{([+-]?\d+)\}|"
+    r"([+-]?\d+))"
+)
+_E_NOTATION = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)[eE]([+-]?\d+)(?![\w.])")
+_SPACED_SCIENTIFIC = re.compile(r"(\d)\s+([*x×])\s+(10\^)")
+
+_SQRT = re.compile(r"sqrt\(([^()]*)\)")
+_FUNCTIONS = ("sin", "cos", "tan", "log", "ln")
+_FUNCTION_OF_SYMBOL = re.compile(r"\b(" + "|".join(_FUNCTIONS) + r")\((\w|[α-ωΔΣΩ])\)")
+_FUNCTION_NAME = re.compile(r"(?<!\\)\b(" + "|".join(_FUNCTIONS) + r")\b")
+_POWER = re.compile(r"\^(?:\{([^{}]*)\}|\(([^()]*)\)|([+-]?\d+|[A-Za-z](?![A-Za-z])))")
+_INDEX = re.compile(r"_(?:\{([^{}]*)\}|(\d+|[A-Za-z])(?![A-Za-z]))")
+_FRACTION = re.compile(r"(?<![\d./])(\d+)/(\d+)(?![\d./])")
+_VULGAR_FRACTIONS = {
+    "1/2": "½",
+    "1/3": "⅓",
+    "2/3": "⅔",
+    "1/4": "¼",
+    "3/4": "¾",
+}
+
+# (ASCII, Unicode, LaTeX), longest ASCII first
+_OPERATORS = [
+    ("+/-", "±", r"\pm"),
+    (">=", "≥", r"\geq"),
+    ("<=", "≤", r"\leq"),
+    ("!=", "≠", r"\neq"),
+    ("+-", "±", r"\pm"),
+    ("->", "→", r"\to"),
+]
+_OPERATOR = re.compile("|".join(re.escape(ascii) for ascii, _, _ in _OPERATORS))
+_OPERATOR_FORMS = {ascii: (unicode, latex) for ascii, unicode, latex in _OPERATORS}
+_UNICODE_LATEX = {
+    "±": r"\pm",
+    "≥": r"\geq",
+    "≤": r"\leq",
+    "≠": r"\neq",
+    "→": r"\to",
+    "×": r"\times",
+    "⋅": r"\cdot",
+    "∞": r"\infty",
+}
+
+_LATEX_SYMBOLS = {**_UNICODE_LATEX, **_GREEK_LATEX}
+_LATEX_SYMBOL = re.compile("[" + "".join(_LATEX_SYMBOLS) + "]")
+
+_OPERAND_END = r"[\w\u2070-\u209c²³¹)\]}α-ωΔΣΩ]"
+_OPERAND_START = r"[\w(\[√α-ωΔΣΩ\\]"
+_SPACED_OPERATOR = re.compile(
+    rf"(?<={_OPERAND_END})\s*([=+<>≤≥≠±]|(?<={_OPERAND_END})-)\s*"
+    rf"(?=-?{_OPERAND_START})"
+)
+_PRODUCT = re.compile(rf"(?<={_OPERAND_END})\*(?=[\w(])")
+
+# Characters that make a token worth rewriting as mathematics
+_MATH_SIGNAL = re.compile(
+    r"[\^_=+*<>±]|\d/\d|sqrt\(|->|!=|\b\d+(?:\.\d+)?[eE][+-]?\d+\b"
+)
+_PROTECTED = re.compile(r"`[^`\n]*`|\$[^$\n]+\$")
+_TOKEN = re.compile(r"\S+")
+_LEADING = re.compile(r"^[(\[\"'*_]*")
+_TRAILING = re.compile(r"[)\]\"'*_.,;:?!।]*$")
+
+# Longest line held back while streaming before cutting at a word boundary
+STREAM_HOLD_CHARS = 240
+
+
+def format_mathematical_expression(expr: str, mode: FormatMode = "latex") -> str:
+    """
+    Format a mathematical expression for display
+
+    Args:
+        expr: Mathematical expression, e.g. "x^2+2x+1=0" or "3*10^8"
+        mode: "latex" for LaTeX markup without math delimiters, or "unicode"
+            for plain text with superscripts, subscripts and symbols
+
+    Returns:
+        Formatted expression
+    """
+    expr = _SPACED_SCIENTIFIC.sub(r"\1\2\3", expr)
+    if _is_chemical(expr):
+        return _format_chemical(expr, mode)
+    return _format_math(expr, mode)
+
+
+def format_math(text: str, mode: FormatMode = "unicode") -> str:
+    """
+    Format the notation in a Markdown response without changing its wording
+
+    Only tokens that contain mathematics, a chemical formula or a Greek letter
+    name are rewritten; code blocks, inline code and existing $...$ spans are
+    left alone. In "latex" mode every rewritten token is wrapped in $...$.
+
+    Args:
+        text: Response text
+        mode: "unicode" or "latex"
+
+    Returns:
+        Formatted text
+    """
+    formatted, _ = _format_lines(text, mode, in_fence=False)
+    return formatted
+
+
+class MathStreamFormatter:
+    """
+    Incremental format_math for text arriving as a token stream
+
+    feed returns the formatted text that can already be shown and holds back
+    the rest of the current line; flush returns what is left. Joining every
+    returned piece gives format_math of the joined chunks, because no rule
+    spans a line break and long lines are only cut after a word that cannot
+    be part of an expression.
+
+    Args:
+        mode: "unicode" or "latex"
+    """
+
+    def __init__(self, mode: FormatMode = "unicode"):
+        self.mode = mode
+        self._buffer = ""
+        self._in_fence = False
+
+    @property
+    def pending(self) -> int:
+        """Number of received characters not yet emitted"""
+        return len(self._buffer)
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the formatted text ready to emit"""
+        self._buffer += chunk
+        cut = self._buffer.rfind("\n") + 1
+        if len(self._buffer) - cut > STREAM_HOLD_CHARS and not self._in_fence:
+            cut = max(cut, _safe_cut(self._buffer, cut))
+        if cut <= 0:
+            return ""
+        ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        formatted, self._in_fence = _format_lines(ready, self.mode, self._in_fence)
+        return formatted
+
+    def flush(self) -> str:
+        """Format and return everything still held back"""
+        formatted, self._in_fence = _format_lines(
+            self._buffer, self.mode, self._in_fence
+        )
+        self._buffer = ""
+        return formatted
+
+
+def format_math_stream(
+    chunks: Iterable[str], mode: FormatMode = "unicode"
+) -> Iterator[str]:
+    """
+    Format a stream of text chunks, e.g. a model's streamed reply
+
+    Args:
+        chunks: Text chunks in order
+        mode: "unicode" or "latex"
+
+    Returns:
+        Iterator over formatted pieces; joined, they equal format_math of the
+        joined chunks
+    """
+    formatter = MathStreamFormatter(mode)
+    for chunk in chunks:
+        piece = formatter.feed(chunk)
+        if piece:
+            yield piece
+    rest = formatter.flush()
+    if rest:
+        yield rest
+
+
+def _safe_cut(buffer: str, line_start: int) -> int:
+    """
+    Position after the last whitespace of the current line that follows a
+    plain word, with an even number of backticks and dollars before it
+
+    Returns:
+        Cut position, or line_start when there is none
+    """
+    line = buffer[line_start:]
+    for match in reversed(list(re.finditer(r"(?<=[^\W\d_])\s+(?=\S)", line))):
+        word = line[: match.start()].rsplit(None, 1)[-1]
+        head = line[: match.end()]
+        if (
+            len(word) > 1
+            and word.isalpha()
+            and head.count("`") % 2 == 0
+            and not line.startswith("`", match.end())
+            and head.count("$") % 2 == 0
+        ):
+            return line_start + match.end()
+    return line_start
+
+
+def _format_lines(text: str, mode: FormatMode, in_fence: bool) -> Tuple[str, bool]:
+    """Format text line by line, skipping fenced code; returns the fence state"""
+    lines = []
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            lines.append(line)
+        elif in_fence:
+            lines.append(line)
+        else:
+            lines.append(_format_line(line, mode))
+    return "".join(lines), in_fence
+
+
+def _format_line(line: str, mode: FormatMode) -> str:
+    """Format one line outside code, leaving inline code and $...$ alone"""
+    pieces = []
+    position = 0
+    for match in _PROTECTED.finditer(line):
+        pieces.append(_format_prose(line[position : match.start()], mode))
+        pieces.append(match.group())
+        position = match.end()
+    pieces.append(_format_prose(line[position:], mode))
+    return "".join(pieces)
+
+
+def _format_prose(text: str, mode: FormatMode) -> str:
+    text = _SPACED_SCIENTIFIC.sub(r"\1\2\3", text)
+    return _TOKEN.sub(lambda match: _format_token(match.group(), mode), text)
+
+
+def _format_token(token: str, mode: FormatMode) -> str:
+    """Rewrite the core of a whitespace-delimited token, keeping punctuation"""
+    lead = _LEADING.match(token).group()
+    trail = _TRAILING.search(token[len(lead) :]).group()
+    core = token[len(lead) : len(token) - len(trail)]
+    # Give closing brackets back to the core when it opened them
+    while (
+        trail
+        and trail[0] in ")]"
+        and core.count("(" if trail[0] == ")" else "[") > core.count(trail[0])
+    ):
+        core, trail = core + trail[0], trail[1:]
+    if not core or "://" in core:
+        return token
+
+    if _is_chemical(core):
+        formatted = _format_chemical(core, mode)
+    elif _MATH_SIGNAL.search(core) or _GREEK_WORD.search(core):
+        formatted = _format_math(core, mode)
+    else:
+        return token
+    if formatted == core:
+        return token
+    if mode == "latex":
+        formatted = f"${formatted}$"
+    return f"{lead}{formatted}{trail}"
+
+
+def _is_chemical(text: str) -> bool:
+    """
+    True for formulas such as H2O, 2H2SO4 or Ca(OH)2 built from elements
+
+    Names that look like formulas are not: a count of 1 is never written
+    ("H1N1"), and a single element needs to form a known molecule ("O2", but
+    not "B12" or "U2").
+    """
+    match = _CHEMICAL.fullmatch(text)
+    if not match or not any(char.isdigit() for char in match.group(2)):
+        return False
+    parts = _ELEMENT_COUNT.findall(match.group(2))
+    symbols = {symbol for symbol, _, _, _ in parts if symbol}
+    if not symbols <= _ELEMENTS:
+        return False
+    if any("1" in (count, group_count) for _, count, _, group_count in parts):
+        return False
+    return len(symbols) > 1 or match.group(2) in _ELEMENT_MOLECULES
+
+
+def _format_chemical(text: str, mode: FormatMode) -> str:
+    coefficient, formula = _CHEMICAL.fullmatch(text).groups()
+    if mode == "latex":
+        formula = re.sub(r"(?<=[A-Za-z)])(\d+)", r"_{\1}", formula)
+        return rf"{coefficient}\mathrm{{{formula}}}"
+    return coefficient + re.sub(
+        r"(?<=[A-Za-z)])(\d+)",
+        lambda match: match.group(1).translate(_SUBSCRIPT),
+        formula,
+    )
+
+
+def _format_math(text: str, mode: FormatMode) -> str:
+    """Apply the notation rules to a mathematical string"""
+    latex = mode == "latex"
+    text = _SCIENTIFIC.sub(lambda match: _scientific(match, latex), text)
+    text = _E_NOTATION.sub(lambda match: _scientific(match, latex), text)
+    text = _GREEK_WORD.sub(lambda match: _GREEK[match.group(1)][latex], text)
+    text = _OPERATOR.sub(lambda match: _OPERATOR_FORMS[match.group()][latex], text)
+    text = _SQRT.sub(lambda match: _root(match.group(1), latex), text)
+    text = _POWER.sub(lambda match: _power(match, latex), text)
+    text = _INDEX.sub(lambda match: _index(match, latex), text)
+    if latex:
+        text = _FRACTION.sub(r"\\frac{\1}{\2}", text)
+        text = _PRODUCT.sub(
+            lambda match: (
+                r" \times "
+                if text[match.start() - 1].isdigit() and text[match.end()].isdigit()
+                else r" \cdot "
+            ),
+            text,
+        )
+        text = _FUNCTION_NAME.sub(r"\\\1", text)
+        text = _LATEX_SYMBOL.sub(_latex_symbol, text)
+    else:
+        text = _FUNCTION_OF_SYMBOL.sub(r"\1 \2", text)
+        text = _FRACTION.sub(
+            lambda match: _VULGAR_FRACTIONS.get(match.group(), match.group()), text
+        )
+        text = _PRODUCT.sub(
+            lambda match: (
+                " × "
+                if text[match.start() - 1].isdigit() and text[match.end()].isdigit()
+                else "⋅"
+            ),
+            text,
+        )
+    return _SPACED_OPERATOR.sub(lambda match: f" {match.group(1)} ", text)
+
+
+def _scientific(match: Match[str], latex: bool) -> str:
+    mantissa = match.group(1)
+    exponent = next(group for group in match.groups()[1:] if group is not None)
+    exponent = exponent.lstrip("+")
+    if "." not in mantissa:
+        mantissa += ".0"
+    if latex:
+        return rf"{mantissa} \times 10^{{{exponent}}}"
+    return f"{mantissa} × 10{exponent.translate(_SUPERSCRIPT)}"
+
+
+def _latex_symbol(match: Match[str]) -> str:
+    """LaTeX command for a symbol, spaced from a letter that follows it"""
+    command = _LATEX_SYMBOLS[match.group()]
+    following = match.string[match.end() : match.end() + 1]
+    return command + " " if following.isalpha() else command
+
+
+def _root(radicand: str, latex: bool) -> str:
+    if latex:
+        return rf"\sqrt{{{radicand}}}"
+    if re.fullmatch(r"\w+", radicand):
+        return f"√{radicand}"
+    return f"√({radicand})"
+
+
+def _power(match: Match[str], latex: bool) -> str:
+    braced, parenthesized, bare = match.groups()
+    exponent = braced if braced is not None else parenthesized
+    if exponent is None:
+        exponent = bare
+    if latex:
+        return f"^{{{exponent}}}"
+    if parenthesized is not None and not re.fullmatch(r"[+-]?\d+|\w", exponent):
+        exponent = f"({parenthesized})"
+    return _script(exponent, _SUPERSCRIPT_CHARS, _SUPERSCRIPT) or match.group()
+
+
+def _index(match: Match[str], latex: bool) -> str:
+    index = next(group for group in match.groups() if group is not None)
+    if latex:
+        return f"_{{{index}}}"
+    return _script(index, _SUBSCRIPT_CHARS, _SUBSCRIPT) or match.group()
+
+
+def _script(text: str, allowed: set, table: dict) -> Optional[str]:
+    """Text in super- or subscript characters, or None if one is missing"""
+    if not text or not set(text) <= allowed:
+        return None
+    return text.translate(table)
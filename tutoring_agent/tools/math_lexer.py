@@ -0,0 +1,208 @@
+"""
+Mathematical expression lexer for the AI tutoring system
+Extracts typed expression spans from free text in a single linear pass
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# One alternative per token class; every character belongs to exactly one class
+_TOKEN_PATTERN = re.compile(
+    r"(?P<number>[0-9০-৯]+(?:\.[0-9০-৯]+)?)"
+    r"|(?P<name>[A-Za-z]+[0-9]*)"
+    r"|(?P<superscript>[⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻]+)"
+    r"|(?P<operator>[-+*/^×÷−·])"
+    r"|(?P<relation>[=≠≤≥<>≈])"
+    r"|(?P<open>[(\[])"
+    r"|(?P<close>[)\]])"
+    r"|(?P<space>[ \t]+)"
+    r"|(?P<other>[^0-9০-৯A-Za-z⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻\-+*/^×÷−·=≠≤≥<>≈()\[\] \t]+)"
+)
+
+# Characters that make a multi-letter word part of a formula when written
+# directly next to it ("v=d/t", "2cos", "F*d"). "-", "+" and brackets are left
+# out so that "right-angled" and "(see above)" stay prose.
+_BINDING_CHARS = frozenset("0123456789০১২৩৪৫৬৭৮৯*/^×÷·=≠≤≥<>≈")
+
+# Longest letter run read as a product of variables when it follows an operator
+_MAX_PRODUCT_LENGTH = 3
+
+# Unicode operators folded onto their ASCII form for classification
+_OPERATOR_ALIASES = {"−": "-", "×": "*", "·": "*", "÷": "/"}
+
+
+class _Segment:
+    """Running state of the expression candidate being scanned"""
+
+    def __init__(self, start: int):
+        self.start = start
+        self.end = start  # end of the last operand or closing bracket
+        self.operands = 0
+        self.numbers = 0
+        self.calls = 0
+        self.superscripts = 0
+        self.depth = 0
+        self.operators = set()
+        self.relations = 0
+        self.pending_operators = []
+        self.pending_relations = 0
+
+    def add_operand(self, end: int, is_number: bool = False) -> None:
+        # Operators only count once an operand follows them
+        self.operators.update(self.pending_operators)
+        self.relations += self.pending_relations
+        self.pending_operators = []
+        self.pending_relations = 0
+        self.operands += 1
+        self.numbers += is_number
+        self.end = end
+
+    def expression_type(self) -> Optional[str]:
+        """Classify the finished segment, or return None if it is not math"""
+        if self.superscripts and self.operands >= 1:
+            has_math = True
+        else:
+            has_math = self.operands >= 2 and bool(
+                self.operators or self.relations or self.calls
+            )
+        if not has_math:
+            return None
+
+        if self.relations:
+            return "equation"
+        if self.calls and not self.operators:
+            return "function"
+        if self.operators == {"/"} and self.operands == 2 and self.numbers == 2:
+            return "fraction"
+        if self.operators <= {"^"} and (self.operators or self.superscripts):
+            return "power"
+        return "arithmetic"
+
+
+def scan_expressions(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract typed mathematical expression spans from text
+
+    Tokenizes the text once and groups consecutive formula tokens (numbers,
+    variables, function calls, operators, brackets) into segments. Prose words
+    end a segment. The cost is linear in the length of the text.
+
+    Args:
+        text: Input text containing math expressions
+
+    Returns:
+        List of non-overlapping expressions in text order, each a dictionary
+        with type (equation, function, fraction, power or arithmetic),
+        expression, start_pos and end_pos
+    """
+    candidates = []
+    segment: Optional[_Segment] = None
+    previous_end = -1  # end of the previous non-space token
+
+    def close() -> None:
+        nonlocal segment
+        if segment is not None:
+            expr_type = segment.expression_type()
+            if expr_type is not None:
+                candidates.append((segment.start, segment.end, expr_type))
+        segment = None
+
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span()
+
+        if kind == "space":
+            continue
+
+        if kind == "name":
+            word = match.group()
+            is_call = text.startswith(("(", "["), end)
+            is_operand = (
+                len(word) == 1
+                or word[-1].isdigit()
+                or is_call
+                or (start > 0 and text[start - 1] in _BINDING_CHARS)
+                or (end < len(text) and text[end] in _BINDING_CHARS)
+                # Short products after an operator: "F = ma", "E = mc²"
+                or (
+                    len(word) <= _MAX_PRODUCT_LENGTH
+                    and segment is not None
+                    and bool(segment.pending_operators or segment.pending_relations)
+                )
+            )
+            if not is_operand:
+                close()
+            else:
+                if segment is None:
+                    segment = _Segment(start)
+                segment.add_operand(end)
+                segment.calls += is_call
+
+        elif kind == "number":
+            if segment is None:
+                segment = _Segment(start)
+            segment.add_operand(end, is_number=True)
+
+        elif kind == "superscript":
+            if segment is not None and previous_end == start:
+                segment.superscripts += 1
+                segment.end = end
+            else:
+                close()
+
+        elif kind in ("operator", "relation"):
+            if segment is None:
+                segment = _Segment(start)
+            if kind == "operator":
+                symbol = match.group()
+                segment.pending_operators.append(_OPERATOR_ALIASES.get(symbol, symbol))
+            else:
+                segment.pending_relations += 1
+
+        elif kind == "open":
+            if segment is None:
+                segment = _Segment(start)
+            segment.depth += 1
+
+        elif kind == "close":
+            if segment is None or segment.depth == 0:
+                close()
+            else:
+                segment.depth -= 1
+                segment.end = end
+
+        else:
+            close()
+
+        previous_end = end
+
+    close()
+    return [
+        {
+            "type": expr_type,
+            "expression": text[start:end],
+            "start_pos": start,
+            "end_pos": end,
+        }
+        for start, end, expr_type in sweep_non_overlapping(candidates)
+    ]
+
+
+def sweep_non_overlapping(spans: List[tuple]) -> List[tuple]:
+    """
+    Keep the earliest, longest spans that do not overlap an accepted one
+
+    Args:
+        spans: (start, end, ...) tuples
+
+    Returns:
+        Non-overlapping spans ordered by start position
+    """
+    accepted = []
+    last_end = -1
+    for span in sorted(spans, key=lambda s: (s[0], -s[1])):
+        # Sorted by start, so only the latest accepted end can overlap
+        if span[0] >= last_end:
+            accepted.append(span)
+            last_end = span[1]
+    return accepted
@@ -0,0 +1,147 @@
+"""
+Memoization for the text processing tools
+Opt-in LRU/TTL caching keyed on a hash of the question text
+"""
+
+import functools
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class MemoizedFunction:
+    """
+    Wrapper that caches the results of a text processing function
+
+    The first positional argument is the text. Entries are keyed on a digest
+    of the text and the remaining arguments, so the cache holds a fixed-size
+    key per entry however long the input was. With a normalize function the
+    wrapped function is called on the normalized text, so every variant that
+    shares an entry gets the result computed for that entry's key. Results are stored
+    pickled and every hit returns a fresh copy, so callers that modify a
+    returned dict cannot corrupt the cache. The lock is only held for
+    dictionary operations, never while the wrapped function runs, which keeps
+    the wrapper safe to call from threads and from asyncio code.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        normalize: Optional[Callable[[str], str]] = None,
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._normalize = normalize
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _make_key(self, text: str, args: tuple, kwargs: Dict[str, Any]) -> bytes:
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16)
+        if args or kwargs:
+            digest.update(repr((args, sorted(kwargs.items()))).encode("utf-8"))
+        return digest.digest()
+
+    def __call__(self, text: str, *args: Any, **kwargs: Any) -> Any:
+        if self._normalize is not None:
+            text = self._normalize(text)
+        key = self._make_key(text, args, kwargs)
+        now = time.monotonic()
+
+        snapshot = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or now < entry[0]:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    snapshot = entry[1]
+                else:
+                    del self._entries[key]
+                    self._expirations += 1
+            if snapshot is None:
+                self._misses += 1
+        if snapshot is not None:
+            return pickle.loads(snapshot)
+
+        value = self._func(text, *args, **kwargs)
+        expires_at = None if self._ttl is None else now + self._ttl
+        snapshot = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._entries[key] = (expires_at, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return value
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Report cache counters
+
+        Returns:
+            Dictionary with hits, misses, evictions, expirations, size and maxsize
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "size": len(self._entries),
+                "maxsize": self._maxsize,
+            }
+
+    def cache_clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._expirations = 0
+
+
+def memoize(
+    maxsize: int = 1024,
+    ttl: Optional[float] = None,
+    normalize: Optional[Callable[[str], str]] = None,
+) -> Callable[[Callable[..., Any]], MemoizedFunction]:
+    """
+    Cache a text processing function with LRU eviction and optional expiry
+
+    Usage:
+        cached_classify = memoize(maxsize=4096, ttl=3600)(classify_subject)
+
+    Results are returned as copies of the cached value. By default entries
+    are keyed on the exact text. Pass normalize=normalize_text to let
+    spacing and digit variants of a question share an entry; the function
+    then sees the normalized text, so only use it where that is acceptable,
+    e.g. not for detect_language, which reads Bengali digits as Bengali, or
+    for the character positions of extract_mathematical_expressions.
+
+    Args:
+        maxsize: Maximum number of cached entries
+        ttl: Seconds an entry stays valid, or None to keep it until evicted
+        normalize: Function applied to the text before hashing it and
+            calling the wrapped function, or None for exact-text keys
+
+    Returns:
+        Decorator producing a MemoizedFunction
+    """
+
+    def decorator(func: Callable[..., Any]) -> MemoizedFunction:
+        return MemoizedFunction(func, maxsize=maxsize, ttl=ttl, normalize=normalize)
+
+    return decorator
@@ -0,0 +1,323 @@
+"""
+Local query classification for the AI tutoring system
+Rule- and feature-based routing decisions that avoid an LLM call for obvious queries
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from .calculator import CalculationError, evaluate_expression
+from .equation_solver import solve_equations
+from .glossary import get_glossary
+from .keyword_matcher import KeywordMatcher
+from .text_processing import _TextFeatures, _classify_subject
+
+# Confidence at or above which the local decision replaces the LLM classifier
+LOCAL_CLASSIFICATION_THRESHOLD = 0.85
+
+# Longest query that can still be SIMPLE_EDUCATIONAL
+SIMPLE_MAX_WORDS = 12
+
+# Greetings and small talk match whole words exactly: with inflections,
+# "his" and "this" would read as "hi" plus a plural ending
+_CONVERSATION_MATCHER = KeywordMatcher(
+    {
+        "greeting": [
+            # English
+            "hello",
+            "hi",
+            "hey",
+            "good morning",
+            "good afternoon",
+            "good evening",
+            "good night",
+            "how are you",
+            "whats up",
+            "nice to meet you",
+            "thanks",
+            "thank you",
+            "bye",
+            "goodbye",
+            "see you",
+            # Bengali
+            "হ্যালো",
+            "হাই",
+            "আসসালামু আলাইকুম",
+            "সালাম",
+            "নমস্কার",
+            "শুভ সকাল",
+            "শুভ রাত্রি",
+            "কেমন আছ",
+            "কেমন আছো",
+            "কেমন আছেন",
+            "ধন্যবাদ",
+            "বিদায়",
+            # Banglish
+            "assalamu alaikum",
+            "salam",
+            "kemon acho",
+            "kemon achen",
+            "dhonnobad",
+        ],
+        "social": [
+            # English
+            "your name",
+            "who are you",
+            "who created you",
+            "who made you",
+            "what can you do",
+            "are you chatgpt",
+            "are you a bot",
+            "joke",
+            "jokes",
+            "feeling",
+            "feelings",
+            "stressed",
+            "bored",
+            "motivate",
+            "encourage",
+            "how does this work",
+            "what subjects",
+            # Bengali
+            "তোমার নাম",
+            "আপনার নাম",
+            "তুমি কে",
+            "আপনি কে",
+            "করতে পারো",
+            "করতে পারেন",
+            "কৌতুক",
+            "মন খারাপ",
+            # Banglish
+            "tomar nam",
+            "apnar nam",
+        ],
+    },
+    suffixes=(),
+)
+
+_REQUEST_MATCHER = KeywordMatcher(
+    {
+        # Requests for reasoning rather than a single answer
+        "depth": [
+            # English
+            "step by step",
+            "explain",
+            "describe",
+            "why",
+            "how does",
+            "how do",
+            "how can",
+            "prove",
+            "derive",
+            "show that",
+            "difference",
+            "compare",
+            "word problem",
+            # Bengali
+            "ধাপে ধাপে",
+            "ব্যাখ্যা",
+            "বর্ণনা",
+            "কেন",
+            "কীভাবে",
+            "কিভাবে",
+            "প্রমাণ",
+            "পার্থক্য",
+            # Banglish
+            "bujhao",
+            "keno",
+        ],
+        "task": [
+            # English
+            "solve",
+            "find",
+            "calculate",
+            "compute",
+            "determine",
+            "evaluate",
+            "simplify",
+            "factorize",
+            "prove",
+            "derive",
+            "differentiate",
+            "integrate",
+            "explain",
+            "define",
+            "describe",
+            # Bengali
+            "নির্ণয়",
+            "বের কর",
+            "হিসাব",
+            "ব্যাখ্যা",
+            "প্রমাণ",
+            "সংজ্ঞা",
+            "কত",
+            # Banglish
+            "somadhan",
+            "nirnoy",
+            "ber koro",
+        ],
+    }
+)
+
+# Subject keywords that signal multi-step calculus or kinematics work
+_ADVANCED_CONCEPTS = frozenset(
+    ["derivative", "integral", "calculus", "velocity", "acceleration", "vector"]
+)
+
+# "What is X?" / "X কাকে বলে?" asking for one glossary term
+_DEFINITION_REQUESTS = [
+    re.compile(
+        r"^(?:what\s+(?:is|are)|define|definition\s+of|meaning\s+of)\s+"
+        r"(?:an?\s+|the\s+)?(?P<term>[^?]+?)\s*\??$",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^(?P<term>.+?)\s*(?:কী|কি|কাকে বলে|এর সংজ্ঞা|সংজ্ঞা)"
+        r"(?:\s*(?:দাও|লেখ|লিখ))?\s*[?।]?$"
+    ),
+]
+
+# "Formula for X" / "X formula" / "X এর সূত্র" asking for one glossary formula
+_FORMULA_REQUESTS = [
+    re.compile(
+        r"^(?:what\s+is\s+)?(?:the\s+)?(?:formula\s+(?:for|of)\s+(?:the\s+|an?\s+)?"
+        r"(?P<term>[^?]+?)|(?P<named>[^?]+?)\s+formula)\s*\??$",
+        re.IGNORECASE,
+    ),
+    re.compile(r"^(?P<term>.+?)\s*(?:এর|র)?\s*সূত্র(?:\s*(?:কী|কি|লেখ|দাও))?\s*[?।]?$"),
+]
+
+
+def classify_query(text: str) -> Dict[str, Any]:
+    """
+    Classify a query for routing without calling an LLM
+
+    Produces the query_classification schema used by the conversation
+    router. Clear greetings and social messages become GENERAL. Short
+    requests the fast-track tools answer in one step (a single calculation,
+    one equation or system, or one glossary term or formula) become
+    SIMPLE_EDUCATIONAL; other text with mathematical expressions or subject
+    keywords becomes COMPLEX_EDUCATIONAL. Mixed or weak signals get a low
+    confidence so the caller can defer to the LLM classifier.
+
+    Args:
+        text: User query
+
+    Returns:
+        Dictionary with classification, confidence, reasoning,
+        estimated_processing_time and detected_mathematical_concepts
+    """
+    features = _TextFeatures(text)
+    conversation = _CONVERSATION_MATCHER.match(features.lower)
+    request = _REQUEST_MATCHER.match(features.lower)
+    subject = _classify_subject(features)
+    expressions = features.math_expressions
+
+    subject_keywords = [
+        keyword
+        for scores in subject["all_scores"].values()
+        for keyword in scores["matched_keywords"]
+    ]
+    concepts = _detected_concepts(expressions, subject)
+    has_task = bool(request.get("task"))
+    is_social = bool(conversation.get("greeting") or conversation.get("social"))
+
+    simple = None
+    if (
+        features.word_count <= SIMPLE_MAX_WORDS
+        and not request.get("depth")
+        and not _ADVANCED_CONCEPTS.intersection(concepts)
+    ):
+        simple = _simple_request(text, expressions)
+
+    if simple:
+        classification = "SIMPLE_EDUCATIONAL"
+        confidence = 0.9
+        reasoning = f"Single-step request for the fast track: {simple}"
+    elif expressions:
+        kinds = sorted({expr["type"] for expr in expressions})
+        classification = "COMPLEX_EDUCATIONAL"
+        confidence = 0.95 if set(kinds) - {"arithmetic", "fraction"} else 0.9
+        reasoning = f"Mathematical expressions found ({', '.join(kinds)})"
+    elif subject_keywords and (has_task or len(subject_keywords) >= 2):
+        classification = "COMPLEX_EDUCATIONAL"
+        confidence = 0.9 if has_task else 0.85
+        reasoning = f"Subject keywords found: {', '.join(subject_keywords)}"
+    elif is_social and not subject_keywords and not has_task:
+        classification = "GENERAL"
+        confidence = 0.95 if features.word_count <= 12 else 0.7
+        matched = conversation.get("greeting", []) + conversation.get("social", [])
+        reasoning = (
+            f"Conversational phrases without academic content: {', '.join(matched)}"
+        )
+    elif subject_keywords or has_task:
+        classification = "COMPLEX_EDUCATIONAL"
+        confidence = 0.6
+        reasoning = "Weak academic signal; needs the LLM classifier"
+    else:
+        classification = "GENERAL"
+        confidence = 0.5
+        reasoning = "No academic or conversational indicators; needs the LLM classifier"
+
+    if classification == "GENERAL":
+        processing_time = "immediate"
+    elif classification == "SIMPLE_EDUCATIONAL":
+        processing_time = "fast"
+    elif _ADVANCED_CONCEPTS.intersection(concepts) or len(expressions) > 1:
+        processing_time = "complex"
+    else:
+        processing_time = "standard"
+
+    return {
+        "classification": classification,
+        "confidence": confidence,
+        "reasoning": reasoning,
+        "estimated_processing_time": processing_time,
+        "detected_mathematical_concepts": concepts,
+    }
+
+
+def _detected_concepts(
+    expressions: List[Dict[str, Any]], subject: Dict[str, Any]
+) -> List[str]:
+    """List expression types and math/physics keywords without duplicates"""
+    concepts = [expr["type"] for expr in expressions]
+    for name in ("math", "physics"):
+        concepts.extend(subject["all_scores"][name]["matched_keywords"])
+    return list(dict.fromkeys(concepts))
+
+
+def _simple_request(text: str, expressions: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Describe the single fast-track step that answers the text, if any
+
+    Returns:
+        "calculation", "equation", "definition of <term>" or "formula for
+        <name>", or None when the text needs the full pipeline
+    """
+    if expressions:
+        kinds = {expr["type"] for expr in expressions}
+        if kinds == {"equation"}:
+            return "equation" if solve_equations(text)["solved"] else None
+        if len(expressions) == 1 and kinds <= {"arithmetic", "fraction"}:
+            try:
+                evaluate_expression(expressions[0]["expression"])
+            except CalculationError:
+                return None
+            return "calculation"
+        return None
+
+    stripped = text.strip()
+    for kind, patterns, label in (
+        ("formula", _FORMULA_REQUESTS, "formula for"),
+        ("term", _DEFINITION_REQUESTS, "definition of"),
+    ):
+        for pattern in patterns:
+            match = pattern.match(stripped)
+            if not match:
+                continue
+            term = next(group for group in match.groups() if group)
+            record = get_glossary().lookup(term, kind=kind)
+            if record:
+                return f"{label} {record['name']}"
+    return None
@@ -0,0 +1,462 @@
+"""
+Response cache for the AI tutoring system
+Keeps finished tutoring responses in a local SQLite file, or in memory, so repeated questions skip the analysis pipeline
+"""
+
+import contextlib
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .text_processing import analyze_question, normalize_text
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "tutoring_agent", "response_cache.sqlite3"
+)
+
+# Bump to drop every cached response, e.g. after a change to the response
+# format that the prompt fingerprint does not capture
+RESPONSE_CACHE_VERSION = "1"
+
+# Seconds a cached response stays valid
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Size bounds; the least recently used responses are evicted first
+RESPONSE_CACHE_MAX_ENTRIES = 10_000
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_SUPERSCRIPTS = str.maketrans({"²": "^2", "³": "^3"})
+
+# Chemical element symbols; their case tells "CO" (carbon monoxide) from
+# "Co" (cobalt), so words written as formulas are not case-folded
+_ELEMENTS = frozenset("""
+    H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni
+    Cu Zn Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I
+    Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu Hf Ta W Re Os Ir Pt
+    Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr
+    Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og
+    """.split())
+_FORMULA = re.compile(r"(?:[A-Z][a-z]?\d*)+")
+_SYMBOL = re.compile(r"[A-Z][a-z]?")
+_WORD = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    response BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    generation_seconds REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def _fold_case(text: str) -> str:
+    """Case-fold text except for words written as element symbols"""
+
+    def fold(match: re.Match) -> str:
+        word = match.group()
+        if _FORMULA.fullmatch(word) and all(
+            symbol in _ELEMENTS for symbol in _SYMBOL.findall(word)
+        ):
+            return word
+        return word.casefold()
+
+    return _WORD.sub(fold, text)
+
+
+def cache_key(question: str, language: str, grade: str) -> str:
+    """
+    Key for a question in a given language and grade
+
+    Whitespace, letter case, Bengali digits, operator symbols, superscript
+    powers and trailing punctuation are normalized, so "What is 15 × 8?" and
+    "what is 15*8" share an entry, as do "x²" and "x^2". Words written as
+    element symbols keep their case, so "CO" and "Co" do not.
+
+    Args:
+        question: Question text
+        language: Detected language ('bengali', 'english' or 'mixed')
+        grade: Grade level, e.g. '9-10'
+
+    Returns:
+        Hex digest identifying the entry
+    """
+    text = _fold_case(normalize_text(question.translate(_SUPERSCRIPTS)))
+    text = text.rstrip(" ?!.।")
+    return hashlib.sha256("\x1f".join((text, language, grade)).encode()).hexdigest()
+
+
+def question_cache_key(question: str) -> str:
+    """
+    Key for a user message, with language and grade detected locally
+
+    Args:
+        question: User message
+
+    Returns:
+        Key from cache_key
+    """
+    analysis = analyze_question(question)
+    return cache_key(
+        question, analysis["language"], analysis["grade_level"]["grade_level"]
+    )
+
+
+class ResponseCache:
+    """
+    Persistent response cache with expiry, LRU size bounds and a version tag
+
+    Responses are zlib-compressed. Entries written under another version tag
+    are dropped when the file is opened, so changing the tag (e.g. when
+    prompts change) invalidates the whole cache. The connection is opened on
+    first use and shared between threads behind a lock.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        version: str = RESPONSE_CACHE_VERSION,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Configure the cache without touching the file yet
+
+        Args:
+            path: SQLite file, or ":memory:" for a private in-memory cache
+            version: Tag stored with every entry; entries with another tag
+                are invalid
+            ttl: Seconds before an entry expires
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total size of the compressed responses
+            clock: Time source, replaceable for benchmarks
+        """
+        self.path = path
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._counts = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+        self._latency_saved = 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response
+
+        Args:
+            key: Key from cache_key
+
+        Returns:
+            Cached response text, or None on a miss or an expired entry
+        """
+        now = self._clock()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT response, created, generation_seconds FROM responses "
+                "WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+            if row is None:
+                self._counts["misses"] += 1
+                return None
+
+            response, created, generation_seconds = row
+            if now - created > self.ttl:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                connection.commit()
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return None
+
+            connection.execute(
+                "UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            connection.commit()
+            self._counts["hits"] += 1
+            self._latency_saved += generation_seconds
+        return zlib.decompress(response).decode("utf-8")
+
+    def put(self, key: str, response: str, generation_seconds: float = 0.0) -> None:
+        """
+        Store a response, evicting least recently used entries past the bounds
+
+        Args:
+            key: Key from cache_key
+            response: Response text
+            generation_seconds: Time it took to produce the response, counted
+                as saved on every later hit
+        """
+        blob = zlib.compress(response.encode("utf-8"))
+        now = self._clock()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, version, response, size, created, accessed, generation_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, self.version, blob, len(blob), now, now, generation_seconds),
+            )
+            self._counts["stores"] += 1
+            self._evict(connection)
+            connection.commit()
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Cache counters since the cache object was created
+
+        Returns:
+            Dictionary with hits, misses, expired, stores and evictions counts,
+            hit_rate, latency_saved_seconds, and the current entries and bytes
+        """
+        with self._lock:
+            entries, size = (
+                self._connect()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses")
+                .fetchone()
+            )
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {
+                **self._counts,
+                "hit_rate": self._counts["hits"] / lookups if lookups else 0.0,
+                "latency_saved_seconds": self._latency_saved,
+                "entries": entries,
+                "bytes": size,
+            }
+
+    @contextlib.contextmanager
+    def disabled(self) -> Iterator[None]:
+        """Context manager that turns the cache off, e.g. for benchmarks"""
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            if self.path != ":memory:":
+                # Lets several worker processes read while one writes
+                connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            connection.execute(
+                "DELETE FROM responses WHERE version != ?", (self.version,)
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        entries, size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, entry_size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ):
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            entries -= 1
+            size -= entry_size
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._counts["evictions"] += len(evicted)
+
+
+class MemoryResponseCache:
+    """
+    In-process response cache with the interface of ResponseCache
+
+    Entries live in a dictionary in least recently used order and are lost
+    when the process exits, for deployments without a writable cache
+    directory and for benchmarks. Sizes are counted on the UTF-8 text.
+    """
+
+    def __init__(
+        self,
+        version: str = RESPONSE_CACHE_VERSION,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Create an empty cache
+
+        Args:
+            version: Version tag, kept for parity with ResponseCache
+            ttl: Seconds before an entry expires
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total size of the responses
+            clock: Time source, replaceable for benchmarks
+        """
+        self.path = ":memory:"
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key → (response, size, created, generation seconds)
+        self._entries: "OrderedDict[str, Tuple[str, int, float, float]]" = OrderedDict()
+        self._bytes = 0
+        self._counts = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+        self._latency_saved = 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached response text, or None on a miss or an expired entry
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+
+            response, size, created, generation_seconds = entry
+            if now - created > self.ttl:
+                del self._entries[key]
+                self._bytes -= size
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            self._latency_saved += generation_seconds
+        return response
+
+    def put(self, key: str, response: str, generation_seconds: float = 0.0) -> None:
+        """
+        Store a response, evicting least recently used entries past the bounds
+
+        Args:
+            key: Cache key
+            response: Response text
+            generation_seconds: Time it took to produce the response, counted
+                as saved on every later hit
+        """
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (response, size, self._clock(), generation_seconds)
+            self._bytes += size
+            self._counts["stores"] += 1
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size, _, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._counts["evictions"] += 1
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Cache counters since the cache was created
+
+        Returns:
+            Same fields as ResponseCache.stats
+        """
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {
+                **self._counts,
+                "hit_rate": self._counts["hits"] / lookups if lookups else 0.0,
+                "latency_saved_seconds": self._latency_saved,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    @contextlib.contextmanager
+    def disabled(self) -> Iterator[None]:
+        """Context manager that turns the cache off, e.g. for benchmarks"""
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def close(self) -> None:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_cache(
+    path: str = DEFAULT_CACHE_PATH, version: str = RESPONSE_CACHE_VERSION
+) -> ResponseCache:
+    """
+    Shared response cache for a file and version tag
+
+    Args:
+        path: SQLite file
+        version: Version tag of the cached responses
+
+    Returns:
+        ResponseCache for the file; the file is opened on first use
+    """
+    return ResponseCache(path, version=version)
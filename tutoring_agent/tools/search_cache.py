@@ -0,0 +1,213 @@
+"""
+Search result cache for the AI tutoring system
+Shares knowledge search results between students asking the same question, with concurrent identical searches waiting on a single request
+"""
+
+import asyncio
+import contextlib
+import functools
+import hashlib
+import os
+from typing import Dict, Iterable, Iterator, Literal, Optional, Tuple, Union
+
+from .response_cache import MemoryResponseCache, ResponseCache
+from .text_processing import normalize_text
+
+DEFAULT_SEARCH_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "tutoring_agent", "search_cache.sqlite3"
+)
+
+# Bump to drop every cached search result
+SEARCH_CACHE_VERSION = "1"
+
+# Seconds a search result stays valid; shorter than for finished responses,
+# since web results change
+SEARCH_CACHE_TTL = 24 * 60 * 60
+
+# Size bounds; the least recently used results are evicted first
+SEARCH_CACHE_MAX_ENTRIES = 5_000
+SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Seconds a duplicate search waits for the one in flight before it searches
+# itself
+SINGLE_FLIGHT_TIMEOUT = 60.0
+
+CacheBackend = Literal["memory", "sqlite"]
+
+_PUNCTUATION = " ?!.,;:।\"'"
+
+
+def search_cache_key(search_terms: Iterable[str], language: str) -> str:
+    """
+    Key for a knowledge search
+
+    Each term is normalized as in response_cache.cache_key, and the order
+    and repeats of terms are ignored, so ["Photosynthesis", "chlorophyll"]
+    and ["chlorophyll", "photosynthesis?"] share an entry.
+
+    Args:
+        search_terms: Search phrases, or the question when there are none
+        language: Language of the question ('bengali', 'english' or 'mixed')
+
+    Returns:
+        Hex digest identifying the entry
+    """
+    terms = {
+        normalize_text(term).casefold().strip(_PUNCTUATION) for term in search_terms
+    }
+    text = "\x1e".join(sorted(terms - {""}))
+    return hashlib.sha256("\x1f".join((text, language)).encode()).hexdigest()
+
+
+class SearchCache:
+    """
+    Search result cache with single-flight de-duplication
+
+    Results are kept in a ResponseCache (SQLite, shared between processes
+    and kept across restarts) or a MemoryResponseCache. On top of it, the
+    first caller to miss a key becomes its leader and searches; callers
+    asking for the same key while that search is in flight wait for its
+    result instead of searching again. Waiting works within one event loop;
+    other worker processes see the result once it is stored.
+    """
+
+    def __init__(
+        self,
+        backend: Union[ResponseCache, MemoryResponseCache],
+        wait_timeout: float = SINGLE_FLIGHT_TIMEOUT,
+    ):
+        """
+        Args:
+            backend: Store for finished results
+            wait_timeout: Seconds a duplicate search waits for the leader
+        """
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._counts = {"searches": 0, "coalesced": 0, "timeouts": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend.enabled
+
+    async def acquire(self, key: str) -> Tuple[Optional[str], bool]:
+        """
+        Get a result from the cache or from a search in flight
+
+        Args:
+            key: Key from search_cache_key
+
+        Returns:
+            Tuple of (result, leader). result is None when the caller has to
+            search; leader is True when it then leads the flight for key and
+            must call release once its search is done or has failed.
+        """
+        if not self.enabled:
+            return None, False
+        while True:
+            result = self.backend.get(key)
+            if result is not None:
+                return result, False
+            flight = self._flights.get(key)
+            if flight is None:
+                self._flights[key] = asyncio.get_running_loop().create_future()
+                self._counts["searches"] += 1
+                return None, True
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.shield(flight), self.wait_timeout
+                )
+            except asyncio.TimeoutError:
+                self._counts["timeouts"] += 1
+                self._counts["searches"] += 1
+                return None, False
+            if result is not None:
+                self._counts["coalesced"] += 1
+                return result, False
+            # The leader failed; the next waiter to get here leads a new search
+
+    def release(
+        self, key: str, result: Optional[str], search_seconds: float = 0.0
+    ) -> None:
+        """
+        Finish the flight for key, storing its result
+
+        Args:
+            key: Key the caller leads
+            result: Search result, or None when the search failed; waiters
+                then search again
+            search_seconds: Time the search took, counted as saved on every
+                later cache hit
+        """
+        if result is not None:
+            self.store(key, result, search_seconds)
+        flight = self._flights.pop(key, None)
+        if flight is not None and not flight.done():
+            flight.set_result(result)
+
+    def store(self, key: str, result: str, search_seconds: float = 0.0) -> None:
+        """
+        Store the result of a search that did not lead a flight
+
+        Args:
+            key: Key from search_cache_key
+            result: Search result
+            search_seconds: Time the search took
+        """
+        if self.enabled:
+            self.backend.put(key, result, search_seconds)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Search and cache counters
+
+        Returns:
+            Backend statistics with searches (lookups that had to search),
+            coalesced (lookups served by a search in flight), timeouts,
+            in_flight, and saved_searches (cache hits plus coalesced lookups)
+        """
+        stats = self.backend.stats()
+        return {
+            **stats,
+            **self._counts,
+            "in_flight": len(self._flights),
+            "saved_searches": stats["hits"] + self._counts["coalesced"],
+        }
+
+    @contextlib.contextmanager
+    def disabled(self) -> Iterator[None]:
+        """Context manager that turns the cache off, e.g. for benchmarks"""
+        with self.backend.disabled():
+            yield
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_search_cache(
+    backend: CacheBackend = "sqlite",
+    path: str = DEFAULT_SEARCH_CACHE_PATH,
+    version: str = SEARCH_CACHE_VERSION,
+) -> SearchCache:
+    """
+    Shared search cache for a backend and version tag
+
+    Args:
+        backend: "sqlite" to keep results in path across restarts, or
+            "memory" to keep them in this process only
+        path: SQLite file of the "sqlite" backend
+        version: Version tag of the cached results
+
+    Returns:
+        SearchCache; a SQLite file is opened on first use
+    """
+    bounds = {
+        "version": version,
+        "ttl": SEARCH_CACHE_TTL,
+        "max_entries": SEARCH_CACHE_MAX_ENTRIES,
+        "max_bytes": SEARCH_CACHE_MAX_BYTES,
+    }
+    if backend == "memory":
+        return SearchCache(MemoryResponseCache(**bounds))
+    return SearchCache(ResponseCache(path, **bounds))
@@ -5,7 +5,388 @@ Focuses on language detection, mathematical expression parsing, and educational
 
 import re
 import json
-from typing import Dict, Any, List, Optional, Tuple
+from functools import cached_property
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from .keyword_matcher import KeywordMatcher
+from .math_lexer import scan_expressions
+
+# Subject keywords (Bengali and English)
+_SUBJECT_KEYWORDS = {
+    "math": {
+        "keywords": [
+            # English keywords
+            "algebra",
+            "geometry",
+            "trigonometry",
+            "calculus",
+            "equation",
+            "solve",
+            "graph",
+            "function",
+            "derivative",
+            "integral",
+            "triangle",
+            "circle",
+            "square",
+            "rectangle",
+            "angle",
+            "area",
+            "volume",
+            "perimeter",
+            "quadratic",
+            "linear",
+            "polynomial",
+            "matrix",
+            "vector",
+            # Bengali keywords
+            "বীজগণিত",
+            "জ্যামিতি",
+            "ত্রিকোণমিতি",
+            "সমীকরণ",
+            "সমাধান",
+            "ত্রিভুজ",
+            "বৃত্ত",
+            "চতুর্ভুজ",
+            "কোণ",
+            "ক্ষেত্রফল",
+            "আয়তন",
+            "পরিসীমা",
+            "দ্বিঘাত",
+            "রৈখিক",
+            "বহুপদী",
+            "ম্যাট্রিক্স",
+        ],
+        "weight": 1.0,
+    },
+    "physics": {
+        "keywords": [
+            # English keywords
+            "force",
+            "motion",
+            "velocity",
+            "acceleration",
+            "energy",
+            "power",
+            "electricity",
+            "magnetism",
+            "light",
+            "sound",
+            "wave",
+            "pressure",
+            "temperature",
+            "heat",
+            "mechanics",
+            "optics",
+            "thermodynamics",
+            # Bengali keywords
+            "বল",
+            "বলের",
+            "বলকে",
+            "গতি",
+            "বেগ",
+            "ত্বরণ",
+            "শক্তি",
+            "ক্ষমতা",
+            "বিদ্যুৎ",
+            "চুম্বক",
+            "আলো",
+            "শব্দ",
+            "তরঙ্গ",
+            "চাপ",
+            "তাপমাত্রা",
+            "তাপ",
+            "বলবিদ্যা",
+        ],
+        "weight": 1.0,
+    },
+    "chemistry": {
+        "keywords": [
+            # English keywords
+            "atom",
+            "molecule",
+            "element",
+            "compound",
+            "reaction",
+            "acid",
+            "base",
+            "salt",
+            "chemical",
+            "periodic",
+            "bond",
+            "electron",
+            "ion",
+            "catalyst",
+            "organic",
+            "inorganic",
+            "oxidation",
+            "reduction",
+            # Bengali keywords
+            "পরমাণু",
+            "অণু",
+            "মৌল",
+            "যৌগ",
+            "বিক্রিয়া",
+            "অ্যাসিড",
+            "ক্ষার",
+            "লবণ",
+            "রাসায়নিক",
+            "পর্যায়",
+            "বন্ধন",
+            "ইলেকট্রন",
+            "আয়ন",
+        ],
+        "weight": 1.0,
+    },
+    "biology": {
+        "keywords": [
+            # English keywords
+            "cell",
+            "tissue",
+            "organ",
+            "system",
+            "plant",
+            "animal",
+            "human",
+            "genetics",
+            "evolution",
+            "ecosystem",
+            "photosynthesis",
+            "respiration",
+            "protein",
+            "dna",
+            "rna",
+            "chromosome",
+            "enzyme",
+            # Bengali keywords
+            "কোষ",
+            "টিস্যু",
+            "অঙ্গ",
+            "তন্ত্র",
+            "উদ্ভিদ",
+            "প্রাণী",
+            "মানুষ",
+            "বংশগতি",
+            "বিবর্তন",
+            "বাস্তুতন্ত্র",
+            "সালোকসংশ্লেষণ",
+            "শ্বসন",
+            "প্রোটিন",
+            "ডিএনএ",
+            "আরএনএ",
+            "ক্রোমোজোম",
+            "এনজাইম",
+        ],
+        "weight": 1.0,
+    },
+}
+
+# Grade level indicators per subject
+_GRADE_INDICATORS = {
+    "6-8": {
+        "math": [
+            "addition",
+            "subtraction",
+            "multiplication",
+            "division",
+            "fraction",
+            "decimal",
+            "percentage",
+            "basic",
+            "simple",
+            "যোগ",
+            "বিয়োগ",
+            "গুণ",
+            "ভাগ",
+            "ভগ্নাংশ",
+            "দশমিক",
+            "শতকরা",
+        ],
+        "physics": ["basic", "simple", "elementary", "speed", "distance", "time"],
+        "chemistry": ["basic", "simple", "states of matter", "mixture", "solution"],
+        "biology": ["basic", "simple", "plant parts", "animal parts", "food chain"],
+    },
+    "9-10": {
+        "math": [
+            "quadratic",
+            "trigonometry",
+            "logarithm",
+            "coordinate",
+            "দ্বিঘাত",
+            "ত্রিকোণমিতি",
+            "লগারিদম",
+            "স্থানাঙ্ক",
+        ],
+        "physics": [
+            "force",
+            "motion",
+            "electricity",
+            "light",
+            "sound",
+            "বল",
+            "বলের",
+            "বলকে",
+            "গতি",
+            "বিদ্যুৎ",
+            "আলো",
+            "শব্দ",
+        ],
+        "chemistry": [
+            "atomic structure",
+            "periodic table",
+            "chemical bonding",
+            "acid base",
+            "পরমাণু গঠন",
+            "পর্যায় সারণি",
+        ],
+        "biology": [
+            "cell",
+            "tissue",
+            "genetics",
+            "evolution",
+            "কোষ",
+            "টিস্যু",
+            "বংশগতি",
+        ],
+    },
+    "11-12": {
+        "math": [
+            "calculus",
+            "derivative",
+            "integral",
+            "limits",
+            "matrix",
+            "vector",
+            "statistics",
+            "ক্যালকুলাস",
+            "অন্তরকরণ",
+            "সমাকলন",
+        ],
+        "physics": [
+            "advanced",
+            "quantum",
+            "relativity",
+            "electromagnetic",
+            "thermodynamics",
+            "modern physics",
+        ],
+        "chemistry": [
+            "organic",
+            "physical chemistry",
+            "chemical kinetics",
+            "equilibrium",
+            "জৈব রসায়ন",
+        ],
+        "biology": [
+            "molecular biology",
+            "biotechnology",
+            "ecology",
+            "advanced genetics",
+        ],
+    },
+}
+
+# Bengali digits and Unicode operators mapped for mathematical processing
+_NORMALIZE_TABLE = {
+    **{chr(0x09E6 + digit): str(digit) for digit in range(10)},
+    "×": "*",
+    "÷": "/",
+    "−": "-",
+}
+
+# Finds table entries in one scan; faster than str.translate on Bengali text
+_NORMALIZE_CHARS = re.compile("[" + "".join(_NORMALIZE_TABLE) + "]")
+
+# Implicit or spaced multiplication between a number and its operand, applied
+# after whitespace is collapsed: "2 x 3" → "2*3", "2 * x" → "2*x"
+_MULTIPLY_PATTERN = re.compile(r"([0-9]) ?(?:x ?(?=[0-9])|\* ?(?=[a-zA-Z]))")
+
+# Characters held back while streaming so that every match is seen whole
+_MULTIPLY_CONTEXT = 4
+
+# Built once at import; finds every subject and grade keyword in one pass
+_KEYWORD_MATCHER = KeywordMatcher(
+    {
+        **{
+            ("subject", subject): data["keywords"]
+            for subject, data in _SUBJECT_KEYWORDS.items()
+        },
+        **{
+            ("grade", grade, subject): terms
+            for grade, subjects in _GRADE_INDICATORS.items()
+            for subject, terms in subjects.items()
+        },
+    }
+)
+
+
+class _TextFeatures:
+    """
+    Intermediate results shared by the analysis functions for one text
+
+    Each feature is computed on first use and reused afterwards, so a full
+    analysis lowercases, tokenizes and extracts expressions only once.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def keyword_hits(self) -> Dict[Any, List[str]]:
+        return _KEYWORD_MATCHER.match(self.lower)
+
+    @cached_property
+    def math_expressions(self) -> List[Dict[str, Any]]:
+        return extract_mathematical_expressions(self.text)
+
+    @cached_property
+    def word_count(self) -> int:
+        return len(self.text.split())
+
+
+def analyze_question(text: str) -> Dict[str, Any]:
+    """
+    Run every local analysis of a question in one pass
+
+    The text is lowercased, tokenized and scanned for mathematical expressions
+    once; the individual analysis functions are views over the same results.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Dictionary with language, normalized text, expressions, subject,
+        grade level, completeness, clarifying questions and educational context
+    """
+    features = _TextFeatures(text)
+    language = _detect_language(features)
+    subject = _classify_subject(features)
+    completeness = _validate_question_completeness(features)
+
+    clarifying_questions = []
+    if not completeness["is_complete"]:
+        clarifying_questions = generate_clarifying_questions(
+            {
+                "language": language,
+                "subject": subject["subject"],
+                "issues": completeness["issues"],
+            }
+        )
+
+    return {
+        "language": language,
+        "normalized_text": normalize_text(text),
+        "mathematical_expressions": features.math_expressions,
+        "subject": subject,
+        "grade_level": _assess_grade_level(features, subject["subject"]),
+        "completeness": completeness,
+        "clarifying_questions": clarifying_questions,
+        "educational_context": _extract_educational_context(features),
+    }
 
 
 def detect_language(text: str) -> str:
@@ -18,6 +399,12 @@ def detect_language(text: str) -> str:
     Returns:
         'bengali', 'english', or 'mixed'
     """
+    return _detect_language(_TextFeatures(text))
+
+
+def _detect_language(features: _TextFeatures) -> str:
+    text = features.text
+
     # Count Bengali Unicode characters (Bangla script range)
     bengali_chars = len(re.findall(r"[\u0980-\u09FF]", text))
 
@@ -52,36 +439,68 @@ def normalize_text(text: str) -> str:
     Returns:
         Cleaned and normalized text
     """
-    # Remove extra whitespaces
-    text = re.sub(r"\s+", " ", text.strip())
-
-    # Normalize Bengali numerals to English numerals for mathematical processing
-    bengali_to_english_digits = {
-        "০": "0",
-        "১": "1",
-        "২": "2",
-        "৩": "3",
-        "৪": "4",
-        "৫": "5",
-        "৬": "6",
-        "৭": "7",
-        "৮": "8",
-        "৯": "9",
-    }
+    # Collapse whitespace, map digits and operators, then fix multiplication
+    text = _translate_characters(" ".join(text.split()))
+    return _MULTIPLY_PATTERN.sub(r"\1*", text)
 
-    for bengali, english in bengali_to_english_digits.items():
-        text = text.replace(bengali, english)
 
-    # Standardize mathematical operators
-    text = text.replace("×", "*")
-    text = text.replace("÷", "/")
-    text = text.replace("−", "-")
+def normalize_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Normalize text that arrives in chunks, e.g. a long uploaded document
+
+    Joining the yielded pieces gives the same result as normalize_text on the
+    joined chunks. Only a few characters are held back between chunks, so
+    patterns split across a boundary ("2 x" | " 3") are still rewritten.
 
-    # Clean up common typos and formatting issues
-    text = re.sub(r"([0-9])\s*([x])\s*([0-9])", r"\1*\3", text)  # "2 x 3" → "2*3"
-    text = re.sub(r"([0-9])\s*\*\s*([a-zA-Z])", r"\1*\2", text)  # "2 * x" → "2*x"
+    Args:
+        chunks: Raw input text chunks
 
-    return text
+    Returns:
+        Iterator over normalized text pieces
+    """
+    started = False
+    pending_space = False
+    buffer = ""  # collapsed text not yet checked for multiplication
+
+    for chunk in chunks:
+        words = " ".join(chunk.split())
+        if not words:
+            pending_space = pending_space or bool(chunk)
+            continue
+
+        # Whitespace at a chunk edge becomes one space only between words
+        if started and (pending_space or chunk[0].isspace()):
+            buffer += " "
+        buffer += _translate_characters(words)
+        started = True
+        pending_space = chunk[-1].isspace()
+
+        # Every match starting before safe_end has its lookahead in the buffer
+        safe_end = len(buffer) - _MULTIPLY_CONTEXT
+        if safe_end <= 0:
+            continue
+        pieces = []
+        position = 0
+        for match in _MULTIPLY_PATTERN.finditer(buffer):
+            if match.start() >= safe_end:
+                break
+            pieces.append(buffer[position : match.start()])
+            pieces.append(match.group(1) + "*")
+            position = match.end()
+        cut = max(position, safe_end)
+        pieces.append(buffer[position:cut])
+        buffer = buffer[cut:]
+        yield "".join(pieces)
+
+    if buffer:
+        yield _MULTIPLY_PATTERN.sub(r"\1*", buffer)
+
+
+def _translate_characters(text: str) -> str:
+    """Apply _NORMALIZE_TABLE; ASCII text has nothing to translate"""
+    if text.isascii():
+        return text
+    return _NORMALIZE_CHARS.sub(lambda match: _NORMALIZE_TABLE[match.group()], text)
 
 
 def extract_mathematical_expressions(text: str) -> List[Dict[str, Any]]:
@@ -94,51 +513,7 @@ def extract_mathematical_expressions(text: str) -> List[Dict[str, Any]]:
     Returns:
         List of dictionaries with expression information
     """
-    expressions = []
-
-    # Patterns for different types of mathematical expressions
-    patterns = {
-        "equation": r"[0-9a-zA-Z\+\-\*/\(\)\s]*=\s*[0-9a-zA-Z\+\-\*/\(\)\s]+",
-        "algebraic": r"[0-9]*[a-zA-Z][0-9]*[\+\-\*/\^]*[0-9a-zA-Z\+\-\*/\(\)\s]*",
-        "arithmetic": r"[0-9]+[\+\-\*/][0-9\+\-\*/\(\)\s]+",
-        "function": r"\b(?:sin|cos|tan|log|ln|sqrt|exp)\s*\([^)]+\)",
-        "fraction": r"[0-9]+/[0-9]+",
-        "power": r"[0-9a-zA-Z]+\^[0-9]+",
-    }
-
-    for expr_type, pattern in patterns.items():
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            expressions.append(
-                {
-                    "type": expr_type,
-                    "expression": match.group().strip(),
-                    "start_pos": match.start(),
-                    "end_pos": match.end(),
-                }
-            )
-
-    # Remove duplicates and overlapping expressions
-    expressions = sorted(
-        expressions, key=lambda x: (x["start_pos"], -len(x["expression"]))
-    )
-    filtered_expressions = []
-
-    for expr in expressions:
-        # Check if this expression overlaps with any already added
-        overlaps = False
-        for existing in filtered_expressions:
-            if (
-                expr["start_pos"] < existing["end_pos"]
-                and expr["end_pos"] > existing["start_pos"]
-            ):
-                overlaps = True
-                break
-
-        if not overlaps:
-            filtered_expressions.append(expr)
-
-    return filtered_expressions
+    return scan_expressions(text)
 
 
 def classify_subject(text: str) -> Dict[str, Any]:
@@ -151,187 +526,18 @@ def classify_subject(text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with subject classification and confidence
     """
-    text_lower = text.lower()
-
-    # Define subject keywords (Bengali and English)
-    subject_keywords = {
-        "math": {
-            "keywords": [
-                # English keywords
-                "algebra",
-                "geometry",
-                "trigonometry",
-                "calculus",
-                "equation",
-                "solve",
-                "graph",
-                "function",
-                "derivative",
-                "integral",
-                "triangle",
-                "circle",
-                "square",
-                "rectangle",
-                "angle",
-                "area",
-                "volume",
-                "perimeter",
-                "quadratic",
-                "linear",
-                "polynomial",
-                "matrix",
-                "vector",
-                # Bengali keywords
-                "বীজগণিত",
-                "জ্যামিতি",
-                "ত্রিকোণমিতি",
-                "সমীকরণ",
-                "সমাধান",
-                "ত্রিভুজ",
-                "বৃত্ত",
-                "চতুর্ভুজ",
-                "কোণ",
-                "ক্ষেত্রফল",
-                "আয়তন",
-                "পরিসীমা",
-                "দ্বিঘাত",
-                "রৈখিক",
-                "বহুপদী",
-                "ম্যাট্রিক্স",
-            ],
-            "weight": 1.0,
-        },
-        "physics": {
-            "keywords": [
-                # English keywords
-                "force",
-                "motion",
-                "velocity",
-                "acceleration",
-                "energy",
-                "power",
-                "electricity",
-                "magnetism",
-                "light",
-                "sound",
-                "wave",
-                "pressure",
-                "temperature",
-                "heat",
-                "mechanics",
-                "optics",
-                "thermodynamics",
-                # Bengali keywords
-                "বল",
-                "গতি",
-                "বেগ",
-                "ত্বরণ",
-                "শক্তি",
-                "ক্ষমতা",
-                "বিদ্যুৎ",
-                "চুম্বক",
-                "আলো",
-                "শব্দ",
-                "তরঙ্গ",
-                "চাপ",
-                "তাপমাত্রা",
-                "তাপ",
-                "বলবিদ্যা",
-            ],
-            "weight": 1.0,
-        },
-        "chemistry": {
-            "keywords": [
-                # English keywords
-                "atom",
-                "molecule",
-                "element",
-                "compound",
-                "reaction",
-                "acid",
-                "base",
-                "salt",
-                "chemical",
-                "periodic",
-                "bond",
-                "electron",
-                "ion",
-                "catalyst",
-                "organic",
-                "inorganic",
-                "oxidation",
-                "reduction",
-                # Bengali keywords
-                "পরমাণু",
-                "অণু",
-                "মৌল",
-                "যৌগ",
-                "বিক্রিয়া",
-                "অ্যাসিড",
-                "ক্ষার",
-                "লবণ",
-                "রাসায়নিক",
-                "পর্যায়",
-                "বন্ধন",
-                "ইলেকট্রন",
-                "আয়ন",
-            ],
-            "weight": 1.0,
-        },
-        "biology": {
-            "keywords": [
-                # English keywords
-                "cell",
-                "tissue",
-                "organ",
-                "system",
-                "plant",
-                "animal",
-                "human",
-                "genetics",
-                "evolution",
-                "ecosystem",
-                "photosynthesis",
-                "respiration",
-                "protein",
-                "dna",
-                "rna",
-                "chromosome",
-                "enzyme",
-                # Bengali keywords
-                "কোষ",
-                "টিস্যু",
-                "অঙ্গ",
-                "তন্ত্র",
-                "উদ্ভিদ",
-                "প্রাণী",
-                "মানুষ",
-                "বংশগতি",
-                "বিবর্তন",
-                "বাস্তুতন্ত্র",
-                "সালোকসংশ্লেষণ",
-                "শ্বসন",
-                "প্রোটিন",
-                "ডিএনএ",
-                "আরএনএ",
-                "ক্রোমোজোম",
-                "এনজাইম",
-            ],
-            "weight": 1.0,
-        },
-    }
+    return _classify_subject(_TextFeatures(text))
+
+
+def _classify_subject(features: _TextFeatures) -> Dict[str, Any]:
+    keyword_hits = features.keyword_hits
 
     # Calculate scores for each subject
     subject_scores = {}
 
-    for subject, data in subject_keywords.items():
-        score = 0
-        matched_keywords = []
-
-        for keyword in data["keywords"]:
-            if keyword in text_lower:
-                score += data["weight"]
-                matched_keywords.append(keyword)
+    for subject, data in _SUBJECT_KEYWORDS.items():
+        matched_keywords = keyword_hits.get(("subject", subject), [])
+        score = len(matched_keywords) * data["weight"] if matched_keywords else 0
 
         subject_scores[subject] = {"score": score, "matched_keywords": matched_keywords}
 
@@ -352,8 +558,7 @@ def classify_subject(text: str) -> Dict[str, Any]:
     ]
 
     # If tie, prefer based on expression types found
-    math_expressions = extract_mathematical_expressions(text)
-    if len(top_subjects) > 1 and math_expressions:
+    if len(top_subjects) > 1 and features.math_expressions:
         if "math" in top_subjects:
             primary_subject = "math"
         elif "physics" in top_subjects:
@@ -364,7 +569,7 @@ def classify_subject(text: str) -> Dict[str, Any]:
         primary_subject = top_subjects[0]
 
     # Calculate confidence based on score and context
-    total_possible_score = len(subject_keywords[primary_subject]["keywords"])
+    total_possible_score = len(_SUBJECT_KEYWORDS[primary_subject]["keywords"])
     confidence = min(max_score / total_possible_score, 1.0)
 
     return {
@@ -386,133 +591,29 @@ def assess_grade_level(text: str, subject: str) -> Dict[str, Any]:
     Returns:
         Dictionary with grade level assessment
     """
-    text_lower = text.lower()
-
-    # Define grade level indicators
-    grade_indicators = {
-        "6-8": {
-            "math": [
-                "addition",
-                "subtraction",
-                "multiplication",
-                "division",
-                "fraction",
-                "decimal",
-                "percentage",
-                "basic",
-                "simple",
-                "যোগ",
-                "বিয়োগ",
-                "গুণ",
-                "ভাগ",
-                "ভগ্নাংশ",
-                "দশমিক",
-                "শতকরা",
-            ],
-            "physics": ["basic", "simple", "elementary", "speed", "distance", "time"],
-            "chemistry": ["basic", "simple", "states of matter", "mixture", "solution"],
-            "biology": ["basic", "simple", "plant parts", "animal parts", "food chain"],
-        },
-        "9-10": {
-            "math": [
-                "quadratic",
-                "trigonometry",
-                "logarithm",
-                "coordinate",
-                "দ্বিঘাত",
-                "ত্রিকোণমিতি",
-                "লগারিদম",
-                "স্থানাঙ্ক",
-            ],
-            "physics": [
-                "force",
-                "motion",
-                "electricity",
-                "light",
-                "sound",
-                "বল",
-                "গতি",
-                "বিদ্যুৎ",
-                "আলো",
-                "শব্দ",
-            ],
-            "chemistry": [
-                "atomic structure",
-                "periodic table",
-                "chemical bonding",
-                "acid base",
-                "পরমাণু গঠন",
-                "পর্যায় সারণি",
-            ],
-            "biology": [
-                "cell",
-                "tissue",
-                "genetics",
-                "evolution",
-                "কোষ",
-                "টিস্যু",
-                "বংশগতি",
-            ],
-        },
-        "11-12": {
-            "math": [
-                "calculus",
-                "derivative",
-                "integral",
-                "limits",
-                "matrix",
-                "vector",
-                "statistics",
-                "ক্যালকুলাস",
-                "অন্তরকরণ",
-                "সমাকলন",
-            ],
-            "physics": [
-                "advanced",
-                "quantum",
-                "relativity",
-                "electromagnetic",
-                "thermodynamics",
-                "modern physics",
-            ],
-            "chemistry": [
-                "organic",
-                "physical chemistry",
-                "chemical kinetics",
-                "equilibrium",
-                "জৈব রসায়ন",
-            ],
-            "biology": [
-                "molecular biology",
-                "biotechnology",
-                "ecology",
-                "advanced genetics",
-            ],
-        },
-    }
+    return _assess_grade_level(_TextFeatures(text), subject)
 
-    # Score each grade level
-    grade_scores = {}
 
-    for grade, subjects in grade_indicators.items():
-        score = 0
-        matched_terms = []
+def _assess_grade_level(features: _TextFeatures, subject: str) -> Dict[str, Any]:
+    keyword_hits = features.keyword_hits
 
-        if subject in subjects:
-            for term in subjects[subject]:
-                if term in text_lower:
-                    score += 1
-                    matched_terms.append(term)
+    # Score each grade level
+    grade_scores = {}
 
-        grade_scores[grade] = {"score": score, "matched_terms": matched_terms}
+    for grade in _GRADE_INDICATORS:
+        matched_terms = keyword_hits.get(("grade", grade, subject), [])
+        grade_scores[grade] = {
+            "score": len(matched_terms),
+            "matched_terms": matched_terms,
+        }
 
     # Determine most likely grade level
     max_score = max([data["score"] for data in grade_scores.values()])
 
     if max_score == 0:
         # Default based on complexity heuristics
-        word_count = len(text.split())
-        math_expr_count = len(extract_mathematical_expressions(text))
+        word_count = features.word_count
+        math_expr_count = len(features.math_expressions)
 
         if word_count < 10 and math_expr_count <= 1:
             estimated_grade = "6-8"
@@ -553,6 +654,11 @@ def validate_question_completeness(text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with completeness assessment
     """
+    return _validate_question_completeness(_TextFeatures(text))
+
+
+def _validate_question_completeness(features: _TextFeatures) -> Dict[str, Any]:
+    text = features.text
     issues = []
     suggestions = []
 
@@ -563,7 +669,7 @@ def validate_question_completeness(text: str) -> Dict[str, Any]:
         r"^(homework|assignment|problem)\s*$",
     ]
 
-    text_clean = text.strip().lower()
+    text_clean = features.lower.strip()
 
     for pattern in vague_patterns:
         if re.match(pattern, text_clean):
@@ -575,8 +681,7 @@ def validate_question_completeness(text: str) -> Dict[str, Any]:
 
     # Check for incomplete mathematical problems
     if "solve" in text_clean:
-        math_exprs = extract_mathematical_expressions(text)
-        if not math_exprs:
+        if not features.math_expressions:
             issues.append("missing_equation")
             suggestions.append(
                 "Please provide the complete equation or mathematical expression to solve."
@@ -584,9 +689,9 @@ def validate_question_completeness(text: str) -> Dict[str, Any]:
 
     # Check for context-dependent references without context
     context_refs = ["this", "that", "it", "above", "previous", "following"]
-    if any(ref in text_clean for ref in context_refs):
+    if any(re.search(rf"\b{ref}\b", text_clean) for ref in context_refs):
         # Check if there's actual context provided
-        if len(text.split()) < 8:  # Very short text with references
+        if features.word_count < 8:  # Very short text with references
             issues.append("missing_context")
             suggestions.append(
                 "Please provide the complete context or reference material you are referring to."
@@ -685,36 +790,6 @@ def generate_clarifying_questions(analysis: Dict[str, Any]) -> List[str]:
     return questions[:3]  # Return maximum 3 clarifying questions
 
 
-def format_mathematical_expression(expr: str) -> str:
-    """
-    Format mathematical expressions for better display
-
-    Args:
-        expr: Mathematical expression
-
-    Returns:
-        Formatted expression
-    """
-    # Basic LaTeX-style formatting
-    formatted = expr
-
-    # Handle exponents
-    formatted = re.sub(r"\^(\d+)", r"^{\1}", formatted)
-    formatted = re.sub(r"\^([a-zA-Z])", r"^{\1}", formatted)
-
-    # Handle fractions (simple cases)
-    formatted = re.sub(r"(\d+)/(\d+)", r"\\frac{\1}{\2}", formatted)
-
-    # Handle square roots
-    formatted = re.sub(r"sqrt\(([^)]+)\)", r"\\sqrt{\1}", formatted)
-
-    # Handle common functions
-    for func in ["sin", "cos", "tan", "log", "ln"]:
-        formatted = re.sub(f"\\b{func}\\b", f"\\{func}", formatted)
-
-    return formatted
-
-
 def extract_educational_context(text: str) -> Dict[str, Any]:
     """
     Extract educational context and learning objectives from question
@@ -725,6 +800,10 @@ def extract_educational_context(text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with educational context information
     """
+    return _extract_educational_context(_TextFeatures(text))
+
+
+def _extract_educational_context(features: _TextFeatures) -> Dict[str, Any]:
     context = {
         "question_types": [],
         "learning_objectives": [],
@@ -732,7 +811,7 @@ def extract_educational_context(text: str) -> Dict[str, Any]:
         "difficulty_indicators": [],
     }
 
-    text_lower = text.lower()
+    text_lower = features.lower
 
     # Identify question types
     if any(word in text_lower for word in ["solve", "calculate", "find", "compute"]):